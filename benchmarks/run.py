@@ -0,0 +1,393 @@
+"""
+benchmarks/run.py
+
+Description:
+    Times and memory-profiles every pipeline stage (loading, cleaning, indexing, slicing, each
+    statistic and each plotter) on the shipped data/ files and on synthetically scaled copies,
+    writes the results as JSON and compares them against a stored baseline.
+
+Usage (from the repository root):
+    python -m benchmarks.run [--scenarios shipped countries_x10 ...] [--repeat 3] [--output benchmarks/results/latest.json]
+                             [--baseline benchmarks/baseline.json] [--threshold 0.25] [--save-baseline]
+
+    Exits with status 1 when a stage is slower, or peaks at more traced memory, than the
+    baseline by more than the threshold.
+    Baselines are machine-specific; record one with --save-baseline on the machine that runs
+    the comparison.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+from src.load_data import load_data
+from src.clean_data import clean_data
+from src.data_helpers import set_country_index, slice_dataframe
+from src.metadata import CountryMetadata, load_country_metadata
+from src.panel import Panel
+from src.memo import configure_memoization
+from src.render import use_headless_backend
+from src import stats
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_DIR, "data")
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+BASELINE = os.path.join(REPO_DIR, "benchmarks", "baseline.json")
+
+GDP = "NY.GDP.MKTP.CD"
+INFLATION = "FP.CPI.TOTL.ZG"
+
+START_YEAR = "2000"
+END_YEAR = "2023"
+
+# Plotters draw one line or bar per country, so they are benchmarked on a fixed number of
+# countries; what scales is the data they are sliced from
+PLOT_COUNTRIES = 10
+
+# (name, country factor, indicator factor)
+SCENARIOS = {
+    "shipped": (1, 1),
+    "countries_x10": (10, 1),
+    "countries_x100": (100, 1),
+    "indicators_x10": (1, 10),
+    "indicators_x100": (1, 100)
+}
+
+# Differences below this many seconds, or megabytes of peak memory, are treated as noise when
+# comparing with the baseline
+NOISE_FLOOR = 0.005
+MEMORY_NOISE_FLOOR_MB = 1.0
+
+def scale_raw_frame(raw: pd.DataFrame, factor: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Replicate the rows of a raw WDI frame factor times as new, distinct countries.
+
+    Copies get a numbered name and code, and their values are multiplied by log-normal noise so
+    they are not exact duplicates of the originals.
+
+    Args:
+        raw (pd.DataFrame): Frame as returned by load_data.
+        factor (int): Number of copies of every row.
+        seed (int): Seed for the noise.
+
+    Returns:
+        pd.DataFrame: The scaled frame.
+    """
+    if factor == 1:
+        return raw
+
+    rng = np.random.default_rng(seed)
+    year_columns = [col for col in raw.columns if col.isdigit()]
+    scaled = pd.concat([raw] * factor, ignore_index=True)
+    copy_number = np.repeat(np.arange(factor), len(raw))
+    scaled["Country Name"] = scaled["Country Name"] + np.where(copy_number > 0, " #" + copy_number.astype(str), "")
+    scaled["Country Code"] = scaled["Country Code"] + np.where(copy_number > 0, copy_number.astype(str), "")
+    noise = rng.lognormal(0.0, 0.1, size=(len(scaled), len(year_columns)))
+    noise[copy_number == 0] = 1.0
+    scaled[year_columns] = scaled[year_columns].to_numpy(dtype=np.float64) * noise
+
+    return scaled
+
+def write_wdi_csv(raw: pd.DataFrame, path: str) -> None:
+    """
+    Write a raw frame as a World Bank CSV, including the four-line preamble load_data skips.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('"Data Source","World Development Indicators",\n\n"Last Updated Date","2025-06-05",\n\n')
+        raw.to_csv(f, index=False)
+
+def scale_panel(panel: Panel, country_factor: int, indicator_factor: int, seed: int = 0) -> Panel:
+    """
+    Replicate a panel's countries and indicators, with noise, to build a larger panel.
+
+    Args:
+        panel (Panel): The panel to scale.
+        country_factor (int): Number of copies of every country.
+        indicator_factor (int): Number of copies of every indicator.
+        seed (int): Seed for the noise.
+
+    Returns:
+        Panel: The scaled panel.
+    """
+    if country_factor == 1 and indicator_factor == 1:
+        return panel
+
+    rng = np.random.default_rng(seed)
+    values = np.tile(panel.values, (indicator_factor, country_factor, 1))
+    values *= rng.lognormal(0.0, 0.1, size=values.shape)
+
+    def copies(labels, factor, sep):
+        return [label if copy == 0 else f"{label}{sep}{copy}" for copy in range(factor) for label in labels]
+
+    return Panel(values, copies(panel.indicators, indicator_factor, "."), copies(panel.indicator_names, indicator_factor, " #"),
+                 copies(panel.countries, country_factor, " #"), copies(panel.country_codes, country_factor, ""), panel.years)
+
+def scale_metadata(metadata: CountryMetadata, country_factor: int) -> CountryMetadata:
+    """
+    Replicate the country metadata to match the country copies made by scale_panel, so the
+    copies are told apart from the WDI aggregates just like their originals.
+    """
+    if country_factor == 1:
+        return metadata
+
+    frame = pd.concat([metadata.frame.rename(index=lambda code: code if copy == 0 else f"{code}{copy}")
+                       for copy in range(country_factor)])
+    return CountryMetadata(frame)
+
+def measure(func, *args, repeat: int = 3, **kwargs) -> dict:
+    """
+    Time a call and record its peak traced memory.
+
+    Timing and memory are measured in separate calls, since tracemalloc slows allocation-heavy
+    code down considerably.
+
+    Args:
+        func (Callable): The stage to measure.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        dict: "seconds" (fastest call), "median_seconds", "peak_mb" and the last "result".
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "median_seconds": float(np.median(timings)), "peak_mb": peak / 1e6, "result": result}
+
+def frame_stages(gdp_path: str, work_dir: str) -> list[tuple]:
+    """
+    The per-indicator stages, in pipeline order. Each stage is (name, callable) where the
+    callable takes the outputs of earlier stages by name.
+    """
+    from src.plot_gdp import plot_gdp_trends
+    from src.plot_stats import (plot_correlations, plot_growth_rate_analysis, plot_rolling_statistic,
+                                plot_time_series_decomposition)
+
+    def figure(name):
+        return os.path.join(work_dir, "figures", name)
+
+    def plot_countries(out):
+        return out["sliced"].index[:PLOT_COUNTRIES].tolist()
+
+    return [
+        ("load_data", lambda out: load_data(gdp_path)),
+        ("clean_data", lambda out: clean_data(out["load_data"])),
+        ("set_country_index", lambda out: set_country_index(out["clean_data"])),
+        ("slice_dataframe", lambda out: slice_dataframe(out["set_country_index"], out["countries"], START_YEAR, END_YEAR)),
+        ("correlation_analysis", lambda out: stats.correlation_analysis(out["sliced"], out["inflation"])),
+        ("linear_regression_statsmodels", lambda out: stats.linear_regression_statsmodels(out["sliced"], out["inflation"], lazy=True, verbose=False)),
+        ("linear_regression_sklearn", lambda out: stats.linear_regression_sklearn(out["sliced"], out["inflation"])),
+        ("linear_regression_table", lambda out: stats.linear_regression_table(out["sliced"], out["inflation"])),
+        ("time_series_decomposition", lambda out: stats.time_series_decomposition(out["sliced"], out["countries"], START_YEAR, END_YEAR)),
+        ("growth_rate_analysis", lambda out: stats.growth_rate_analysis(out["sliced"])),
+        ("cagr_analysis", lambda out: stats.cagr_analysis(out["sliced"])),
+        ("rolling_statistics", lambda out: stats.rolling_statistics(out["sliced"], years_window=4)),
+        ("plot_gdp_trends", lambda out: plot_gdp_trends(out["sliced"], plot_countries(out), out["sliced"].columns.tolist(),
+                                                        show=False, output_path=figure("gdp_trends.png"))),
+        ("plot_correlations", lambda out: plot_correlations(out["correlation_analysis"].dropna().iloc[:PLOT_COUNTRIES],
+                                                            output_path=figure("correlation_plot.png"), show=False)),
+        ("plot_time_series_decomposition", lambda out: plot_time_series_decomposition(out["time_series_decomposition"][:3],
+                                                                                      out["countries"][:3], show=False)),
+        ("plot_growth_rate_analysis", lambda out: plot_growth_rate_analysis(out["growth_rate_analysis"].iloc[:PLOT_COUNTRIES], show=False,
+                                                                            output_path=figure("growth_rate_analysis.png"))),
+        ("plot_rolling_statistics", lambda out: plot_rolling_statistic(out["rolling_statistics"][out["rolling_statistics"]["Country"].isin(plot_countries(out))],
+                                                                       "Mean", output_path=figure("rolling_statistics_mean.png"), show=False))
+    ]
+
+def panel_stages() -> list[tuple]:
+    """
+    The stages that operate on a whole Panel.
+    """
+    return [
+        ("panel_growth_rate_analysis", lambda out: stats.panel_growth_rate_analysis(out["panel"], START_YEAR, END_YEAR,
+                                                                                    metadata=out["metadata"])),
+        ("clustering", lambda out: stats.clustering(out["panel"], indicators=out["panel"].indicators[:4].tolist(),
+                                                    start_year=START_YEAR, end_year=END_YEAR, cache_dir=None,
+                                                    metadata=out["metadata"]))
+    ]
+
+def run_scenario(scenario: str, work_dir: str, repeat: int = 3) -> list[dict]:
+    """
+    Run every stage of one scenario.
+
+    Scenarios that scale countries run all stages on synthetic CSVs written to work_dir;
+    scenarios that scale indicators only run the panel stages, since the per-indicator stages
+    do not depend on how many indicators exist.
+
+    Args:
+        scenario (str): A key of SCENARIOS.
+        work_dir (str): Scratch directory for synthetic files and charts.
+        repeat (int): Number of timed calls per stage.
+
+    Returns:
+        list[dict]: One record per stage.
+    """
+    country_factor, indicator_factor = SCENARIOS[scenario]
+    gdp_path = glob.glob(os.path.join(DATA_DIR, "*", f"API_{GDP}_*.csv"))[0]
+    inflation_path = glob.glob(os.path.join(DATA_DIR, "*", f"API_{INFLATION}_*.csv"))[0]
+
+    if country_factor > 1:
+        scaled_path = os.path.join(work_dir, f"gdp_{scenario}.csv")
+        write_wdi_csv(scale_raw_frame(load_data(gdp_path), country_factor), scaled_path)
+        gdp_path = scaled_path
+
+    inflation = set_country_index(clean_data(scale_raw_frame(load_data(inflation_path), country_factor, seed=1)))
+    outputs = {}
+    pipeline = panel_stages() if indicator_factor > 1 else frame_stages(gdp_path, work_dir) + panel_stages()
+
+    records = []
+    for name, stage in pipeline:
+        # Wire up the shared inputs as soon as the stages that produce them have run
+        if name == "slice_dataframe":
+            outputs["countries"] = outputs["set_country_index"].index.intersection(inflation.index).tolist()
+        if name == "correlation_analysis":
+            outputs["sliced"] = outputs["slice_dataframe"]
+            outputs["inflation"] = slice_dataframe(inflation, outputs["countries"], START_YEAR, END_YEAR)
+        if name == "panel_growth_rate_analysis":
+            outputs["metadata"] = scale_metadata(load_country_metadata(DATA_DIR), country_factor)
+            outputs["panel"] = scale_panel(Panel.from_directories(DATA_DIR, cache_dir=os.path.join(work_dir, "cache")),
+                                           country_factor, indicator_factor)
+
+        measurement = measure(stage, outputs, repeat=repeat)
+        outputs[name] = measurement.pop("result")
+        records.append({"stage": name, "scenario": scenario, **measurement})
+        print(f"{scenario:>16} {name:<32} {measurement['seconds'] * 1000:10.2f} ms {measurement['peak_mb']:10.1f} MB", flush=True)
+
+    return records
+
+def environment() -> dict:
+    """
+    Describe the machine and code the results were recorded on.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__
+    }
+
+def compare(results: list[dict], baseline: list[dict], threshold: float = 0.25) -> list[dict]:
+    """
+    Find stages that got slower, or peaked at more traced memory, than the baseline by more
+    than the threshold.
+
+    Args:
+        results (list[dict]): Current records.
+        baseline (list[dict]): Baseline records.
+        threshold (float): Allowed relative increase, e.g. 0.25 for 25%.
+
+    Returns:
+        list[dict]: One record per regressed stage and metric ("seconds" or "peak_mb") with the
+            baseline and current values.
+    """
+    previous = {(record["stage"], record["scenario"]): record for record in baseline}
+    regressions = []
+    for record in results:
+        base = previous.get((record["stage"], record["scenario"]))
+        if base is None:
+            continue
+        for metric, noise_floor in (("seconds", NOISE_FLOOR), ("peak_mb", MEMORY_NOISE_FLOOR_MB)):
+            if metric not in base:
+                continue
+            increase = record[metric] / base[metric] - 1 if base[metric] > 0 else 0.0
+            if increase > threshold and record[metric] - base[metric] > noise_floor:
+                regressions.append({"stage": record["stage"], "scenario": record["scenario"], "metric": metric,
+                                    "baseline": base[metric], "current": record[metric], "increase": increase})
+
+    return regressions
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    use_headless_backend()
+    # Repeated runs must recompute, not return memoized results
+    configure_memoization(enabled=False)
+    logging.basicConfig(level=logging.WARNING)
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.makedirs(os.path.join(work_dir, "figures"))
+        # Plotters that write to figures/ relative to the working directory land in the scratch dir
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for scenario in args.scenarios:
+                results.extend(run_scenario(scenario, work_dir, args.repeat))
+        finally:
+            os.chdir(cwd)
+
+    report = {"environment": environment(), "results": results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.threshold)
+    for regression in regressions:
+        if regression["metric"] == "seconds":
+            change = f"{regression['baseline'] * 1000:.2f} ms -> {regression['current'] * 1000:.2f} ms"
+        else:
+            change = f"{regression['baseline']:.1f} MB -> {regression['current']:.1f} MB"
+        print(f"REGRESSION {regression['scenario']} {regression['stage']}: {change} (+{regression['increase']:.0%})")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline} ({baseline['environment'].get('commit')})")
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
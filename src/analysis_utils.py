@@ -1,19 +1,26 @@
 
 import pandas as pd
 
-def format_stats_as_dataframe(rolling_stats: dict) -> pd.DataFrame:
-    rows = []
-    for country, stats_dict in rolling_stats.items():
-        years = stats_dict["mean"].index
-        
-        for year in years:
-            row = {
-                "Country": country,
-                "Year": year
-            }
-            for stat_name, series in stats_dict.items():
-                row[stat_name.capitalize()] = series.loc[year]
-            rows.append(row)
+def format_stats_as_dataframe(rolling_stats: pd.DataFrame | dict) -> pd.DataFrame:
+    """
+    Return rolling statistics as a long-format dataframe with one row per country and year.
 
-    return pd.DataFrame(rows)
- 
\ No newline at end of file
+    rolling_statistics already produces this layout, so a dataframe is returned unchanged. A
+    legacy dict of {country: {stat_name: pd.Series}} is converted column-wise.
+
+    Args:
+        rolling_stats (pd.DataFrame | dict): Output of rolling_statistics.
+
+    Returns:
+        pd.DataFrame: Long-format rolling statistics.
+    """
+    if isinstance(rolling_stats, pd.DataFrame):
+        return rolling_stats
+
+    frames = [
+        pd.DataFrame(stats_dict).rename(columns=str.capitalize).rename_axis("Year").reset_index().assign(Country=country)
+        for country, stats_dict in rolling_stats.items()
+    ]
+    df = pd.concat(frames, ignore_index=True)
+
+    return df[["Country"] + [col for col in df.columns if col != "Country"]]
@@ -0,0 +1,202 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from src.panel import Panel
+
+logger = logging.getLogger(__name__)
+
+STATISTICS = ("correlation", "slope", "intercept")
+
+def paired_statistics(x: np.ndarray, y: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Pearson correlation and least-squares slope and intercept of y on x along the last axis of
+    two arrays of any shape, using the positions where both are present.
+
+    Args:
+        x (np.ndarray): Predictor values, shape (..., observations).
+        y (np.ndarray): Response values, same shape as x.
+
+    Returns:
+        dict[str, np.ndarray]: "correlation", "slope", "intercept" and "n", shaped like x without
+            its last axis. Statistics with fewer than three observations, or of a constant
+            series, are NaN.
+    """
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    n = mask.sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.where(mask, x, 0.0).sum(axis=-1) / n
+        mean_y = np.where(mask, y, 0.0).sum(axis=-1) / n
+        dx = np.where(mask, x - mean_x[..., None], 0.0)
+        dy = np.where(mask, y - mean_y[..., None], 0.0)
+        sxx = (dx * dx).sum(axis=-1)
+        syy = (dy * dy).sum(axis=-1)
+        sxy = (dx * dy).sum(axis=-1)
+
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        correlation = np.clip(np.where((sxx > 0) & (syy > 0), sxy / np.sqrt(sxx * syy), np.nan), -1.0, 1.0)
+        intercept = mean_y - slope * mean_x
+
+    too_few = n < 3
+    for result in (correlation, slope, intercept):
+        result[too_few] = np.nan
+
+    return {"correlation": correlation, "slope": slope, "intercept": intercept, "n": n}
+
+def _compact(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Move each row's complete pairs to the front, so resampling only has to draw positions below n
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    order = np.argsort(~mask, axis=1, kind="stable")
+    x = np.take_along_axis(np.where(mask, x, np.nan), order, axis=1)
+    y = np.take_along_axis(np.where(mask, y, np.nan), order, axis=1)
+    return x, y, mask.sum(axis=1)
+
+def batch_bootstrap(x: np.ndarray, y: np.ndarray, n_resamples: int = 2000, n_permutations: int = 2000,
+                    confidence: float = 0.95, seed: int | np.random.SeedSequence = 0,
+                    batch_size: int = 256) -> dict[str, np.ndarray]:
+    """
+    Bootstrap confidence intervals and permutation p-values for the correlation and regression
+    of every row of y on the same row of x.
+
+    Resamples are drawn for all rows at once, batch_size resamples at a time, so memory stays
+    at about batch_size x rows x observations floats. Each row resamples its own complete
+    (x, y) pairs with replacement. Intervals are percentile intervals. The p-value is two-sided
+    for no association, from permuting y against x; it is shared by the correlation and the
+    slope, whose permutation tests are equivalent.
+
+    Results depend only on the data and the seed, not on batch_size.
+
+    Args:
+        x (np.ndarray): Predictor values, shape (rows, observations).
+        y (np.ndarray): Response values, same shape as x.
+        n_resamples (int): Number of bootstrap resamples.
+        n_permutations (int): Number of permutations, or 0 to skip the p-values.
+        confidence (float): Coverage of the intervals.
+        seed (int | np.random.SeedSequence): Seed of the random draws.
+        batch_size (int): Resamples drawn and evaluated together.
+
+    Returns:
+        dict[str, np.ndarray]: Per row: the estimate and "<statistic>_lower" / "<statistic>_upper"
+            for each of STATISTICS, "p_value" and "n" (complete pairs).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape:
+        raise ValueError(f"x and y must have the same shape, got {x.shape} and {y.shape}")
+
+    estimates = paired_statistics(x, y)
+    x, y, n = _compact(x, y)
+    rows, observations = x.shape
+    present = np.arange(observations) < n[:, None]
+    row_index = np.arange(rows)[:, None]
+
+    seed = np.random.SeedSequence(seed) if isinstance(seed, int) else seed
+    bootstrap_seed, permutation_seed = seed.spawn(2)
+    rng = np.random.default_rng(bootstrap_seed)
+    resampled = {name: np.empty((n_resamples, rows)) for name in STATISTICS}
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        positions = (rng.random((size, rows, observations)) * n[:, None]).astype(np.int64)
+        positions = np.minimum(positions, observations - 1)
+        xb = np.where(present, x[row_index, positions], np.nan)
+        yb = np.where(present, y[row_index, positions], np.nan)
+        statistics = paired_statistics(xb, yb)
+        for name in STATISTICS:
+            resampled[name][start:start + size] = statistics[name]
+
+    result = {}
+    tail = (1.0 - confidence) / 2 * 100
+    for name in STATISTICS:
+        result[name] = estimates[name]
+        with np.errstate(invalid="ignore"):
+            # Rows whose every resample is undefined have no interval; keep them quiet
+            defined = ~np.isnan(resampled[name]).all(axis=0)
+            lower = np.full(rows, np.nan)
+            upper = np.full(rows, np.nan)
+            if defined.any():
+                lower[defined], upper[defined] = np.nanpercentile(resampled[name][:, defined], [tail, 100 - tail], axis=0)
+        result[f"{name}_lower"] = lower
+        result[f"{name}_upper"] = upper
+
+    result["p_value"] = np.full(rows, np.nan)
+    if n_permutations:
+        rng = np.random.default_rng(permutation_seed)
+        observed = np.abs(estimates["correlation"])
+        exceed = np.zeros(rows)
+        for start in range(0, n_permutations, batch_size):
+            size = min(batch_size, n_permutations - start)
+            # Sorting random keys shuffles each row's complete pairs; absent positions sort last
+            keys = np.where(present, rng.random((size, rows, observations)), 2.0)
+            yp = y[row_index, np.argsort(keys, axis=-1)]
+            permuted = np.abs(paired_statistics(np.broadcast_to(x, yp.shape), yp)["correlation"])
+            # A small tolerance keeps ties from rounding error counting as less extreme
+            exceed += (permuted >= observed - 1e-12).sum(axis=0)
+        result["p_value"] = np.where(np.isnan(observed), np.nan, (exceed + 1) / (n_permutations + 1))
+    result["n"] = n
+
+    return result
+
+def bootstrap_table(x: pd.DataFrame, y: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """
+    Run batch_bootstrap on two country x year frames aligned by country and year.
+
+    Args:
+        x (pd.DataFrame): Predictor values (index: countries, columns: years).
+        y (pd.DataFrame): Response values.
+        **kwargs: Passed to batch_bootstrap (n_resamples, n_permutations, confidence, seed, ...).
+
+    Returns:
+        pd.DataFrame: One row per country of x with the columns of batch_bootstrap.
+    """
+    y = y.reindex(index=x.index, columns=x.columns)
+    result = batch_bootstrap(x.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64), **kwargs)
+    return pd.DataFrame(result, index=x.index)
+
+def _bootstrap_pair(x: np.ndarray, y: np.ndarray, seed: np.random.SeedSequence, kwargs: dict) -> dict[str, np.ndarray]:
+    # Module-level so it can be shipped to worker processes
+    return batch_bootstrap(x, y, seed=seed, **kwargs)
+
+def bootstrap_indicator_pairs(panel: Panel, pairs: list[tuple[str, str]], countries: list[str] = None,
+                              start_year: str = None, end_year: str = None, seed: int = 0, n_jobs: int = 1,
+                              **kwargs) -> pd.DataFrame:
+    """
+    Bootstrap the per-country correlation and regression of several indicator pairs, optionally
+    spreading the pairs over worker processes.
+
+    Every pair draws from its own child of one SeedSequence(seed), so the results do not depend
+    on n_jobs or on the order the workers finish in.
+
+    Args:
+        panel (Panel): The indicator panel.
+        pairs (list[tuple[str, str]]): (predictor, response) indicator codes or names.
+        countries (list[str]): Country names, or None for all.
+        start_year (str): The first year to include.
+        end_year (str): The last year to include.
+        seed (int): Seed of the random draws.
+        n_jobs (int): Number of worker processes. 1 runs in-process.
+        **kwargs: Passed to batch_bootstrap (n_resamples, n_permutations, confidence, batch_size).
+
+    Returns:
+        pd.DataFrame: Long format with the columns "Indicator X", "Indicator Y", "Country" and
+            those of batch_bootstrap.
+    """
+    country_labels = panel.countries if countries is None else panel.countries[panel.country_positions(countries)]
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs))
+    arrays = [panel.array([x_indicator, y_indicator], countries, start_year, end_year) for x_indicator, y_indicator in pairs]
+
+    if n_jobs > 1 and len(pairs) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(pairs))) as executor:
+            futures = [executor.submit(_bootstrap_pair, block[0], block[1], pair_seed, kwargs) for block, pair_seed in zip(arrays, seeds)]
+            results = [future.result() for future in futures]
+    else:
+        results = [_bootstrap_pair(block[0], block[1], pair_seed, kwargs) for block, pair_seed in zip(arrays, seeds)]
+
+    frames = [
+        pd.DataFrame(result).assign(**{"Indicator X": x_indicator, "Indicator Y": y_indicator, "Country": country_labels})
+        for (x_indicator, y_indicator), result in zip(pairs, results)
+    ]
+    table = pd.concat(frames, ignore_index=True)
+    logger.info(f"Bootstrapped {len(pairs)} indicator pairs across {len(country_labels)} countries")
+
+    return table[["Indicator X", "Indicator Y", "Country"] + [col for col in table.columns if col not in ("Indicator X", "Indicator Y", "Country")]]
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from src.cache import CACHE_DIR, file_fingerprint, load_entry, store_frame
+from src.clean_data import clean_data
+from src.data_helpers import set_country_index
+from src.panel import Panel
+
+logger = logging.getLogger(__name__)
+
+BULK_FILE = "data/WDIData.csv"
+
+ID_COLUMNS = ["Country Name", "Country Code", "Indicator Name", "Indicator Code"]
+
+def bulk_key(csv_file_loc: str, indicator: str) -> str:
+    """
+    Cache key of one indicator ingested from a bulk file.
+    """
+    return f"bulk:{os.path.abspath(csv_file_loc)}:{indicator}"
+
+def _selection(countries: list[str], start_year: str, end_year: str) -> dict:
+    return {
+        "countries": sorted(countries) if countries is not None else None,
+        "start_year": str(start_year) if start_year is not None else None,
+        "end_year": str(end_year) if end_year is not None else None
+    }
+
+def _is_current(meta: dict, source: dict) -> bool:
+    # Bulk files are too large to hash on every check, so mtime and size decide
+    cached = meta["source"]
+    return all(cached.get(key) == source[key] for key in ("mtime_ns", "size", "selection"))
+
+def _index_path(csv_file_loc: str, cache_dir: str) -> str:
+    # The indicators last ingested from a bulk file, so a run over all of them can be skipped
+    name = hashlib.sha1(os.path.abspath(csv_file_loc).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"bulk-{name}.json")
+
+def _known_indicators(csv_file_loc: str, cache_dir: str, source: dict) -> list[str] | None:
+    try:
+        with open(_index_path(csv_file_loc, cache_dir), "r") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    return index["indicators"] if _is_current(index, source) else None
+
+def _write_index(csv_file_loc: str, cache_dir: str, source: dict, indicators: list[str]) -> None:
+    path = _index_path(csv_file_loc, cache_dir)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"source": source, "indicators": indicators}, f)
+    os.replace(f"{path}.tmp", path)
+
+def _entry_is_current(csv_file_loc: str, indicator: str, cache_dir: str, source: dict) -> bool:
+    entry = load_entry(bulk_key(csv_file_loc, indicator), cache_dir, mmap=True)
+    return entry is not None and _is_current(entry[1], source)
+
+def load_bulk_indicator(csv_file_loc: str, indicator: str, cache_dir: str = CACHE_DIR, mmap: bool = False) -> pd.DataFrame | None:
+    """
+    Read one indicator previously ingested from a bulk file, without touching the bulk file.
+
+    Args:
+        csv_file_loc (str): Path of the bulk file the indicator was ingested from.
+        indicator (str): Indicator code.
+        cache_dir (str): Root directory of the cache.
+        mmap (bool): Memory-map the values instead of reading them into memory.
+
+    Returns:
+        pd.DataFrame | None: The cleaned, country-indexed frame, or None if it was never ingested.
+    """
+    entry = load_entry(bulk_key(csv_file_loc, indicator), cache_dir, mmap=mmap)
+    return entry[0] if entry is not None else None
+
+def ingest_bulk_csv(csv_file_loc: str = BULK_FILE, indicators: list[str] = None, countries: list[str] = None,
+                    start_year: str = None, end_year: str = None, cache_dir: str = CACHE_DIR,
+                    chunk_size: int = 50_000, force: bool = False) -> list[str]:
+    """
+    Stream the WDI bulk download (WDIData.csv, every indicator in one file) into the cache.
+
+    The file is read in chunks of chunk_size rows; only the requested year columns are parsed and
+    each chunk is filtered to the requested indicators and countries. The kept rows are spilled
+    to one temporary file per indicator, since the bulk file is ordered by country, so memory is
+    bounded by the chunk size plus the largest single indicator rather than by the selection.
+    Each indicator is then cleaned, indexed by country and written to the cache as its own entry,
+    in the same layout as load_cached_data, so it can be read back with load_bulk_indicator or
+    bulk_panel. Indicators already ingested from the same file and selection are skipped; with
+    indicators=None the whole file is skipped while every indicator last ingested from it is
+    current.
+
+    Args:
+        csv_file_loc (str): Path of the bulk file. Unlike the per-indicator files it has no preamble.
+        indicators (list[str]): Indicator codes to keep, or None for all.
+        countries (list[str]): Country codes or names to keep, or None for all.
+        start_year (str): The first year to keep.
+        end_year (str): The last year to keep.
+        cache_dir (str): Root directory of the cache.
+        chunk_size (int): Number of rows parsed at a time.
+        force (bool): Re-ingest even if the cached entries are current.
+
+    Returns:
+        list[str]: The indicator codes written to or already present in the cache.
+    """
+    if not os.path.exists(csv_file_loc):
+        logger.error(f"ingest_bulk_csv: File not found: {csv_file_loc}")
+        return []
+
+    source = file_fingerprint(csv_file_loc, content_hash=False)
+    source["selection"] = _selection(countries, start_year, end_year)
+
+    if indicators is None and not force:
+        known = _known_indicators(csv_file_loc, cache_dir, source)
+        if known is not None and all(_entry_is_current(csv_file_loc, indicator, cache_dir, source) for indicator in known):
+            logger.info(f"ingest_bulk_csv: All {len(known)} indicators of {csv_file_loc} are current in the cache")
+            return known
+
+    current = []
+    if indicators is not None and not force:
+        pending = []
+        for indicator in indicators:
+            if _entry_is_current(csv_file_loc, indicator, cache_dir, source):
+                current.append(indicator)
+            else:
+                pending.append(indicator)
+        if not pending:
+            logger.info(f"ingest_bulk_csv: All {len(indicators)} indicators are current in the cache")
+            return list(indicators)
+        logger.info(f"ingest_bulk_csv: {len(pending)} of {len(indicators)} indicators need ingesting")
+        indicators = pending
+
+    header = pd.read_csv(csv_file_loc, nrows=0, encoding="utf-8-sig").columns
+    years = [col for col in header if col.isdigit()
+             and (start_year is None or int(col) >= int(start_year))
+             and (end_year is None or int(col) <= int(end_year))]
+    dtypes = {**{col: str for col in ID_COLUMNS}, **{year: np.float64 for year in years}}
+
+    wanted_indicators = set(indicators) if indicators is not None else None
+    wanted_countries = set(countries) if countries is not None else None
+    rows_read = 0
+    rows_kept = 0
+    written = []
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir, prefix="bulk-") as spill_dir:
+        spills = {}
+        reader = pd.read_csv(csv_file_loc, usecols=ID_COLUMNS + years, dtype=dtypes, encoding="utf-8-sig", chunksize=chunk_size)
+        for chunk in reader:
+            rows_read += len(chunk)
+            keep = np.ones(len(chunk), dtype=bool)
+            if wanted_indicators is not None:
+                keep &= chunk["Indicator Code"].isin(wanted_indicators).to_numpy()
+            if wanted_countries is not None:
+                keep &= (chunk["Country Code"].isin(wanted_countries) | chunk["Country Name"].isin(wanted_countries)).to_numpy()
+            chunk = chunk[keep]
+            rows_kept += len(chunk)
+            for indicator, rows in chunk.groupby("Indicator Code", sort=False):
+                path = spills.setdefault(indicator, os.path.join(spill_dir, f"{len(spills)}.csv"))
+                rows[ID_COLUMNS + years].to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+        logger.info(f"ingest_bulk_csv: Scanned {rows_read} rows, kept {rows_kept}")
+
+        if wanted_indicators is not None:
+            missing = wanted_indicators.difference(spills)
+            if missing:
+                logger.warning(f"ingest_bulk_csv: Indicators not found in {csv_file_loc}: {sorted(missing)}")
+
+        # One indicator in memory at a time
+        for indicator, path in spills.items():
+            df = set_country_index(clean_data(pd.read_csv(path, dtype=dtypes)))
+            if df.empty:
+                continue
+            try:
+                store_frame(df, bulk_key(csv_file_loc, indicator), source, cache_dir)
+                written.append(indicator)
+            except Exception as e:
+                logger.error(f"ingest_bulk_csv: Could not write cache entry for {indicator}: {e}")
+
+    if indicators is None:
+        _write_index(csv_file_loc, cache_dir, source, written)
+
+    logger.info(f"Ingested {len(written)} indicators from {csv_file_loc}")
+    return current + written
+
+def bulk_panel(csv_file_loc: str = BULK_FILE, indicators: list[str] = None, cache_dir: str = CACHE_DIR, **kwargs) -> Panel:
+    """
+    Build a panel from a bulk file, ingesting whatever is not already in the cache.
+
+    Args:
+        csv_file_loc (str): Path of the bulk file.
+        indicators (list[str]): Indicator codes to include, or None for all.
+        cache_dir (str): Root directory of the cache.
+        **kwargs: Selection and chunking options passed to ingest_bulk_csv.
+
+    Returns:
+        Panel: A panel with one indicator per ingested code.
+    """
+    codes = ingest_bulk_csv(csv_file_loc, indicators, cache_dir=cache_dir, **kwargs)
+    frames = [load_bulk_indicator(csv_file_loc, code, cache_dir) for code in codes]
+    panel = Panel.from_frames([df for df in frames if df is not None])
+    logger.info(f"Built {panel!r} from {csv_file_loc}")
+    return panel
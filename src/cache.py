@@ -0,0 +1,261 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from src.load_data import load_data
+from src.clean_data import clean_data
+from src.data_helpers import set_country_index
+from src.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "cache/"
+
+# Bump when the on-disk layout changes so old entries are rebuilt instead of misread
+CACHE_VERSION = 1
+
+# The modules that turn a source CSV into a cleaned frame; load cache entries are keyed on them
+PARSER_MODULES = ("load_data.py", "clean_data.py", "data_helpers.py")
+
+def file_fingerprint(csv_file_loc: str, content_hash: bool = True) -> dict:
+    """
+    Describe a source file by path, modification time, size and (optionally) content hash.
+
+    Args:
+        csv_file_loc (str): Path to the source file.
+        content_hash (bool): Whether to hash the file contents. Hashing reads the whole file.
+
+    Returns:
+        dict: Fingerprint with the keys "path", "mtime_ns", "size" and "sha256".
+    """
+    stat = os.stat(csv_file_loc)
+    fingerprint = {
+        "path": os.path.abspath(csv_file_loc),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": None
+    }
+    if content_hash:
+        digest = hashlib.sha256()
+        with open(csv_file_loc, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["sha256"] = digest.hexdigest()
+
+    return fingerprint
+
+@lru_cache(maxsize=None)
+def source_version(package_dir: str = os.path.dirname(os.path.abspath(__file__)), modules: tuple[str, ...] = None) -> str:
+    """
+    Hash the source of every module in the src package. Memoized results are keyed on it, so
+    results computed by an older version of any analysis code are never reused.
+
+    Args:
+        package_dir (str): Directory of the package, src/ by default.
+        modules (tuple[str, ...]): File names of the modules to hash, or None for all of them.
+
+    Returns:
+        str: Hex digest of the module names and contents.
+    """
+    paths = glob.glob(os.path.join(package_dir, "*.py"))
+    if modules is not None:
+        paths = [path for path in paths if os.path.basename(path) in modules]
+
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()[:16]
+
+def _entry_dir(key: str, cache_dir: str) -> str:
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, name)
+
+def _read_meta(entry_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(entry_dir, "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if meta.get("version") != CACHE_VERSION:
+        return None
+
+    return meta
+
+def _write_meta(entry_dir: str, meta: dict) -> None:
+    tmp_path = os.path.join(entry_dir, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(entry_dir, "meta.json"))
+
+def _is_fresh(meta: dict, csv_file_loc: str, entry_dir: str) -> bool:
+    """
+    Check a cache entry against its source file. A matching mtime and size is trusted as-is;
+    otherwise the content hash decides, so a file that was only touched is not re-parsed. The
+    new mtime of a touched file is recorded, so it is hashed once rather than on every load.
+    """
+    source = meta["source"]
+    current = file_fingerprint(csv_file_loc, content_hash=False)
+    if current["mtime_ns"] == source["mtime_ns"] and current["size"] == source["size"]:
+        return True
+    if current["size"] != source["size"]:
+        return False
+    if file_fingerprint(csv_file_loc)["sha256"] != source["sha256"]:
+        return False
+
+    source["mtime_ns"] = current["mtime_ns"]
+    try:
+        _write_meta(entry_dir, meta)
+    except OSError as e:
+        logger.warning(f"_is_fresh: Could not record the new mtime of {csv_file_loc}: {e}")
+    return True
+
+def store_frame(df: pd.DataFrame, key: str, source: dict, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Write a cleaned, country-indexed dataframe to the cache.
+
+    Float columns are stored together as one float64 .npy array so they can be memory-mapped
+    on load; the index and the remaining (text) columns go into a JSON sidecar.
+
+    Args:
+        df (pd.DataFrame): Cleaned dataframe indexed by country.
+        key (str): Cache key, usually the source path.
+        source (dict): Fingerprint of the source the frame was built from.
+        cache_dir (str): Root directory of the cache.
+
+    Returns:
+        str: The directory the entry was written to.
+    """
+    entry_dir = _entry_dir(key, cache_dir)
+    os.makedirs(entry_dir, exist_ok=True)
+
+    float_columns = [col for col in df.columns if pd.api.types.is_float_dtype(df[col])]
+    text_columns = [col for col in df.columns if col not in float_columns]
+    values = np.ascontiguousarray(df[float_columns].to_numpy(dtype=np.float64))
+
+    meta = {
+        "version": CACHE_VERSION,
+        "key": key,
+        "source": source,
+        "index_name": df.index.name,
+        "index": df.index.tolist(),
+        "columns": list(df.columns),
+        "float_columns": float_columns,
+        "text_columns": {col: df[col].where(df[col].notna(), None).tolist() for col in text_columns}
+    }
+
+    # Write the array before the metadata so a half-written entry is never considered valid
+    np.save(os.path.join(entry_dir, "values.npy"), values)
+    _write_meta(entry_dir, meta)
+
+    return entry_dir
+
+def read_frame(entry_dir: str, meta: dict, mmap: bool = False) -> pd.DataFrame:
+    """
+    Rebuild a dataframe from a cache entry.
+
+    Args:
+        entry_dir (str): Directory of the cache entry.
+        meta (dict): The entry's metadata.
+        mmap (bool): Memory-map the values instead of reading them into memory. The returned
+            frame is then read-only.
+
+    Returns:
+        pd.DataFrame: The cached dataframe with its original column order.
+    """
+    values = np.load(os.path.join(entry_dir, "values.npy"), mmap_mode="r" if mmap else None)
+    index = pd.Index(meta["index"], name=meta["index_name"])
+
+    df = pd.DataFrame(values, index=index, columns=meta["float_columns"], copy=False)
+    # Insert text columns in place rather than reordering, which would copy the float block
+    for col in meta["columns"]:
+        if col in meta["text_columns"]:
+            df.insert(meta["columns"].index(col), col, pd.Series(meta["text_columns"][col], index=index, dtype=object))
+
+    return df
+
+def load_entry(key: str, cache_dir: str = CACHE_DIR, mmap: bool = False) -> tuple[pd.DataFrame, dict] | None:
+    """
+    Read a cache entry by key without checking it against a source file.
+
+    Args:
+        key (str): Cache key the entry was stored under.
+        cache_dir (str): Root directory of the cache.
+        mmap (bool): Memory-map the values instead of reading them into memory.
+
+    Returns:
+        tuple[pd.DataFrame, dict] | None: The cached frame and its metadata, or None if there is no entry.
+    """
+    entry_dir = _entry_dir(key, cache_dir)
+    meta = _read_meta(entry_dir)
+    if meta is None:
+        return None
+
+    return read_frame(entry_dir, meta, mmap=mmap), meta
+
+@instrument
+def load_cached_data(csv_file_loc: str, cache_dir: str = CACHE_DIR, skip_rows: int = 4, mmap: bool = False) -> pd.DataFrame:
+    """
+    Load a World Bank CSV as a cleaned, country-indexed dataframe, using the on-disk cache when
+    the source file has not changed. Equivalent to load_data -> clean_data -> set_country_index.
+
+    Args:
+        csv_file_loc (str): The name and path of the csv file loaded.
+        cache_dir (str): Root directory of the cache.
+        skip_rows (int): The number of rows to skip at the beginning of the csv file.
+        mmap (bool): Memory-map cached values instead of reading them into memory.
+
+    Returns:
+        pd.DataFrame: The cleaned dataframe indexed by country, or None if the file is missing.
+    """
+    if not os.path.exists(csv_file_loc):
+        logger.error(f"load_cached_data: File not found: {csv_file_loc}")
+        return None
+
+    # A different preamble length or parser version yields a different frame from the same file
+    key = f"{os.path.abspath(csv_file_loc)}:skip_rows={skip_rows}:{source_version(modules=PARSER_MODULES)}"
+    entry_dir = _entry_dir(key, cache_dir)
+    meta = _read_meta(entry_dir)
+
+    try:
+        if meta is not None and _is_fresh(meta, csv_file_loc, entry_dir):
+            logger.info(f"Cache hit for {csv_file_loc}")
+            return read_frame(entry_dir, meta, mmap=mmap)
+    except Exception as e:
+        logger.error(f"load_cached_data: Could not read cache entry {entry_dir}: {e}")
+
+    logger.info(f"Cache miss for {csv_file_loc}, parsing source")
+    source = file_fingerprint(csv_file_loc)
+    df = set_country_index(clean_data(load_data(csv_file_loc, skip_rows)))
+
+    try:
+        store_frame(df, key, source, cache_dir)
+    except Exception as e:
+        logger.error(f"load_cached_data: Could not write cache entry {entry_dir}: {e}")
+
+    return df
+
+def clear_cache(cache_dir: str = CACHE_DIR) -> None:
+    """
+    Remove every entry from the cache.
+
+    Args:
+        cache_dir (str): Root directory of the cache.
+    """
+    if not os.path.isdir(cache_dir):
+        return
+
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        if not os.path.isdir(entry_dir):
+            continue
+        for file_name in os.listdir(entry_dir):
+            os.remove(os.path.join(entry_dir, file_name))
+        os.rmdir(entry_dir)
@@ -1,19 +1,40 @@
 import logging
+from typing import TYPE_CHECKING
 import pandas as pd
+from src.imputation import check_imputation, impute_frame
+from src.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from src.metadata import CountryMetadata
 
 logger = logging.getLogger(__name__)
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+@instrument
+def clean_data(df: pd.DataFrame, impute: str | list[str] = None, metadata: "CountryMetadata" = None,
+               by: str = "Region", return_mask: bool = False) -> pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]:
     """
     Clean dataframe assuming the columns are by year. Drops any row missing all year values.
     
     Args:
         df (pd.DataFrame): A pandas dataframe with raw data
+        impute (str | list[str]): Fill the remaining gaps with these methods of
+            src.imputation.IMPUTATION_METHODS ("linear", "ffill", "regional_mean"), or None to
+            leave them missing.
+        metadata (CountryMetadata): Country metadata, required by "regional_mean".
+        by (str): Grouping for "regional_mean": "Region" or "IncomeGroup".
+        return_mask (bool): Also return the boolean frame marking the imputed cells.
         
     Returns:
-        df (pd.DataFrame): The cleaned dataframe
+        df (pd.DataFrame): The cleaned dataframe, and the mask of imputed cells with return_mask
+            (all False without impute)
+
+    Raises:
+        ValueError: For an unknown imputation method, or "regional_mean" without metadata.
     """
-    
+    if impute is not None:
+        check_imputation(impute, metadata is not None)
+
+    mask = None
     try:
         # Extract year columns
         year_columns = [col for col in df.columns if col.isdigit()]
@@ -21,7 +42,11 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         df = df.dropna(subset=year_columns, how="all").copy()
         # Convert all year columns to numeric (float)
         df[year_columns] = df[year_columns].apply(pd.to_numeric, errors="coerce")
+        if impute is not None:
+            df, mask = impute_frame(df, impute, metadata, by)
+        else:
+            mask = pd.DataFrame(False, index=df.index, columns=year_columns)
     except Exception as e:
         logger.error(f"Error cleaning data: {e}")
         
-    return df
\ No newline at end of file
+    return (df, mask) if return_mask else df
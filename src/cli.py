@@ -0,0 +1,167 @@
+import argparse
+import logging
+import os
+import pandas as pd
+from src.cache import load_cached_data
+from src.columnar import FORMATS
+from src.imputation import IMPUTATION_METHODS
+from src.instrumentation import describe
+from src.load_data import read_last_updated
+from src.pipeline import ANALYSES, find_indicator_file, load_config, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ("load", "analyze", "plot", "export")
+
+# Analyses that have a stage of each kind; used when a command is given no analyses
+STAGE_ANALYSES = {
+    "analyze": ["correlation", "regression", "regression_statsmodels", "decomposition", "growth_rates", "rolling_statistics", "bootstrap"],
+    "plot": ["gdp_trends", "correlation", "decomposition", "growth_rates", "rolling_statistics"],
+    "export": ["correlation", "regression", "regression_statsmodels", "rolling_statistics", "bootstrap"]
+}
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for the load, analyze, plot and export subcommands.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", help="JSON pipeline config; the options below override it")
+    common.add_argument("--data-dir", help="Directory holding one subdirectory per indicator")
+    common.add_argument("--cache-dir", help="Root directory of the load and pipeline caches")
+    common.add_argument("--indicators", nargs="+", metavar="ALIAS=CODE", help="Indicators to load, e.g. gdp=NY.GDP.MKTP.CD")
+    common.add_argument("--countries", help="Comma-separated country names")
+    common.add_argument("--regions", help="Comma-separated regions, instead of --countries")
+    common.add_argument("--income-groups", help="Comma-separated income groups, instead of --countries")
+    common.add_argument("--start", type=int, help="First year")
+    common.add_argument("--end", type=int, help="Last year")
+    common.add_argument("--impute", nargs="+", choices=IMPUTATION_METHODS, metavar="METHOD",
+                        help=f"Fill missing years at clean time, in order, with any of {', '.join(IMPUTATION_METHODS)}")
+    common.add_argument("--observed-only", nargs="+", choices=ANALYSES, metavar="ANALYSIS",
+                        help="With --impute, run these analyses on the observed values only")
+    common.add_argument("--format", choices=FORMATS, help="Table format of exported results (default: parquet if pyarrow is installed, else csv)")
+    common.add_argument("--metrics", metavar="PATH", help="Record stage timings to this JSON-lines file")
+    common.add_argument("--trace-memory", action="store_true", help="Also record peak memory per stage")
+
+    parser = argparse.ArgumentParser(prog="main.py", description="Global economic indicators dashboard.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("load", parents=[common], help="Parse and cache the indicator files and summarize them")
+    for command, help_text in (("analyze", "Run analyses and print a summary of each result"),
+                               ("plot", "Render charts to figures/"),
+                               ("export", "Write results to output/; without analyses, export the sliced indicators")):
+        subparser = subparsers.add_parser(command, parents=[common], help=help_text)
+        subparser.add_argument("analyses", nargs="*", metavar="ANALYSIS",
+                               help=f"Any of {', '.join(ANALYSES)}")
+        if command == "plot":
+            subparser.add_argument("--show", action="store_true", help="Display charts instead of only saving them")
+
+    return parser
+
+def config_from_args(args: argparse.Namespace) -> dict:
+    """
+    Merge the command line options into the pipeline config.
+    """
+    config = load_config(args.config)
+    if args.data_dir:
+        config["data_dir"] = args.data_dir
+    if args.cache_dir:
+        config["cache_dir"] = args.cache_dir
+    if args.indicators:
+        config["indicators"] = dict(indicator.split("=", 1) for indicator in args.indicators)
+        aliases = list(config["indicators"])
+        if config["primary"] not in aliases:
+            config["primary"] = aliases[0]
+        if any(alias not in aliases for alias in config["pair"]):
+            config["pair"] = (aliases * 2)[:2]
+    if args.countries:
+        config["countries"] = args.countries.split(",")
+    elif args.regions or args.income_groups:
+        config["countries"] = {key: value.split(",") for key, value in
+                               (("regions", args.regions), ("income_groups", args.income_groups)) if value}
+    if args.start:
+        config["start_year"] = args.start
+    if args.end:
+        config["end_year"] = args.end
+    if args.impute:
+        config["imputation"] = {"method": args.impute, "exclude_from": args.observed_only or []}
+    if args.format:
+        config["export_format"] = args.format
+    if args.metrics:
+        config["instrumentation"] = {"enabled": True, "metrics_path": args.metrics, "trace_memory": args.trace_memory}
+    config["show"] = getattr(args, "show", False)
+    if getattr(args, "analyses", None) is not None:
+        config["analyses"] = args.analyses or STAGE_ANALYSES[args.command]
+
+    return config
+
+def load(config: dict) -> None:
+    for alias, indicator in config["indicators"].items():
+        csv_file_loc = find_indicator_file(config["data_dir"], indicator)
+        df = load_cached_data(csv_file_loc, cache_dir=config["cache_dir"])
+        years = [col for col in df.columns if col.isdigit()]
+        print(f"{alias}: {df['Indicator Name'].iloc[0]} ({indicator}), {len(df)} countries, "
+              f"{years[0]}-{years[-1]}, last updated {read_last_updated(csv_file_loc)}")
+
+def analyze(config: dict) -> None:
+    outputs = run_pipeline(config, kinds=["analyze"])
+    for name, output in outputs.items():
+        if not name.startswith("analyze:"):
+            continue
+        print(f"{name.partition(':')[2]}: {describe(output)}")
+        if isinstance(output, (pd.DataFrame, pd.Series)):
+            print(output.head(10).to_string())
+        print()
+
+def plot(config: dict) -> None:
+    outputs = run_pipeline(config, kinds=["plot"])
+    for name, output in outputs.items():
+        if name.startswith("plot:"):
+            print("\n".join(output) if isinstance(output, list) else output)
+
+def export(config: dict, slices: bool) -> None:
+    if not slices:
+        outputs = run_pipeline(config, kinds=["export"])
+        for name, output in outputs.items():
+            if name.startswith("export:"):
+                print(output)
+        return
+
+    from src.export_utils import export_slice_to_csv
+
+    outputs = run_pipeline(config, kinds=["slice"])
+    for alias in config["indicators"]:
+        output_path = os.path.join("output", f"{alias}_{config['start_year']}_{config['end_year']}.csv")
+        export_slice_to_csv(outputs[f"slice:{alias}"], output_path)
+        print(output_path)
+
+def main(argv: list[str] = None) -> int:
+    """
+    Run one CLI subcommand. Heavy libraries (statsmodels, sklearn, matplotlib, seaborn) are only
+    imported by the stages that need them, so load and slice exports start quickly.
+
+    Args:
+        argv (list[str]): Command line arguments without the program name.
+
+    Returns:
+        int: Process exit status.
+    """
+    args = build_parser().parse_args(argv)
+    config = config_from_args(args)
+    if config["show"] is False and args.command == "plot":
+        from src.render import use_headless_backend
+        use_headless_backend()
+
+    try:
+        if args.command == "load":
+            load(config)
+        elif args.command == "analyze":
+            analyze(config)
+        elif args.command == "plot":
+            plot(config)
+        else:
+            export(config, slices=not args.analyses)
+    except Exception as e:
+        logger.error(f"main: Unexpected error in {args.command}: {e}", exc_info=True)
+        print(f"Error: {e}")
+        return 1
+
+    return 0
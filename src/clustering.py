@@ -0,0 +1,242 @@
+import hashlib
+import logging
+import os
+import numpy as np
+import pandas as pd
+from src.cache import CACHE_DIR
+from src.metadata import CountryMetadata, default_countries
+from src.panel import Panel
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("kmeans", "minibatch_kmeans", "hierarchical")
+METRICS = ("correlation", "dtw", "euclidean")
+
+def trajectory_features(panel: Panel, indicators: list[str] = None, countries: list[str] = None,
+                        start_year: str = None, end_year: str = None, normalize: str = "series",
+                        min_coverage: float = 0.6, metadata: CountryMetadata = None) -> tuple[pd.Index, np.ndarray]:
+    """
+    Build a standardized country x indicator x year trajectory array from a panel.
+
+    Gaps are filled by linear interpolation along years (nearest value at the edges). Countries
+    missing more than 1 - min_coverage of the years for any indicator are dropped.
+
+    Args:
+        panel (Panel): The indicator panel.
+        indicators (list[str]): Indicator codes or names, or None for all.
+        countries (list[str]): Country names, or None for every country except the WDI aggregates.
+        start_year (str): The first year to include.
+        end_year (str): The last year to include.
+        normalize (str): "series" z-scores each country's series of each indicator, so countries
+            are compared by the shape of their trajectories; "feature" z-scores each
+            indicator-year across countries, so levels matter too.
+        min_coverage (float): Minimum fraction of observed years per indicator.
+        metadata (CountryMetadata): Country metadata telling aggregates apart. Required unless
+            countries is given.
+
+    Returns:
+        tuple[pd.Index, np.ndarray]: The kept countries, and their trajectories with shape
+            (countries, years, indicators).
+    """
+    countries = default_countries(panel, countries, metadata)
+    block = panel.array(indicators, countries, start_year, end_year)
+    labels = panel.countries if countries is None else panel.countries[panel.country_positions(countries)]
+    n_indicators, n_countries, n_years = block.shape
+
+    coverage = (~np.isnan(block)).mean(axis=2).min(axis=0)
+    keep = coverage >= min_coverage
+    if not keep.all():
+        logger.info(f"trajectory_features: Dropped {int((~keep).sum())} countries below {min_coverage:.0%} coverage")
+
+    series = block[:, keep].reshape(-1, n_years)
+    series = pd.DataFrame(series).interpolate(axis=1, limit_direction="both").to_numpy()
+    trajectories = series.reshape(n_indicators, int(keep.sum()), n_years).transpose(1, 2, 0)
+
+    if normalize == "series":
+        axis = 1
+    elif normalize == "feature":
+        axis = 0
+    else:
+        raise ValueError(f"Unknown normalization: {normalize}. Expected 'series' or 'feature'")
+
+    mean = trajectories.mean(axis=axis, keepdims=True)
+    std = trajectories.std(axis=axis, keepdims=True)
+    trajectories = np.where(std > 0, (trajectories - mean) / np.where(std > 0, std, 1.0), 0.0)
+
+    return labels[keep], trajectories
+
+def correlation_distances(trajectories: np.ndarray) -> np.ndarray:
+    """
+    1 - Pearson correlation between the flattened trajectories of every pair of countries.
+
+    Args:
+        trajectories (np.ndarray): Array of shape (countries, years, indicators).
+
+    Returns:
+        np.ndarray: Symmetric (countries, countries) distance matrix in [0, 2].
+    """
+    features = trajectories.reshape(len(trajectories), -1)
+    distances = 1.0 - np.corrcoef(features)
+    np.fill_diagonal(distances, 0.0)
+
+    return np.clip(np.nan_to_num(distances, nan=1.0), 0.0, 2.0)
+
+def euclidean_distances(trajectories: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distance between the flattened trajectories of every pair of countries.
+
+    Args:
+        trajectories (np.ndarray): Array of shape (countries, years, indicators).
+
+    Returns:
+        np.ndarray: Symmetric (countries, countries) distance matrix.
+    """
+    features = trajectories.reshape(len(trajectories), -1)
+    squared = (features * features).sum(axis=1)
+    distances = squared[:, None] + squared[None, :] - 2 * features @ features.T
+
+    return np.sqrt(np.clip(distances, 0.0, None))
+
+DTW_MEMORY_BUDGET = 256 * 2**20
+
+def dtw_distances(trajectories: np.ndarray, window: int = None, chunk_size: int = None,
+                  memory_budget: int = DTW_MEMORY_BUDGET) -> np.ndarray:
+    """
+    Multivariate dynamic time warping distance between every pair of countries.
+
+    The local cost is the Euclidean distance across indicators. The dynamic programme runs once
+    over the year grid for a whole chunk of country pairs at a time, so the Python-level loop is
+    years x years per chunk rather than per pair.
+
+    Args:
+        trajectories (np.ndarray): Array of shape (countries, years, indicators).
+        window (int): Sakoe-Chiba band half-width in years, or None for no band.
+        chunk_size (int): Number of country pairs processed together, or None to fit as many as
+            memory_budget allows.
+        memory_budget (int): Approximate bytes a chunk may use. Each pair holds a years x years
+            grid per indicator for the differences, and two more for the cost and the
+            accumulated cost.
+
+    Returns:
+        np.ndarray: Symmetric (countries, countries) distance matrix.
+    """
+    n_countries, n_years, n_indicators = trajectories.shape
+    if chunk_size is None:
+        pair_bytes = ((n_years + 1) ** 2 * (n_indicators + 2)) * 8
+        chunk_size = max(1, memory_budget // pair_bytes)
+    first, second = np.triu_indices(n_countries, k=1)
+    distances = np.zeros((n_countries, n_countries))
+
+    for start in range(0, len(first), chunk_size):
+        a = trajectories[first[start:start + chunk_size]]
+        b = trajectories[second[start:start + chunk_size]]
+        # cost[p, i, j]: distance between year i of a and year j of b for pair p
+        cost = np.sqrt(((a[:, :, None, :] - b[:, None, :, :]) ** 2).sum(axis=3))
+
+        accumulated = np.full((len(a), n_years + 1, n_years + 1), np.inf)
+        accumulated[:, 0, 0] = 0.0
+        for i in range(1, n_years + 1):
+            low = 1 if window is None else max(1, i - window)
+            high = n_years if window is None else min(n_years, i + window)
+            for j in range(low, high + 1):
+                best = np.minimum(np.minimum(accumulated[:, i - 1, j], accumulated[:, i, j - 1]), accumulated[:, i - 1, j - 1])
+                accumulated[:, i, j] = cost[:, i - 1, j - 1] + best
+
+        distances[first[start:start + chunk_size], second[start:start + chunk_size]] = accumulated[:, n_years, n_years]
+
+    return distances + distances.T
+
+def distance_matrix(trajectories: np.ndarray, metric: str = "correlation", cache_dir: str = CACHE_DIR, **kwargs) -> np.ndarray:
+    """
+    Pairwise country distances, cached on disk by a hash of the trajectories and the metric so
+    re-clustering with different settings does not recompute them.
+
+    Args:
+        trajectories (np.ndarray): Array of shape (countries, years, indicators).
+        metric (str): "correlation", "dtw" or "euclidean".
+        cache_dir (str): Root directory of the cache, or None to disable caching.
+        **kwargs: Metric options (window, chunk_size and memory_budget for dtw).
+
+    Returns:
+        np.ndarray: Symmetric (countries, countries) distance matrix.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown distance metric: {metric}. Expected one of {METRICS}")
+
+    path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(np.ascontiguousarray(trajectories).tobytes())
+        digest.update(f"{trajectories.shape}:{metric}:{kwargs.get('window')}".encode())
+        path = os.path.join(cache_dir, "clustering", f"{digest.hexdigest()[:24]}.npy")
+        if os.path.exists(path):
+            logger.info(f"distance_matrix: Reusing cached {metric} distances from {path}")
+            return np.load(path)
+
+    if metric == "correlation":
+        distances = correlation_distances(trajectories)
+    elif metric == "euclidean":
+        distances = euclidean_distances(trajectories)
+    else:
+        distances = dtw_distances(trajectories, **kwargs)
+
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(path, distances)
+
+    return distances
+
+def cluster_countries(panel: Panel, n_clusters: int = 4, method: str = "kmeans", metric: str = "correlation",
+                      indicators: list[str] = None, countries: list[str] = None, start_year: str = None,
+                      end_year: str = None, normalize: str = "series", random_state: int = 0,
+                      cache_dir: str = CACHE_DIR, **kwargs) -> pd.Series:
+    """
+    Group countries by their multi-indicator trajectories.
+
+    k-means variants cluster the standardized trajectories directly. Hierarchical clustering
+    uses average linkage over a precomputed (and disk-cached) distance matrix, so trying several
+    values of n_clusters only pays for the distances once.
+
+    Args:
+        panel (Panel): The indicator panel.
+        n_clusters (int): Number of clusters.
+        method (str): "kmeans", "minibatch_kmeans" or "hierarchical".
+        metric (str): Distance for hierarchical clustering: "correlation", "dtw" or "euclidean".
+        indicators (list[str]): Indicator codes or names, or None for all.
+        countries (list[str]): Country names, or None for every country except the WDI aggregates.
+        start_year (str): The first year to include.
+        end_year (str): The last year to include.
+        normalize (str): "series" or "feature"; see trajectory_features.
+        random_state (int): Seed for the k-means initialisation.
+        cache_dir (str): Root directory of the distance cache, or None to disable it.
+        **kwargs: Passed to trajectory_features (min_coverage, metadata) or the metric (window,
+            chunk_size, memory_budget).
+
+    Returns:
+        pd.Series: Cluster label per country, named "Cluster".
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown clustering method: {method}. Expected one of {METHODS}")
+
+    feature_kwargs = {key: kwargs.pop(key) for key in ("min_coverage", "metadata") if key in kwargs}
+    labels, trajectories = trajectory_features(panel, indicators, countries, start_year, end_year, normalize, **feature_kwargs)
+    if len(labels) < n_clusters:
+        raise ValueError(f"Cannot form {n_clusters} clusters from {len(labels)} countries")
+
+    if method == "hierarchical":
+        from sklearn.cluster import AgglomerativeClustering
+
+        distances = distance_matrix(trajectories, metric, cache_dir, **kwargs)
+        model = AgglomerativeClustering(n_clusters=n_clusters, metric="precomputed", linkage="average")
+        assignments = model.fit_predict(distances)
+    else:
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+
+        features = trajectories.reshape(len(trajectories), -1)
+        if method == "kmeans":
+            model = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state)
+        else:
+            model = MiniBatchKMeans(n_clusters=n_clusters, n_init=3, random_state=random_state)
+        assignments = model.fit_predict(features)
+
+    logger.info(f"Clustered {len(labels)} countries into {n_clusters} clusters with {method}")
+    return pd.Series(assignments, index=labels, name="Cluster")
@@ -0,0 +1,175 @@
+import glob
+import logging
+import os
+import shutil
+from urllib.parse import quote
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("parquet", "feather", "csv")
+
+EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+def has_pyarrow() -> bool:
+    """
+    Whether the optional pyarrow dependency needed for Parquet and Feather is installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
+
+def resolve_format(format: str = None) -> str:
+    """
+    Pick the output format: the requested one, or Parquet when pyarrow is installed and CSV
+    otherwise. Parquet and Feather fall back to CSV, with a warning, when pyarrow is missing.
+
+    Args:
+        format (str): "parquet", "feather", "csv" or None.
+
+    Returns:
+        str: The format to write.
+    """
+    if format is not None and format not in FORMATS:
+        raise ValueError(f"Unknown export format: {format}. Expected one of {FORMATS}")
+    if format == "csv":
+        return format
+    if has_pyarrow():
+        return format or "parquet"
+    if format is not None:
+        logger.warning(f"resolve_format: pyarrow is not installed, writing CSV instead of {format}")
+
+    return "csv"
+
+def output_location(output_path: str, format: str) -> str:
+    """
+    Give an extensionless output path the extension of its format. Paths with a suffix are
+    returned unchanged.
+    """
+    return output_path if os.path.splitext(output_path)[1] else output_path + EXTENSIONS[format]
+
+class _FileWriter:
+    """
+    Appends dataframe batches to one file in one format.
+    """
+
+    def __init__(self, path: str, format: str):
+        self.path = path
+        self.format = format
+        self.writer = None
+        self.schema = None
+        self.rows = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        else:
+            import pyarrow as pa
+
+            if self.writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self.schema = table.schema
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq
+                    self.writer = pq.ParquetWriter(self.path, self.schema, compression="zstd")
+                else:
+                    self.writer = pa.ipc.new_file(self.path, self.schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+            else:
+                # Later batches are cast to the schema of the first, so the file stays typed
+                table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            self.writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.writer = None
+
+class TableWriter:
+    """
+    Streams dataframe batches to Parquet, Feather (Arrow IPC) or CSV as they are produced, so
+    results never have to be collected in memory before they are written.
+
+    With partition_by, rows are split into Hive-style directories (output_path/column=value/),
+    one file per partition value, and the partition column is dropped from the files; readers
+    such as pandas.read_parquet restore it from the directory names. Partitions left by an
+    earlier run are removed first, and missing partition values get a column=nan partition.
+    Parquet and Feather keep the column types of the first batch; later batches are cast to them.
+
+    A table without rows is still written, as a header-only CSV or a schema-only Parquet or
+    Feather file (an empty directory when partitioned), so the returned path always exists.
+
+    Use as a context manager:
+
+        with TableWriter("output/rolling_statistics", "parquet", partition_by="Country") as writer:
+            for batch in batches:
+                writer.write(batch)
+    """
+
+    def __init__(self, output_path: str, format: str = None, partition_by: str = None):
+        self.format = resolve_format(format)
+        self.partition_by = partition_by
+        self.path = output_location(output_path, self.format) if partition_by is None else output_path
+        self.files = {}
+        self.rows = 0
+        # The first empty batch, kept for its columns in case no rows follow
+        self.empty = None
+        if partition_by is not None:
+            for stale in glob.glob(os.path.join(glob.escape(self.path), f"{glob.escape(partition_by)}=*")):
+                shutil.rmtree(stale)
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.finish()
+        self.close()
+
+    def _file(self, key) -> _FileWriter:
+        if key not in self.files:
+            if key is None:
+                path = self.path
+            else:
+                path = os.path.join(self.path, f"{self.partition_by}={quote(str(key), safe='')}", f"part-0{EXTENSIONS[self.format]}")
+            self.files[key] = _FileWriter(path, self.format)
+        return self.files[key]
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append a batch of rows.
+
+        Args:
+            df (pd.DataFrame): The batch. Its index is not written; reset it first to keep it.
+        """
+        if df.empty:
+            if self.empty is None:
+                self.empty = df
+            return
+        if self.partition_by is None:
+            self._file(None).write(df)
+        else:
+            for key, rows in df.groupby(self.partition_by, sort=False, observed=True, dropna=False):
+                self._file(key).write(rows.drop(columns=self.partition_by))
+        self.rows += len(df)
+
+    def finish(self) -> None:
+        """
+        Make sure the output exists even if no rows were written. Called on a clean exit from
+        the context manager.
+        """
+        if self.files:
+            return
+        if self.partition_by is not None:
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            self._file(None).write(self.empty if self.empty is not None else pd.DataFrame())
+
+    def close(self) -> None:
+        for writer in self.files.values():
+            writer.close()
+        logger.info(f"Wrote {self.rows} rows to {self.path} ({self.format}, {len(self.files)} files)")
@@ -0,0 +1,280 @@
+import logging
+import warnings
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from src.metadata import CountryMetadata, default_countries
+from src.panel import Panel
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("pearson", "spearman")
+
+def rank_observations(data: np.ndarray) -> np.ndarray:
+    """
+    Replace values with their average ranks along the observation axis, leaving NaNs in place.
+
+    Args:
+        data (np.ndarray): Array of shape (groups, observations, variables).
+
+    Returns:
+        np.ndarray: Ranks with the same shape as data.
+    """
+    groups, observations, variables = data.shape
+    flat = data.transpose(1, 0, 2).reshape(observations, groups * variables)
+    ranks = pd.DataFrame(flat).rank(axis=0, method="average").to_numpy()
+
+    return ranks.reshape(observations, groups, variables).transpose(1, 0, 2)
+
+def pairwise_correlation(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson correlation between every variable of a and every variable of b, per group, using
+    pairwise-complete observations.
+
+    All sums are taken with matrix products over NaN-zeroed values and presence masks, so every
+    pair only sees the observations both variables have.
+
+    Args:
+        a (np.ndarray): Array of shape (groups, observations, p).
+        b (np.ndarray): Array of shape (groups, observations, q).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Correlations and observation counts, both (groups, p, q).
+    """
+    # Correlation is shift-invariant; centring first keeps the sums small and well-conditioned
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        a = a - np.nanmean(a, axis=1, keepdims=True)
+        b = b - np.nanmean(b, axis=1, keepdims=True)
+
+    mask_a = ~np.isnan(a)
+    mask_b = ~np.isnan(b)
+    a0 = np.where(mask_a, a, 0.0)
+    b0 = np.where(mask_b, b, 0.0)
+    ma = mask_a.astype(np.float64).transpose(0, 2, 1)
+    mb = mask_b.astype(np.float64)
+    a0_t = a0.transpose(0, 2, 1)
+
+    n = ma @ mb
+    sum_a = a0_t @ mb
+    sum_b = ma @ b0
+    sum_aa = (a0_t * a0_t) @ mb
+    sum_bb = ma @ (b0 * b0)
+    sum_ab = a0_t @ b0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_ab - sum_a * sum_b / n
+        var_a = sum_aa - sum_a * sum_a / n
+        var_b = sum_bb - sum_b * sum_b / n
+        r = cov / np.sqrt(var_a * var_b)
+
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+def _average_rank_scores(values: np.ndarray) -> np.ndarray:
+    # scores[i, k, l] is 1 where observation l of variable i is below observation k, 0.5 where it
+    # ties and 0 otherwise (also where either is NaN); summed over the observations a pair has,
+    # plus 0.5, they give the average rank of k among them
+    below = values[:, None, :] < values[:, :, None]
+    tied = values[:, None, :] == values[:, :, None]
+    return below + 0.5 * tied
+
+def pairwise_spearman(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Spearman correlation between every variable of a and every variable of b, per group, using
+    pairwise-complete observations, as DataFrame.corr(method="spearman") does: each pair is
+    ranked within the observations both variables have.
+
+    The ranks of every variable within the mask of every partner are taken together as one
+    matrix product per group, so memory is about p * q * observations floats per group.
+
+    Args:
+        a (np.ndarray): Array of shape (groups, observations, p).
+        b (np.ndarray): Array of shape (groups, observations, q).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Correlations and observation counts, both (groups, p, q).
+    """
+    groups, observations, p = a.shape
+    q = b.shape[2]
+    r = np.empty((groups, p, q))
+    n = np.empty((groups, p, q), dtype=np.int64)
+
+    for group in range(groups):
+        x = a[group].T
+        y = b[group].T
+        mask_x = (~np.isnan(x)).astype(np.float64)
+        mask_y = (~np.isnan(y)).astype(np.float64)
+        # rank_x[i, j, k]: rank of observation k of x_i among the observations x_i shares with y_j
+        rank_x = (_average_rank_scores(x).reshape(p * observations, observations) @ mask_y.T).reshape(p, observations, q)
+        rank_x = rank_x.transpose(0, 2, 1) + 0.5
+        rank_y = (_average_rank_scores(y).reshape(q * observations, observations) @ mask_x.T).reshape(q, observations, p)
+        rank_y = rank_y.transpose(2, 0, 1) + 0.5
+        both = mask_x[:, None, :] * mask_y[None, :, :]
+
+        count = both.sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_x = (both * rank_x).sum(axis=2) / count
+            mean_y = (both * rank_y).sum(axis=2) / count
+            dx = both * (rank_x - mean_x[..., None])
+            dy = both * (rank_y - mean_y[..., None])
+            r[group] = (dx * dy).sum(axis=2) / np.sqrt((dx * dx).sum(axis=2) * (dy * dy).sum(axis=2))
+        n[group] = count
+
+    return np.clip(r, -1.0, 1.0), n
+
+def _correlation_block(data: np.ndarray, start: int, stop: int, min_periods: int, method: str = "pearson") -> tuple[np.ndarray, ...]:
+    # Correlate every variable against variables [start, stop) and keep the upper triangle only
+    if method == "spearman" and np.isnan(data).any():
+        r, n = pairwise_spearman(data, data[:, :, start:stop])
+    else:
+        if method == "spearman":
+            # Without gaps every pair shares all observations, so ranking each variable once is exact
+            data = rank_observations(data)
+        r, n = pairwise_correlation(data, data[:, :, start:stop])
+    g, i, j = np.indices(r.shape).reshape(3, -1)
+    j = j + start
+    keep = (i < j) & (n.reshape(-1) >= min_periods) & ~np.isnan(r.reshape(-1))
+
+    return g[keep], i[keep], j[keep], n.reshape(-1)[keep], r.reshape(-1)[keep]
+
+def _block_frame(part: tuple[np.ndarray, ...], offset: int, group_labels: pd.Index, variable_labels: pd.Index) -> pd.DataFrame:
+    g, i, j, n, r = part
+    return pd.DataFrame({
+        "Group": pd.Categorical.from_codes(g + offset, categories=group_labels),
+        "Variable A": pd.Categorical.from_codes(i, categories=variable_labels),
+        "Variable B": pd.Categorical.from_codes(j, categories=variable_labels),
+        "Observations": n.astype(np.int32),
+        "Correlation": r
+    })
+
+def correlation_blocks(data: np.ndarray, group_labels: pd.Index, variable_labels: pd.Index,
+                       method: str = "pearson", chunk_size: int = 64, block_size: int = 256,
+                       min_periods: int = 3, n_jobs: int = 1) -> Iterator[pd.DataFrame]:
+    """
+    All-pairs correlation of the variables within each group, yielded in long format one block
+    at a time, so results can be written out as they are computed.
+
+    Work is split into chunks of groups and blocks of variables, so memory is bounded by
+    roughly chunk_size * variables * block_size floats regardless of the problem size (times
+    two blocks per worker with n_jobs > 1). Spearman
+    on data with gaps re-ranks every pair within the observations it shares, which takes about
+    variables * block_size * observations floats per group.
+
+    Args:
+        data (np.ndarray): Array of shape (groups, observations, variables).
+        group_labels (pd.Index): Labels for the group axis.
+        variable_labels (pd.Index): Labels for the variable axis.
+        method (str): "pearson" or "spearman".
+        chunk_size (int): Number of groups processed together.
+        block_size (int): Number of variables correlated against all others at once.
+        min_periods (int): Minimum pairwise-complete observations for a correlation to be kept.
+        n_jobs (int): Number of worker processes. 1 runs in-process.
+
+    Yields:
+        pd.DataFrame: One row per group and variable pair (a < b) with the columns "Group",
+            "Variable A", "Variable B", "Observations" and "Correlation". Label columns are
+            categoricals sharing the full label set, so blocks concatenate cheaply.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method: {method}. Expected one of {METHODS}")
+
+    data = np.asarray(data, dtype=np.float64)
+
+    groups, _, variables = data.shape
+    tasks = [(g0, min(g0 + chunk_size, groups), v0, min(v0 + block_size, variables))
+             for g0 in range(0, groups, chunk_size) for v0 in range(0, variables, block_size)]
+
+    if n_jobs > 1:
+        # Keep at most two blocks per worker in flight, so pickled inputs and pending results
+        # stay bounded as well; blocks are yielded in task order as they complete
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            for g0, g1, v0, v1 in tasks:
+                if len(pending) == 2 * n_jobs:
+                    offset, future = pending.popleft()
+                    yield _block_frame(future.result(), offset, group_labels, variable_labels)
+                pending.append((g0, executor.submit(_correlation_block, data[g0:g1], v0, v1, min_periods, method)))
+            while pending:
+                offset, future = pending.popleft()
+                yield _block_frame(future.result(), offset, group_labels, variable_labels)
+    else:
+        for g0, g1, v0, v1 in tasks:
+            yield _block_frame(_correlation_block(data[g0:g1], v0, v1, min_periods, method), g0, group_labels, variable_labels)
+
+def correlation_matrix_long(data: np.ndarray, group_labels: pd.Index, variable_labels: pd.Index,
+                            method: str = "pearson", chunk_size: int = 64, block_size: int = 256,
+                            min_periods: int = 3, n_jobs: int = 1) -> pd.DataFrame:
+    """
+    All-pairs correlation of the variables within each group, returned in long format. Collects
+    the blocks of correlation_blocks; see there for the arguments.
+
+    Returns:
+        pd.DataFrame: One row per group and variable pair (a < b) with the columns "Group",
+            "Variable A", "Variable B", "Observations" and "Correlation".
+    """
+    blocks = list(correlation_blocks(data, group_labels, variable_labels, method, chunk_size, block_size, min_periods, n_jobs))
+    if not blocks:
+        empty = np.array([], dtype=np.int64)
+        return _block_frame((empty, empty, empty, empty, empty.astype(np.float64)), 0, group_labels, variable_labels)
+
+    return pd.concat(blocks, ignore_index=True)
+
+def indicator_correlations(panel: Panel, indicators: list[str] = None, countries: list[str] = None,
+                           start_year: str = None, end_year: str = None, **kwargs) -> pd.DataFrame:
+    """
+    Correlate every pair of indicators over time, separately for every country.
+
+    Args:
+        panel (Panel): The indicator panel.
+        indicators (list[str]): Indicator codes or names, or None for all.
+        countries (list[str]): Country names, or None for all.
+        start_year (str): The first year to include.
+        end_year (str): The last year to include.
+        **kwargs: Passed to correlation_matrix_long (method, chunk_size, min_periods, n_jobs, ...).
+
+    Returns:
+        pd.DataFrame: Long-format correlations with the columns "Country", "Indicator A",
+            "Indicator B", "Observations" and "Correlation".
+    """
+    block = panel.array(indicators, countries, start_year, end_year)
+    indicator_labels = panel.indicators if indicators is None else panel.indicators[[panel.indicator_position(i) for i in indicators]]
+    country_labels = panel.countries if countries is None else panel.countries[panel.country_positions(countries)]
+
+    # (indicators, countries, years) -> (countries, years, indicators)
+    result = correlation_matrix_long(block.transpose(1, 2, 0), country_labels, indicator_labels, **kwargs)
+    logger.info(f"Computed {len(result)} indicator pair correlations across {len(country_labels)} countries")
+
+    return result.rename(columns={"Group": "Country", "Variable A": "Indicator A", "Variable B": "Indicator B"})
+
+def cross_country_correlations(panel: Panel, indicators: list[str] = None, countries: list[str] = None,
+                               start_year: str = None, end_year: str = None, metadata: CountryMetadata = None,
+                               **kwargs) -> pd.DataFrame:
+    """
+    Correlate every pair of countries over time, separately for every indicator.
+
+    Args:
+        panel (Panel): The indicator panel.
+        indicators (list[str]): Indicator codes or names, or None for all.
+        countries (list[str]): Country names, or None for every country except the WDI aggregates.
+        start_year (str): The first year to include.
+        end_year (str): The last year to include.
+        metadata (CountryMetadata): Country metadata telling aggregates apart. Required unless
+            countries is given.
+        **kwargs: Passed to correlation_matrix_long (method, chunk_size, min_periods, n_jobs, ...).
+
+    Returns:
+        pd.DataFrame: Long-format correlations with the columns "Indicator", "Country A",
+            "Country B", "Observations" and "Correlation".
+    """
+    countries = default_countries(panel, countries, metadata)
+    block = panel.array(indicators, countries, start_year, end_year)
+    indicator_labels = panel.indicators if indicators is None else panel.indicators[[panel.indicator_position(i) for i in indicators]]
+    country_labels = panel.countries if countries is None else panel.countries[panel.country_positions(countries)]
+
+    # (indicators, countries, years) -> (indicators, years, countries)
+    result = correlation_matrix_long(block.transpose(0, 2, 1), indicator_labels, country_labels, **kwargs)
+    logger.info(f"Computed {len(result)} country pair correlations across {len(indicator_labels)} indicators")
+
+    return result.rename(columns={"Group": "Indicator", "Variable A": "Country A", "Variable B": "Country B"})
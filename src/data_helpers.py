@@ -1,14 +1,18 @@
 import logging
 import pandas as pd
+from src.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
+@instrument
 def slice_dataframe(df: pd.DataFrame, countries: list, start_year: str, end_year: str) -> pd.DataFrame:
     try:
-        return df.loc[countries, str(start_year):str(end_year)].copy()
+        # Selecting rows by label list already gathers a new frame, so no extra copy is needed
+        return df.loc[countries, str(start_year):str(end_year)]
     except Exception as e:
         logger.error(f"slice_dataframe: Unexpected error: {e}")
         
+@instrument
 def prepare_plot_data(df: pd.DataFrame, countries: list, start_year: str, end_year: str):
     """
         Prepare data for matplotlib
@@ -23,7 +27,7 @@ def prepare_plot_data(df: pd.DataFrame, countries: list, start_year: str, end_ye
         pd.DataFrame: A new dataframe prepped for matplotlib.
     """
     try:
-        df_plot = df.loc[countries, start_year:end_year].copy()
+        df_plot = df.loc[countries, start_year:end_year]
         df_plot.columns = [int(col) for col in df_plot.columns]
         return df_plot
     except KeyError as e:
@@ -36,6 +40,22 @@ def prepare_plot_data(df: pd.DataFrame, countries: list, start_year: str, end_ye
         logger.error(f"prepare_plot_data: Unexpected error {e}")
         raise
 
+def to_numeric_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce every column of a dataframe to numeric, skipping the work when it already is.
+
+    Args:
+        df (pd.DataFrame): Pandas dataframe.
+
+    Returns:
+        pd.DataFrame: The same dataframe if all columns are numeric, otherwise a coerced copy.
+    """
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        return df
+
+    return df.apply(pd.to_numeric, errors="coerce")
+
+@instrument
 def set_country_index(df: pd.DataFrame) -> pd.DataFrame:
     """
     Set the index of a dataframe to the country column
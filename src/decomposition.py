@@ -0,0 +1,215 @@
+import logging
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from src.data_helpers import to_numeric_frame
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("moving_average", "hp", "loess")
+
+def moving_average_trend(values: np.ndarray, window: int = 3) -> np.ndarray:
+    """
+    Centred moving-average trend along the last axis of a 2-D array, for every row at once.
+
+    Uses the same filter as statsmodels' seasonal_decompose: equal weights for an odd window,
+    and half weights on the two end points for an even one. Years without a full window, or
+    whose window contains NaN, are NaN.
+
+    Args:
+        values (np.ndarray): Array of shape (rows, years).
+        window (int): Window length in years.
+
+    Returns:
+        np.ndarray: Trend with the same shape as values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window % 2:
+        weights = np.full(window, 1.0 / window)
+    else:
+        weights = np.r_[0.5, np.ones(window - 1), 0.5] / window
+
+    length = len(weights)
+    trend = np.full(values.shape, np.nan)
+    if length > values.shape[-1]:
+        return trend
+
+    windows = np.lib.stride_tricks.sliding_window_view(values, length, axis=-1)
+    offset = length // 2
+    trend[:, offset:offset + windows.shape[1]] = windows @ weights
+
+    return trend
+
+def hp_filter_trend(values: np.ndarray, lamb: float = 100.0) -> np.ndarray:
+    """
+    Hodrick-Prescott trend along the last axis of a 2-D array, for every row at once.
+
+    Each row solves (W + lamb * D'D) trend = W y, where D is the second-difference operator and W
+    masks out missing years, so gaps are bridged by the smoothness penalty. All rows are solved
+    in one batched linear solve. Rows with fewer than three observations are NaN.
+
+    Args:
+        values (np.ndarray): Array of shape (rows, years).
+        lamb (float): Smoothing parameter. 100 is the usual choice for annual data.
+
+    Returns:
+        np.ndarray: Trend with the same shape as values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, n_years = values.shape
+    trend = np.full(values.shape, np.nan)
+    if n_years < 3:
+        return trend
+
+    mask = ~np.isnan(values)
+    second_diff = np.diff(np.eye(n_years), n=2, axis=0)
+    penalty = lamb * second_diff.T @ second_diff
+
+    system = penalty[None, :, :] + mask[:, :, None] * np.eye(n_years)[None, :, :]
+    rhs = np.where(mask, values, 0.0)
+    valid = mask.sum(axis=1) >= 3
+    trend[valid] = np.linalg.solve(system[valid], rhs[valid][:, :, None])[:, :, 0]
+
+    return trend
+
+def loess_trend(values: np.ndarray, frac: float = 0.5) -> np.ndarray:
+    """
+    LOESS trend (locally weighted linear regression with tricube weights) along the last axis of
+    a 2-D array, for every row at once.
+
+    For each year, the nearest int(frac * observations) observed years of the row are used. All
+    weighted sums are computed as one (rows, years, years) array operation. Rows with fewer than
+    three observations are NaN.
+
+    Args:
+        values (np.ndarray): Array of shape (rows, years).
+        frac (float): Fraction of each row's observations used for every local fit.
+
+    Returns:
+        np.ndarray: Trend with the same shape as values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, n_years = values.shape
+    mask = ~np.isnan(values)
+    counts = mask.sum(axis=1)
+    x = np.arange(n_years, dtype=np.float64)
+
+    # distances[r, i, j]: distance from year i to observed year j of row r
+    distances = np.where(mask[:, None, :], np.abs(x[:, None] - x[None, :])[None, :, :], np.inf)
+    k = np.clip((frac * counts + 1e-10).astype(np.int64), 2, n_years)
+    bandwidth = np.take_along_axis(np.sort(distances, axis=2), (k - 1)[:, None, None].repeat(n_years, axis=1), axis=2)
+    bandwidth = np.maximum(bandwidth, 1e-12) * 1.000001
+
+    with np.errstate(invalid="ignore"):
+        weights = np.clip(1 - (distances / bandwidth) ** 3, 0, None) ** 3
+    weights = np.where(mask[:, None, :], weights, 0.0)
+
+    y = np.where(mask, values, 0.0)
+    s0 = weights.sum(axis=2)
+    s1 = weights @ x
+    s2 = weights @ (x * x)
+    t0 = np.einsum("rij,rj->ri", weights, y)
+    t1 = np.einsum("rij,rj->ri", weights, y * x)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        determinant = s0 * s2 - s1 * s1
+        slope = (s0 * t1 - s1 * t0) / determinant
+        intercept = (t0 - slope * s1) / s0
+        trend = intercept + slope * x[None, :]
+        # Only one distinct year in the neighbourhood: fall back to the weighted mean
+        trend = np.where(np.abs(determinant) > 1e-12, trend, t0 / s0)
+
+    trend[counts < 3] = np.nan
+    return trend
+
+@dataclass
+class Decomposition:
+    """
+    Trend/residual decomposition for many countries, stored as compact 2-D arrays.
+
+    Annual data has no seasonal component, so it is not stored; DecomposeResult objects are only
+    built for the countries that ask for one.
+
+    Attributes:
+        countries (pd.Index): Country names, one per row.
+        years (np.ndarray): Years, one per column.
+        observed (np.ndarray): Observed values, shape (countries, years).
+        trend (np.ndarray): Trend component.
+        resid (np.ndarray): Residual component (observed - trend).
+        method (str): The trend method used.
+    """
+    countries: pd.Index
+    years: np.ndarray
+    observed: np.ndarray
+    trend: np.ndarray
+    resid: np.ndarray
+    method: str
+
+    def frame(self, component: str) -> pd.DataFrame:
+        """
+        Return one component for all countries as a country x year dataframe.
+        """
+        return pd.DataFrame(getattr(self, component), index=self.countries, columns=self.years)
+
+    def components(self, country: str) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Return the years and the observed, trend, seasonal and residual arrays of one country.
+        """
+        row = self.countries.get_loc(country)
+        return self.years, {
+            "observed": self.observed[row],
+            "trend": self.trend[row],
+            "seasonal": np.zeros(len(self.years)),
+            "resid": self.resid[row]
+        }
+
+    def result(self, country: str):
+        """
+        Materialize a statsmodels DecomposeResult for one country.
+        """
+        from statsmodels.tsa.seasonal import DecomposeResult
+
+        years, components = self.components(country)
+        index = pd.to_datetime(years.astype(str), format="%Y")
+        series = {name: pd.Series(values, index=index, name=name) for name, values in components.items()}
+        return DecomposeResult(series["observed"], series["seasonal"], series["trend"], series["resid"])
+
+def batch_decomposition(df: pd.DataFrame, start_date: str = None, end_date: str = None, method: str = "moving_average",
+                        window: int = 3, lamb: float = 100.0, frac: float = 0.5) -> Decomposition:
+    """
+    Decompose every row of a country x year frame into trend and residual in one array operation.
+
+    Args:
+        df (pd.DataFrame): Indicator values (index: countries, columns: years).
+        start_date (str): The first year of the range.
+        end_date (str): The last year of the range.
+        method (str): "moving_average", "hp" (Hodrick-Prescott) or "loess".
+        window (int): Moving-average window in years.
+        lamb (float): Hodrick-Prescott smoothing parameter.
+        frac (float): LOESS neighbourhood as a fraction of each row's observations.
+
+    Returns:
+        Decomposition: The decomposition of every row.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown decomposition method: {method}. Expected one of {METHODS}")
+
+    df = df.loc[:, start_date:end_date]
+    observed = to_numeric_frame(df).to_numpy(dtype=np.float64)
+
+    if method == "moving_average":
+        trend = moving_average_trend(observed, window)
+    elif method == "hp":
+        trend = hp_filter_trend(observed, lamb)
+    else:
+        trend = loess_trend(observed, frac)
+
+    logger.info(f"Decomposed {len(df.index)} series with method {method}")
+    return Decomposition(
+        countries=df.index,
+        years=np.array([int(year) for year in df.columns]),
+        observed=observed,
+        trend=trend,
+        resid=observed - trend,
+        method=method
+    )
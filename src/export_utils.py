@@ -1,52 +1,217 @@
 
+from collections.abc import Iterable
+import numpy as np
 import pandas as pd
 import logging
 import os
+from src.columnar import TableWriter
+from src.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
+@instrument
 def export_correlation_to_csv(correlations: pd.Series, output_path: str = "output/correlation_results.csv") -> None:
     try:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        correlations.name = "Correlation Coefficient"
-        correlations.to_csv(output_path, header=True)
+        correlations.rename("Correlation Coefficient").to_csv(output_path, header=True)
         logger.info(f"Correlation results exported to {output_path}")
     except Exception as e:
         logger.error(f"export_correlation_to_csv: Unexpected error: {e}")
         
-def write_to_file(output_path: str, output_lines: list):
-    # Write to file
+@instrument
+def export_slice_to_csv(df: pd.DataFrame, output_path: str) -> None:
+    """
+    Export a country x year slice of an indicator as CSV.
+
+    Args:
+        df (pd.DataFrame): Indicator values (index: countries, columns: years).
+        output_path (str): Destination file.
+    """
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        df.to_csv(output_path, header=True)
+        logger.info(f"Slice of {len(df)} countries exported to {output_path}")
+    except Exception as e:
+        logger.error(f"export_slice_to_csv: Unexpected error: {e}")
+
+@instrument
+def export_table(batches: pd.DataFrame | Iterable[pd.DataFrame], output_path: str, format: str = None,
+                 partition_by: str = None) -> str:
+    """
+    Write a table, or a stream of batches of it, as typed Parquet or Feather, or as CSV.
+
+    Batches are written as they arrive, so a generator of results is never collected in memory.
+
+    Args:
+        batches (pd.DataFrame | Iterable[pd.DataFrame]): The table, or its batches.
+        output_path (str): Destination file, or directory when partitioned. Without a suffix the
+            format's extension is added.
+        format (str): "parquet", "feather" or "csv". Defaults to Parquet when pyarrow is
+            installed and CSV otherwise.
+        partition_by (str): Column to split the output by into column=value directories.
+
+    Returns:
+        str: The path written, or None on failure.
+    """
+    try:
+        with TableWriter(output_path, format, partition_by) as writer:
+            for batch in ([batches] if isinstance(batches, pd.DataFrame) else batches):
+                writer.write(batch)
+        logger.info(f"{writer.rows} rows exported to {writer.path}")
+        return writer.path
+    except Exception as e:
+        logger.error(f"export_table: Unexpected error: {e}")
+        return None
+
+@instrument
+def export_correlation_table(correlations: pd.Series, output_path: str = "output/correlation_results", format: str = None) -> str:
+    """
+    Export per-country correlations (from correlation_analysis) with the columns "Country" and
+    "Correlation Coefficient".
+
+    Args:
+        correlations (pd.Series): Correlation per country.
+        output_path (str): Destination file; see export_table.
+        format (str): "parquet", "feather" or "csv".
+
+    Returns:
+        str: The path written, or None on failure.
+    """
+    return export_table(correlations.rename("Correlation Coefficient").rename_axis("Country").reset_index(), output_path, format)
+
+@instrument
+def export_correlation_matrix(correlations: pd.DataFrame | Iterable[pd.DataFrame], output_path: str = "output/correlation_matrix",
+                              format: str = None, partition_by: str = None) -> str:
+    """
+    Export long-format pairwise correlations (from src.correlation).
+
+    Args:
+        correlations (pd.DataFrame | Iterable[pd.DataFrame]): One row per pair, as returned by
+            correlation_matrix_long, or the blocks yielded by correlation_blocks, which are then
+            written as they are computed.
+        output_path (str): Destination file or directory; see export_table.
+        format (str): "parquet", "feather" or "csv".
+        partition_by (str): Column to partition by, e.g. "Group".
+
+    Returns:
+        str: The path written, or None on failure.
+    """
+    return export_table(correlations, output_path, format, partition_by)
+
+def regression_frame(countries_data: dict | pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn regression results into one typed row per country.
+
+    Args:
+        countries_data (dict | pd.DataFrame): Output of linear_regression_sklearn (a dict of
+            dicts), linear_regression_table, or linear_regression_statsmodels with lazy=True
+            (a dict of OLSResult or, for countries whose fit failed, the error message).
+
+    Returns:
+        pd.DataFrame: A "Country" column followed by the fitted statistics. Statsmodels results
+            add an "error" column, set for the countries whose fit failed.
+    """
+    if isinstance(countries_data, pd.DataFrame):
+        return countries_data.rename_axis("Country").reset_index()
+
+    rows = {}
+    errors = None
+    for country, result in countries_data.items():
+        if isinstance(result, dict):
+            rows[country] = result
+            continue
+
+        errors = {} if errors is None else errors
+        if hasattr(result, "params"):
+            rows[country] = {
+                "intercept": result.params[0], "slope": result.params[1],
+                "intercept_se": result.bse[0], "slope_se": result.bse[1],
+                "intercept_pvalue": result.pvalues[0], "slope_pvalue": result.pvalues[1],
+                "r2": result.rsquared
+            }
+        else:
+            # A failed fit keeps its row, with the error in place of the statistics
+            rows[country] = {}
+            errors[country] = str(result).strip()
+
+    frame = pd.DataFrame.from_dict(rows, orient="index", dtype=np.float64).reindex(list(rows))
+    if errors is not None:
+        frame["error"] = pd.Series(errors, index=frame.index, dtype=object)
+
+    return frame.rename_axis("Country").reset_index()
+
+@instrument
+def export_regression_table(countries_data: dict | pd.DataFrame, output_path: str = "output/regression", format: str = None) -> str:
+    """
+    Export regression results as a typed table with one row per country.
+
+    Args:
+        countries_data (dict | pd.DataFrame): Regression results; see regression_frame.
+        output_path (str): Destination file; see export_table.
+        format (str): "parquet", "feather" or "csv".
+
+    Returns:
+        str: The path written, or None on failure.
+    """
+    return export_table(regression_frame(countries_data), output_path, format)
+
+def write_to_file(output_path: str, output_lines: Iterable[str]):
+    # Lines are written as they are produced, so a generator is never collected in memory
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     with open(output_path, "w") as f:
         f.writelines(output_lines)
-    pass
 
-def export_rolling_stats_to_csv(countries_stats: dict) -> None:
-    print("export to csv")
-    
-def export_linear_regression_sklearn_table(countries_data: dict, output_path: str) -> None:
-    output_lines = []
+@instrument
+def export_rolling_stats(countries_stats: pd.DataFrame | dict, output_path: str = "output/rolling_statistics",
+                         format: str = None, partition_by: str = None) -> str:
+    """
+    Export rolling statistics in long format, one row per country and year.
+
+    Args:
+        countries_stats (pd.DataFrame | dict): Output of rolling_statistics.
+        output_path (str): Destination file or directory; see export_table.
+        format (str): "parquet", "feather" or "csv".
+        partition_by (str): Column to partition by, e.g. "Country".
+
+    Returns:
+        str: The path written, or None on failure.
+    """
+    from src.analysis_utils import format_stats_as_dataframe
+
+    return export_table(format_stats_as_dataframe(countries_stats), output_path, format, partition_by)
+
+@instrument
+def export_rolling_stats_to_csv(countries_stats: pd.DataFrame | dict, output_path: str = "output/rolling_statistics.csv") -> str:
+    """
+    Export rolling statistics as CSV. See export_rolling_stats.
+
+    Args:
+        countries_stats (pd.DataFrame | dict): Output of rolling_statistics.
+        output_path (str): Destination file.
+
+    Returns:
+        str: The path written, or None on failure.
+    """
+    return export_rolling_stats(countries_stats, output_path, format="csv")
     
+def _sklearn_lines(countries_data: dict):
     for country, data in countries_data.items():
+        yield (f"{country}:\n"
+               f"  Slope     = {data['slope']:.3f}\n"
+               f"  Intercept = {data['intercept']:.2f}\n"
+               f"  R² Score  = {data['r2']:.3f}\n"
+               f"  MSE       = {data['mse']:.2f}\n")
 
-        slope = data["slope"]
-        intercept = data["intercept"]
-        r2 = data["r2"]
-        mse = data["mse"]
+@instrument
+def export_linear_regression_sklearn_table(countries_data: dict, output_path: str) -> None:
+    write_to_file(output_path, _sklearn_lines(countries_data))
 
-        output_lines.append(f"{country}:\n")
-        output_lines.append(f"  Slope     = {slope:.3f}\n")
-        output_lines.append(f"  Intercept = {intercept:.2f}\n")
-        output_lines.append(f"  R² Score  = {r2:.3f}\n")
-        output_lines.append(f"  MSE       = {mse:.2f}\n")
-        
-    write_to_file(output_path, output_lines)
+def _statsmodels_lines(countries_data: dict):
+    for country, result in countries_data.items():
+        yield f"{country}\n"
+        # Lazy OLSResult objects render their full summary only here, one country at a time
+        yield str(result)
 
+@instrument
 def export_linear_regression_statsmodels_table(countries_data: dict, output_path: str) -> None:
-    output_lines = []
-    
-    for country in countries_data:
-        output_lines.append(f"{country}\n")
-        output_lines.append(countries_data[country])
-        
-    write_to_file(output_path, output_lines)
-    
\ No newline at end of file
+    write_to_file(output_path, _statsmodels_lines(countries_data))
@@ -0,0 +1,238 @@
+import logging
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from src.metadata import CountryMetadata
+    from src.panel import Panel
+
+logger = logging.getLogger(__name__)
+
+IMPUTATION_METHODS = ("linear", "ffill", "regional_mean")
+
+def _neighbours(valid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Position of the nearest observed year at or before, and at or after, every year of a 2-D
+    array; -1 and n_years where there is none.
+    """
+    n_years = valid.shape[1]
+    positions = np.arange(n_years)
+    previous = np.maximum.accumulate(np.where(valid, positions, -1), axis=1)
+    following = np.minimum.accumulate(np.where(valid, positions, n_years)[:, ::-1], axis=1)[:, ::-1]
+    return previous, following
+
+def _linear(values: np.ndarray, fill_edges: bool) -> np.ndarray:
+    valid = ~np.isnan(values)
+    n_years = values.shape[1]
+    previous, following = _neighbours(valid)
+    before = np.take_along_axis(values, np.clip(previous, 0, n_years - 1), axis=1)
+    after = np.take_along_axis(values, np.clip(following, 0, n_years - 1), axis=1)
+
+    has_before = previous >= 0
+    has_after = following < n_years
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = (np.arange(n_years) - previous) / (following - previous)
+        interpolated = before + (after - before) * weight
+
+    result = np.where(~valid & has_before & has_after, interpolated, values)
+    if fill_edges:
+        result = np.where(~valid & ~has_before & has_after, after, result)
+        result = np.where(~valid & has_before & ~has_after, before, result)
+    return result
+
+def _ffill(values: np.ndarray, fill_edges: bool) -> np.ndarray:
+    valid = ~np.isnan(values)
+    n_years = values.shape[1]
+    previous, following = _neighbours(valid)
+    result = np.where(previous >= 0, np.take_along_axis(values, np.clip(previous, 0, n_years - 1), axis=1), values)
+    if fill_edges:
+        after = np.take_along_axis(values, np.clip(following, 0, n_years - 1), axis=1)
+        result = np.where((previous < 0) & (following < n_years), after, result)
+    return result
+
+def _regional_mean(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    # values has shape (planes, countries, years); countries in no group are neither filled nor averaged
+    codes, uniques = pd.factorize(pd.Series(groups))
+    grouped = codes >= 0
+    membership = np.zeros((len(uniques), len(codes)))
+    membership[codes[grouped], np.flatnonzero(grouped)] = 1.0
+
+    valid = ~np.isnan(values)
+    sums = np.einsum("gc,pcy->pgy", membership, np.where(valid, values, 0.0))
+    counts = np.einsum("gc,pcy->pgy", membership, valid.astype(np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+
+    fill = np.full_like(values, np.nan)
+    fill[:, grouped] = means[:, codes[grouped]]
+    return np.where(valid, values, fill)
+
+def check_imputation(method: str | list[str], has_groups: bool) -> list[str]:
+    """
+    Validate imputation methods before any work is done.
+
+    Args:
+        method (str | list[str]): One method of IMPUTATION_METHODS, or several.
+        has_groups (bool): Whether country groups (metadata) are available for "regional_mean".
+
+    Returns:
+        list[str]: The methods as a list.
+
+    Raises:
+        ValueError: For unknown methods, or "regional_mean" without groups.
+    """
+    methods = [method] if isinstance(method, str) else list(method)
+    unknown = [name for name in methods if name not in IMPUTATION_METHODS]
+    if unknown:
+        raise ValueError(f"Unknown imputation methods: {unknown}. Expected any of {IMPUTATION_METHODS}")
+    if "regional_mean" in methods and not has_groups:
+        raise ValueError("regional_mean imputation needs country metadata to group countries by")
+
+    return methods
+
+def impute_values(values: np.ndarray, method: str | list[str] = "linear", groups=None,
+                  fill_edges: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fill missing cells of a country x year array, or of a stack of them, in one vectorized pass
+    per method.
+
+    Methods:
+        "linear": interpolate linearly between the nearest observed years of each country.
+        "ffill": carry each country's last observed value forward.
+        "regional_mean": the mean of the observed countries of the same group in that year.
+
+    Several methods are applied in the order given, each filling what the previous ones left,
+    e.g. ["linear", "regional_mean"] interpolates within each country and then fills countries
+    with no data at all from their region.
+
+    Args:
+        values (np.ndarray): Array of shape (..., countries, years).
+        method (str | list[str]): One method of IMPUTATION_METHODS, or several.
+        groups (array-like): Group label per country, required by "regional_mean". Countries
+            with a missing label (e.g. WDI aggregates) are left unfilled.
+        fill_edges (bool): Let "linear" and "ffill" also fill years before the first and after
+            the last observation from the nearest observed year, as
+            interpolate(limit_direction="both") does. Otherwise only gaps are filled.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The imputed values and a boolean mask, both shaped like
+            values, that is True where a cell was imputed.
+    """
+    methods = check_imputation(method, groups is not None)
+    values = np.asarray(values, dtype=np.float64)
+    shape = values.shape
+    if values.size == 0:
+        return values.copy(), np.zeros(shape, dtype=bool)
+    planes = values.reshape(-1, shape[-2], shape[-1])
+    result = planes
+    for name in methods:
+        if name == "regional_mean":
+            if len(groups) != shape[-2]:
+                raise ValueError(f"Expected {shape[-2]} group labels, got {len(groups)}")
+            result = _regional_mean(result, np.asarray(groups, dtype=object))
+        else:
+            rows = result.reshape(-1, shape[-1])
+            rows = _linear(rows, fill_edges) if name == "linear" else _ffill(rows, fill_edges)
+            result = rows.reshape(planes.shape)
+
+    result = result.reshape(shape)
+    return result, np.isnan(values) & ~np.isnan(result)
+
+def country_groups(metadata: "CountryMetadata", country_codes, by: str = "Region") -> np.ndarray:
+    """
+    Region or income group of every country code, NaN for aggregates and unknown codes.
+    """
+    if by not in ("Region", "IncomeGroup"):
+        raise ValueError(f"Unknown grouping: {by}. Expected 'Region' or 'IncomeGroup'")
+
+    return metadata.frame[by].reindex(pd.Index(country_codes)).to_numpy(dtype=object)
+
+def impute_frame(df: pd.DataFrame, method: str | list[str] = "linear", metadata: "CountryMetadata" = None,
+                 by: str = "Region", fill_edges: bool = True) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Impute the year columns of a cleaned indicator frame. See impute_values for the methods.
+
+    Args:
+        df (pd.DataFrame): Frame with numeric year columns, as returned by clean_data, with a
+            "Country Code" column for "regional_mean".
+        method (str | list[str]): Imputation method or methods.
+        metadata (CountryMetadata): Country metadata, required by "regional_mean".
+        by (str): Grouping for "regional_mean": "Region" or "IncomeGroup".
+        fill_edges (bool): Also fill before the first and after the last observed year.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: A copy of df with the year columns imputed, and a
+            boolean frame over the year columns marking the imputed cells.
+    """
+    year_columns = [col for col in df.columns if col.isdigit()]
+    groups = None
+    if metadata is not None:
+        groups = country_groups(metadata, df["Country Code"], by)
+
+    values, mask = impute_values(df[year_columns].to_numpy(dtype=np.float64), method, groups, fill_edges)
+    imputed = df.copy()
+    imputed[year_columns] = values
+    logger.info(f"Imputed {int(mask.sum())} of {mask.size} cells with {method}")
+
+    return imputed, pd.DataFrame(mask, index=df.index, columns=year_columns)
+
+def imputed_cells(original: pd.DataFrame, imputed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Recover the mask of imputed cells from a frame before and after imputation: the year cells
+    that were missing and now hold a value.
+
+    Args:
+        original (pd.DataFrame): The frame before imputation.
+        imputed (pd.DataFrame): The same frame after imputation.
+
+    Returns:
+        pd.DataFrame: Boolean frame over the year columns of imputed.
+    """
+    year_columns = [col for col in imputed.columns if col.isdigit()]
+    before = original.reindex(index=imputed.index, columns=year_columns)
+    return before.isna() & imputed[year_columns].notna()
+
+def observed_values(df: pd.DataFrame, imputed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Set the imputed cells of a frame back to NaN, so an analysis only sees observed values.
+
+    Args:
+        df (pd.DataFrame): Imputed frame, or a slice of it.
+        imputed (pd.DataFrame): Mask of imputed cells; aligned to df by labels, cells it does not
+            cover count as observed.
+
+    Returns:
+        pd.DataFrame: A copy of df with the imputed cells missing.
+    """
+    return df.mask(imputed.reindex(index=df.index, columns=df.columns, fill_value=False).astype(bool))
+
+def impute_panel(panel: "Panel", method: str | list[str] = "linear", metadata: "CountryMetadata" = None,
+                 by: str = "Region", fill_edges: bool = True) -> "Panel":
+    """
+    Impute every indicator of a panel at once. See impute_values for the methods.
+
+    Args:
+        panel (Panel): The indicator panel.
+        method (str | list[str]): Imputation method or methods.
+        metadata (CountryMetadata): Country metadata, required by "regional_mean".
+        by (str): Grouping for "regional_mean": "Region" or "IncomeGroup".
+        fill_edges (bool): Also fill before the first and after the last observed year.
+
+    Returns:
+        Panel: A new panel holding the imputed values, with its imputed attribute marking the
+            imputed cells. Cells imputed in panel already stay marked.
+    """
+    from src.panel import Panel
+
+    groups = None
+    if metadata is not None:
+        groups = country_groups(metadata, panel.country_codes, by)
+
+    values, mask = impute_values(panel.values, method, groups, fill_edges)
+    if panel.imputed is not None:
+        mask |= panel.imputed
+    logger.info(f"Imputed {int(mask.sum())} of {mask.size} panel cells with {method}")
+
+    return Panel(values, panel.indicators, panel.indicator_names, panel.countries, panel.country_codes,
+                 panel.years, imputed=mask)
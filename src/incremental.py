@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from src.cache import CACHE_DIR, load_cached_data, load_entry, store_frame
+from src.load_data import read_last_updated
+from src.stats import correlation_analysis, growth_rate_analysis, linear_regression_table, rolling_statistics
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = "output/incremental/"
+
+def diff_releases(previous: pd.DataFrame, current: pd.DataFrame, tolerance: float = 1e-12) -> pd.DataFrame:
+    """
+    Find the country/year cells that differ between two releases of the same indicator.
+
+    Both frames are aligned on the union of their countries and year columns, so added years,
+    added countries and values that went missing all show up as changes.
+
+    Args:
+        previous (pd.DataFrame): The earlier release, indexed by country with year columns.
+        current (pd.DataFrame): The new release, in the same layout.
+        tolerance (float): Relative tolerance below which values are considered unchanged.
+
+    Returns:
+        pd.DataFrame: One row per changed cell with the columns "Country", "Year" (int),
+            "Previous" and "Current".
+    """
+    previous = previous[[col for col in previous.columns if col.isdigit()]]
+    current = current[[col for col in current.columns if col.isdigit()]]
+    countries = previous.index.union(current.index)
+    years = sorted(set(previous.columns) | set(current.columns), key=int)
+
+    old = previous.reindex(index=countries, columns=years).to_numpy(dtype=np.float64)
+    new = current.reindex(index=countries, columns=years).to_numpy(dtype=np.float64)
+
+    both_missing = np.isnan(old) & np.isnan(new)
+    same = np.isclose(old, new, rtol=tolerance, atol=0.0)
+    rows, cols = np.nonzero(~(both_missing | same))
+
+    return pd.DataFrame({
+        "Country": countries[rows],
+        "Year": np.array([int(year) for year in years])[cols],
+        "Previous": old[rows, cols],
+        "Current": new[rows, cols]
+    })
+
+def _release_key(indicator: str) -> str:
+    return f"release:{indicator}"
+
+def _read_output(path: str, index_col: int | list[int] = None) -> pd.DataFrame | None:
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, index_col=index_col)
+
+def _year_columns(df: pd.DataFrame) -> pd.DataFrame:
+    return df[[col for col in df.columns if col.isdigit()]]
+
+def _refresh_growth(stored: pd.DataFrame, current: pd.DataFrame, changes: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    # Growth for year t depends on years t - 1 and t, so a change in year y touches y and y + 1
+    affected = pd.concat([changes[["Country", "Year"]], changes[["Country", "Year"]].assign(Year=changes["Year"] + 1)])
+    countries = [country for country in affected["Country"].unique() if country in current.index]
+    if not countries:
+        return stored, 0
+
+    fresh = growth_rate_analysis(current, countries)
+    stored = stored.reindex(index=stored.index.union(fresh.index), columns=stored.columns.union(fresh.columns))
+
+    affected = affected[affected["Year"].isin(fresh.columns) & affected["Country"].isin(fresh.index)].drop_duplicates()
+    rows = stored.index.get_indexer(affected["Country"])
+    cols = stored.columns.get_indexer(affected["Year"])
+    values = stored.to_numpy(copy=True)
+    values[rows, cols] = fresh.to_numpy()[fresh.index.get_indexer(affected["Country"]), fresh.columns.get_indexer(affected["Year"])]
+
+    return pd.DataFrame(values, index=stored.index, columns=stored.columns), len(affected)
+
+def _refresh_rolling(stored: pd.DataFrame, current: pd.DataFrame, changes: pd.DataFrame, years_window: int,
+                     new_years: list[int] = ()) -> tuple[pd.DataFrame, int]:
+    # A trailing window ending in year t covers t - window + 1 .. t, so a change in year y
+    # touches the windows ending in y .. y + window - 1. A year column new to the release adds
+    # a row for every country, observed there or not, so its windows are recomputed for all
+    touched = changes[["Country", "Year"]]
+    if len(new_years):
+        touched = pd.concat([touched, pd.DataFrame({"Country": np.repeat(current.index.to_numpy(), len(new_years)),
+                                                    "Year": np.tile(np.asarray(new_years), len(current.index))})])
+    affected = pd.concat([touched.assign(Year=touched["Year"] + offset) for offset in range(years_window)])
+    countries = [country for country in affected["Country"].unique() if country in current.index]
+    if not countries:
+        return stored, 0
+
+    fresh = rolling_statistics(current, countries, years_window=years_window).set_index(["Country", "Year"])
+    affected_index = pd.MultiIndex.from_frame(affected.drop_duplicates())
+    fresh = fresh[fresh.index.isin(affected_index)]
+
+    stored = stored.set_index(["Country", "Year"])
+    stored = pd.concat([stored[~stored.index.isin(fresh.index)], fresh]).sort_index()
+
+    return stored.reset_index(), len(fresh)
+
+def _settings_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "settings.json")
+
+def _read_settings(output_dir: str) -> dict | None:
+    try:
+        with open(_settings_path(output_dir), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _write_settings(output_dir: str, settings: dict) -> None:
+    with open(_settings_path(output_dir), "w") as f:
+        json.dump(settings, f)
+
+def refresh_indicator(csv_file_loc: str, state_dir: str = STATE_DIR, cache_dir: str = CACHE_DIR,
+                      start_year: str = None, end_year: str = None, years_window: int = 3) -> tuple[pd.DataFrame, dict]:
+    """
+    Bring the growth-rate and rolling-statistics outputs of one indicator up to date with a new
+    release, recomputing only the country/year cells the release changed.
+
+    The previous release is kept as a snapshot in the load cache, keyed by indicator code, so the
+    new file may have a different name. Without a snapshot or stored outputs, or when the stored
+    outputs were computed for another year range or window, everything is computed from scratch.
+
+    Args:
+        csv_file_loc (str): Path to the new release of the indicator.
+        state_dir (str): Directory holding the stored outputs.
+        cache_dir (str): Root directory of the load cache.
+        start_year (str): The first year to analyze.
+        end_year (str): The last year to analyze.
+        years_window (int): Window length for the rolling statistics.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: The current cleaned frame, and a manifest record of what was recomputed.
+    """
+    current = load_cached_data(csv_file_loc, cache_dir=cache_dir)
+    indicator = current["Indicator Code"].iloc[0]
+    indicator_dir = os.path.join(state_dir, indicator)
+    os.makedirs(indicator_dir, exist_ok=True)
+    growth_path = os.path.join(indicator_dir, "growth_rates.csv")
+    rolling_path = os.path.join(indicator_dir, "rolling_statistics.csv")
+
+    snapshot = load_entry(_release_key(indicator), cache_dir)
+    previous, previous_meta = snapshot if snapshot is not None else (None, None)
+    stored_growth = _read_output(growth_path, index_col=0)
+    stored_rolling = _read_output(rolling_path)
+    if stored_growth is not None:
+        stored_growth.columns = stored_growth.columns.astype(int)
+
+    record = {
+        "indicator": indicator,
+        "source": os.path.abspath(csv_file_loc),
+        "last_updated": read_last_updated(csv_file_loc),
+        "previous_last_updated": None if previous_meta is None else previous_meta["source"].get("last_updated")
+    }
+
+    current_years = _year_columns(current).loc[:, start_year:end_year]
+    # Without a previous release every present cell counts as changed
+    previous_years = current_years.iloc[0:0] if previous is None else _year_columns(previous).loc[:, start_year:end_year]
+    changes = diff_releases(previous_years, current_years)
+    new_years = [int(year) for year in current_years.columns.difference(previous_years.columns)]
+
+    # The stored outputs are only valid for the year range and window they were computed with
+    settings = {"start_year": start_year, "end_year": end_year, "years_window": years_window}
+    stale = _read_settings(indicator_dir) != settings
+    if previous is None or stored_growth is None or stored_rolling is None or stale:
+        stored_growth = growth_rate_analysis(current_years)
+        stored_rolling = rolling_statistics(current_years, years_window=years_window)
+        record.update(full_recompute=True, growth_cells_recomputed=int(stored_growth.size),
+                      rolling_rows_recomputed=len(stored_rolling))
+    else:
+        removed = previous.index.difference(current.index)
+        years = [int(year) for year in current_years.columns]
+        stored_growth = stored_growth.drop(index=removed, errors="ignore")
+        stored_growth = stored_growth.loc[:, stored_growth.columns.isin(years)]
+        stored_rolling = stored_rolling[~stored_rolling["Country"].isin(removed) & stored_rolling["Year"].isin(years)]
+
+        stored_growth, growth_cells = _refresh_growth(stored_growth, current_years, changes)
+        stored_rolling, rolling_rows = _refresh_rolling(stored_rolling, current_years, changes, years_window, new_years)
+        record.update(full_recompute=False, growth_cells_recomputed=growth_cells, rolling_rows_recomputed=rolling_rows,
+                      removed_countries=removed.tolist())
+
+    record.update(
+        changed_cells=len(changes),
+        changed_years=sorted(int(year) for year in changes["Year"].unique()),
+        changed_countries=sorted(changes["Country"].unique().tolist()),
+        new_years=new_years,
+        settings=settings
+    )
+
+    stored_growth.rename_axis(index="Country Name", columns="Year").to_csv(growth_path)
+    stored_rolling.to_csv(rolling_path, index=False)
+    _write_settings(indicator_dir, settings)
+
+    store_frame(current, _release_key(indicator), {"path": record["source"], "last_updated": record["last_updated"]}, cache_dir)
+    logger.info(f"Refreshed {indicator}: {record['changed_cells']} changed cells, full recompute: {record['full_recompute']}")
+
+    return current, record
+
+def refresh_pair(x: pd.DataFrame, y: pd.DataFrame, touched: set, state_dir: str = STATE_DIR,
+                 start_year: str = None, end_year: str = None) -> dict:
+    """
+    Bring the per-country regression and correlation of one indicator pair up to date,
+    recomputing only the countries whose data changed in either indicator.
+
+    Args:
+        x (pd.DataFrame): Current cleaned frame of the predictor indicator.
+        y (pd.DataFrame): Current cleaned frame of the response indicator.
+        touched (set): Countries with changed cells in x or y.
+        state_dir (str): Directory holding the stored outputs.
+        start_year (str): The first year to analyze.
+        end_year (str): The last year to analyze.
+
+    Returns:
+        dict: A manifest record of what was recomputed.
+    """
+    x_code = x["Indicator Code"].iloc[0]
+    y_code = y["Indicator Code"].iloc[0]
+    pair_dir = os.path.join(state_dir, f"{x_code}__{y_code}")
+    os.makedirs(pair_dir, exist_ok=True)
+    regression_path = os.path.join(pair_dir, "regression.csv")
+    correlation_path = os.path.join(pair_dir, "correlation.csv")
+
+    countries = x.index.intersection(y.index)
+    x_years = _year_columns(x).loc[countries, start_year:end_year]
+    y_years = _year_columns(y).loc[countries, start_year:end_year]
+
+    stored_regression = _read_output(regression_path, index_col=0)
+    stored_correlation = _read_output(correlation_path, index_col=0)
+    settings = {"start_year": start_year, "end_year": end_year}
+    full = stored_regression is None or stored_correlation is None or _read_settings(pair_dir) != settings
+    recompute = countries if full else countries[countries.isin(touched)]
+
+    regression = linear_regression_table(x_years.loc[recompute], y_years.loc[recompute])
+    correlation = correlation_analysis(x_years.loc[recompute], y_years.loc[recompute]).rename("Correlation Coefficient").to_frame()
+    if not full:
+        keep = stored_regression.index.isin(countries) & ~stored_regression.index.isin(recompute)
+        regression = pd.concat([stored_regression[keep], regression]).sort_index()
+        keep = stored_correlation.index.isin(countries) & ~stored_correlation.index.isin(recompute)
+        correlation = pd.concat([stored_correlation[keep], correlation]).sort_index()
+
+    regression.rename_axis("Country Name").to_csv(regression_path)
+    correlation.rename_axis("Country Name").to_csv(correlation_path)
+    _write_settings(pair_dir, settings)
+
+    return {
+        "pair": [x_code, y_code],
+        "full_recompute": full,
+        "countries_recomputed": sorted(recompute.tolist()),
+        "settings": settings
+    }
+
+def incremental_refresh(csv_files: list[str], pairs: list[tuple[str, str]] = (), state_dir: str = STATE_DIR,
+                        cache_dir: str = CACHE_DIR, start_year: str = None, end_year: str = None,
+                        years_window: int = 3) -> dict:
+    """
+    Refresh the stored outputs for a set of indicator files after a new WDI release, and append a
+    record of what was recomputed to the manifest at state_dir/manifest.json.
+
+    Args:
+        csv_files (list[str]): Paths to the indicator files of the new release.
+        pairs (list[tuple[str, str]]): (predictor, response) indicator codes to keep regressions
+            and correlations for. Both indicators must be among csv_files.
+        state_dir (str): Directory holding the stored outputs and the manifest.
+        cache_dir (str): Root directory of the load cache.
+        start_year (str): The first year to analyze.
+        end_year (str): The last year to analyze.
+        years_window (int): Window length for the rolling statistics.
+
+    Returns:
+        dict: The manifest record for this run.
+    """
+    frames = {}
+    touched = {}
+    run = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "start_year": start_year,
+        "end_year": end_year,
+        "years_window": years_window,
+        "indicators": [],
+        "pairs": []
+    }
+
+    for csv_file_loc in csv_files:
+        try:
+            current, record = refresh_indicator(csv_file_loc, state_dir, cache_dir, start_year, end_year, years_window)
+        except Exception as e:
+            logger.error(f"incremental_refresh: Failed to refresh {csv_file_loc}: {e}")
+            continue
+        frames[record["indicator"]] = current
+        touched[record["indicator"]] = set(record["changed_countries"]) | set(record.get("removed_countries", []))
+        run["indicators"].append(record)
+
+    for x_code, y_code in pairs:
+        if x_code not in frames or y_code not in frames:
+            logger.error(f"incremental_refresh: Pair ({x_code}, {y_code}) needs both indicators in csv_files")
+            continue
+        run["pairs"].append(refresh_pair(frames[x_code], frames[y_code], touched[x_code] | touched[y_code],
+                                         state_dir, start_year, end_year))
+
+    manifest_path = os.path.join(state_dir, "manifest.json")
+    manifest = {"runs": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    manifest["runs"].append(run)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Incremental refresh manifest written to {manifest_path}")
+    return run
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILE = "logs/metrics.jsonl"
+
+# owns_tracing: whether this module started the running tracemalloc session, so it never stops
+# one a caller or a profiler started
+_settings = {"enabled": False, "metrics_path": None, "trace_memory": False, "owns_tracing": False}
+_write_lock = threading.Lock()
+# Open traced stages per thread, each [memory at entry, highest peak seen, overlapped]. tracemalloc
+# keeps one peak for the whole process, so it is only reset while a single thread is in a stage
+_trace_lock = threading.Lock()
+_open_stages = {}
+
+def configure_instrumentation(enabled: bool = True, metrics_path: str = None, trace_memory: bool = False) -> None:
+    """
+    Turn stage instrumentation on or off for the whole process.
+
+    Args:
+        enabled (bool): Record instrumented stages. When False, instrumented functions only pay
+            for one dictionary lookup per call.
+        metrics_path (str): JSON-lines file every record is appended to, or None to only log.
+        trace_memory (bool): Record each stage's peak traced memory with tracemalloc. Tracing
+            slows allocation-heavy code down noticeably, so it is off by default. Peaks are only
+            reported for stages that ran while no other thread was inside a stage; stages that
+            overlapped are marked "memory": "concurrent" instead. Turning it off only stops a
+            tracemalloc session this function started.
+    """
+    _settings["enabled"] = enabled
+    _settings["metrics_path"] = metrics_path
+    _settings["trace_memory"] = enabled and trace_memory
+
+    if metrics_path is not None:
+        os.makedirs(os.path.dirname(metrics_path) or ".", exist_ok=True)
+    if _settings["trace_memory"] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _settings["owns_tracing"] = True
+    elif not _settings["trace_memory"] and _settings["owns_tracing"]:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _settings["owns_tracing"] = False
+
+def describe(value) -> list[int] | str | None:
+    """
+    Summarize a stage input or output by its shape: the shape of arrays, frames and panels, the
+    length of other sized containers, strings (usually paths) as they are, and the type name of
+    anything else.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value[:200]
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return list(value.shape)
+    if hasattr(value, "values") and isinstance(getattr(value, "values"), np.ndarray):
+        return list(value.values.shape)
+    if isinstance(value, bytes):
+        return [len(value)]
+    if hasattr(value, "__len__"):
+        return [len(value)]
+
+    return type(value).__name__
+
+def _emit(record: dict) -> None:
+    peak = f", peak {record['peak_mb']:.1f} MB" if "peak_mb" in record else ""
+    if record.get("memory") == "concurrent":
+        peak = ", peak not measured (concurrent stages)"
+    logger.info(f"{record['stage']}: {record['status']} in {record['seconds'] * 1000:.1f} ms, "
+                f"inputs {record['inputs']}, output {record['output']}{peak}")
+
+    metrics_path = _settings["metrics_path"]
+    if metrics_path is None:
+        return
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock:
+        with open(metrics_path, "a") as f:
+            f.write(line)
+
+@contextmanager
+def measure_stage(name: str, *inputs, **fields):
+    """
+    Time a block and emit one record for it. Yields the record, so the block can attach its
+    output with record["output"] = describe(result) or add fields of its own.
+
+    Nested stages each get their own duration and memory peak. Stages overlapping with stages on
+    other threads get no peak, since tracemalloc cannot tell the threads' allocations apart.
+
+    Args:
+        name (str): Stage name.
+        *inputs: Stage inputs, recorded by shape.
+        **fields: Extra fields stored in the record.
+    """
+    if not _settings["enabled"]:
+        yield {}
+        return
+
+    record = {
+        "stage": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "thread": threading.current_thread().name,
+        "inputs": [describe(value) for value in inputs],
+        "output": None,
+        **fields
+    }
+
+    trace = _settings["trace_memory"] and tracemalloc.is_tracing()
+    if trace:
+        thread = threading.get_ident()
+        with _trace_lock:
+            stack = _open_stages.setdefault(thread, [])
+            others = [entry for other, entries in _open_stages.items() if other != thread for entry in entries]
+            current, peak = tracemalloc.get_traced_memory()
+            if others:
+                # Resetting the peak would discard the other threads' peaks, and the shared peak
+                # mixes their allocations with ours, so none of the open stages can report one
+                for entry in others + stack:
+                    entry[2] = True
+                stack.append([current, current, True])
+            else:
+                # Entering a child folds the parent's peak so far into it before the reset
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+                tracemalloc.reset_peak()
+                stack.append([current, current, False])
+
+    started = time.perf_counter()
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["seconds"] = time.perf_counter() - started
+        if trace:
+            with _trace_lock:
+                _, peak = tracemalloc.get_traced_memory()
+                entry_memory, highest, overlapped = stack.pop()
+                peak = max(highest, peak)
+                if overlapped:
+                    record["memory"] = "concurrent"
+                else:
+                    record["peak_mb"] = (peak - entry_memory) / 1e6
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+                else:
+                    del _open_stages[thread]
+        _emit(record)
+
+def instrument(func=None, *, name: str = None):
+    """
+    Decorator recording the duration, input and output shapes and (optionally) the memory peak of
+    every call while instrumentation is enabled. Usable as @instrument or @instrument(name=...).
+
+    Args:
+        func (Callable): The function to instrument.
+        name (str): Stage name, defaults to the function's module and name.
+    """
+    if func is None:
+        return lambda f: instrument(f, name=name)
+
+    stage_name = name or f"{func.__module__.removeprefix('src.')}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _settings["enabled"]:
+            return func(*args, **kwargs)
+
+        with measure_stage(stage_name, *args) as record:
+            result = func(*args, **kwargs)
+            record["output"] = describe(result)
+        return result
+
+    return wrapper
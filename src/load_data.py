@@ -1,8 +1,10 @@
 import logging
 import pandas as pd
+from src.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
+@instrument
 def load_data(csv_file_loc: str, skip_rows: int = 4) -> pd.DataFrame:
     """
     Load raw data from a csv and return the data.
@@ -21,4 +23,25 @@ def load_data(csv_file_loc: str, skip_rows: int = 4) -> pd.DataFrame:
         logger.error(f"Error: {e}")
         df = None
         
-    return df
\ No newline at end of file
+    return df
+
+def read_last_updated(csv_file_loc: str) -> str:
+    """
+    Read the "Last Updated Date" from the header block of a World Bank CSV.
+
+    Args:
+        csv_file_loc (String): The name and path of the csv file.
+
+    Returns:
+        String: The release date as written in the file, e.g. "2025-06-05", or None if absent.
+    """
+    try:
+        with open(csv_file_loc, "r", encoding="utf-8-sig") as f:
+            for _ in range(4):
+                fields = [field.strip().strip('"') for field in f.readline().split(",")]
+                if fields[0] == "Last Updated Date" and len(fields) > 1:
+                    return fields[1] or None
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}")
+
+    return None
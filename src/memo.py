@@ -0,0 +1,316 @@
+import copy
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable
+import numpy as np
+import pandas as pd
+from src.cache import source_version
+
+logger = logging.getLogger(__name__)
+
+_settings = {"enabled": True, "cache_dir": None}
+
+# Default bound on the pickles kept under cache_dir/memo/
+MAX_DISK_BYTES = 2**30
+
+def _hash_array(digest, values: np.ndarray) -> None:
+    digest.update(f"{values.dtype.str}{values.shape}".encode())
+    if values.dtype == object:
+        digest.update(pickle.dumps(values.tolist(), protocol=pickle.HIGHEST_PROTOCOL))
+    else:
+        digest.update(np.ascontiguousarray(values).data)
+
+def _hash_value(digest, value) -> None:
+    if isinstance(value, np.ndarray):
+        digest.update(b"ndarray")
+        _hash_array(digest, value)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(f"{type(value).__name__}{getattr(value, 'name', None)!r}".encode())
+        _hash_value(digest, value.index)
+        if isinstance(value, pd.DataFrame):
+            _hash_value(digest, value.columns)
+            digest.update(repr(list(value.dtypes)).encode())
+        _hash_array(digest, value.to_numpy())
+    elif isinstance(value, pd.Index):
+        digest.update(f"Index{value.names!r}".encode())
+        _hash_array(digest, np.asarray(value))
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _hash_value(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _hash_value(digest, value[key])
+    elif hasattr(value, "values") and isinstance(value.values, np.ndarray):
+        # Array-backed containers such as Panel: every array- and index-valued attribute
+        digest.update(type(value).__name__.encode())
+        for name, attribute in sorted(vars(value).items()):
+            if isinstance(attribute, (np.ndarray, pd.Index)):
+                digest.update(name.encode())
+                _hash_value(digest, attribute)
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        digest.update(json.dumps(value).encode())
+    elif isinstance(value, np.generic):
+        digest.update(f"{value.dtype.str}{value.item()!r}".encode())
+    elif hasattr(value, "__dict__") and not callable(value):
+        # Other objects, such as CountryMetadata, by the contents of their attributes; their repr
+        # may only summarize them
+        digest.update(f"{type(value).__module__}.{type(value).__qualname__}".encode())
+        _hash_value(digest, vars(value))
+    else:
+        raise TypeError(f"Cannot fingerprint a {type(value).__name__} by value")
+
+def fingerprint(*args, **kwargs) -> str:
+    """
+    Hash function arguments by value: arrays, frames, series and panels by their contents and
+    labels, containers item by item, scalars by their JSON form and other objects by the
+    contents of their attributes.
+
+    Returns:
+        str: Hex digest identifying the arguments.
+
+    Raises:
+        TypeError: For arguments that cannot be hashed by value, such as functions.
+    """
+    digest = hashlib.sha256()
+    _hash_value(digest, list(args))
+    _hash_value(digest, kwargs)
+    return digest.hexdigest()
+
+def estimate_size(value) -> int:
+    """
+    Approximate memory held by a result, in bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True)))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in vars(value).values())
+
+    return sys.getsizeof(value)
+
+class MemoCache:
+    """
+    Thread-safe least-recently-used cache of analysis results, bounded by entry count and by
+    the approximate bytes the results hold, with an optional pickle store on disk.
+
+    Entries evicted from memory stay on disk, so a later miss in memory reloads them instead
+    of recomputing. The disk store is bounded by max_disk_bytes; the least recently used
+    pickles are removed first.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 2**20, max_disk_bytes: int = MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _disk_path(self, key: str) -> str | None:
+        cache_dir = _settings["cache_dir"]
+        return None if cache_dir is None else os.path.join(cache_dir, "memo", f"{key}.pkl")
+
+    def _load(self, key: str):
+        path = self._disk_path(key)
+        if path is None or not os.path.exists(path):
+            return False, None
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            # The modification time orders the disk entries for eviction
+            os.utime(path)
+            return True, value
+        except Exception as e:
+            logger.error(f"MemoCache: Could not read memoized result {path}: {e}")
+            return False, None
+
+    def _store(self, key: str, value) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{path}.tmp", path)
+            self._evict_disk(os.path.dirname(path))
+        except Exception as e:
+            logger.error(f"MemoCache: Could not memoize result {key}: {e}")
+
+    def _evict_disk(self, memo_dir: str) -> None:
+        entries = []
+        for entry in os.scandir(memo_dir):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str):
+        """
+        Look a result up in memory, then on disk.
+
+        Returns:
+            tuple: (found, value).
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key][0]
+
+        found, value = self._load(key)
+        with self.lock:
+            if found:
+                self.hits += 1
+                self._insert(key, value)
+            else:
+                self.misses += 1
+        return found, value
+
+    def put(self, key: str, value) -> None:
+        self._store(key, value)
+        with self.lock:
+            self._insert(key, value)
+
+    def _insert(self, key: str, value) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.nbytes += size
+        while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_size
+
+    def clear(self) -> None:
+        """
+        Drop every in-memory entry. Results already written to disk are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+_cache = MemoCache()
+
+def configure_memoization(enabled: bool = True, max_entries: int = 128, max_bytes: int = 256 * 2**20,
+                          cache_dir: str = None, max_disk_bytes: int = MAX_DISK_BYTES) -> None:
+    """
+    Configure the process-wide analysis memo cache. Changing the bounds clears it.
+
+    Args:
+        enabled (bool): Memoize analyses. When False every call computes.
+        max_entries (int): Most results kept in memory.
+        max_bytes (int): Most bytes of results kept in memory; larger results are not kept.
+        cache_dir (str): Also pickle results under cache_dir/memo/ so they outlive the process,
+            or None to keep them in memory only.
+        max_disk_bytes (int): Most bytes of pickles kept under cache_dir/memo/.
+    """
+    _settings["enabled"] = enabled
+    _settings["cache_dir"] = cache_dir
+    _cache.max_disk_bytes = max_disk_bytes
+    if (max_entries, max_bytes) != (_cache.max_entries, _cache.max_bytes):
+        _cache.max_entries = max_entries
+        _cache.max_bytes = max_bytes
+        _cache.clear()
+
+def memo_cache() -> MemoCache:
+    """
+    The process-wide cache used by @memoize, e.g. to read its hit counts or clear it.
+    """
+    return _cache
+
+def _private(result):
+    # The cache keeps its own copy, so nothing the caller does to its inputs afterwards reaches it.
+    # Arrays are stored read-only
+    if isinstance(result, np.ndarray):
+        result = np.array(result, copy=True)
+        result.flags.writeable = False
+        return result
+
+    return copy.deepcopy(result)
+
+def memoize(func=None, *, ignore: tuple[str, ...] = (), cacheable: Callable = None):
+    """
+    Decorator caching a function's results by the fingerprint of its arguments and of the src
+    package's source, so calls on equal data return the stored result instead of recomputing it.
+
+    The cache stores a private copy of each result, so results never share memory with the
+    arguments they were computed from. Cached results are shared between the callers that hit
+    them and must not be modified; arrays are returned read-only. None results, raised errors,
+    results rejected by cacheable and calls whose arguments cannot be fingerprinted are not
+    cached. Usable as @memoize or @memoize(ignore=("n_jobs",)).
+
+    Args:
+        func (Callable): The function to memoize.
+        ignore (tuple[str, ...]): Parameters that do not affect the result, such as worker
+            counts, left out of the key.
+        cacheable (Callable): Predicate on a result; results for which it is False, such as
+            ones carrying error messages, are returned without being cached.
+    """
+    if func is None:
+        return lambda f: memoize(f, ignore=ignore, cacheable=cacheable)
+
+    signature = inspect.signature(func)
+    # Editing any analysis code invalidates the disk entries, as for pipeline stages; the
+    # function's own bytecode would not cover the helpers it calls
+    prefix = hashlib.sha256(f"{func.__module__}.{func.__qualname__}:{source_version()}".encode()).hexdigest()[:16]
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _settings["enabled"]:
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items() if name not in ignore}
+        try:
+            key = f"{prefix}-{fingerprint(**arguments)}"
+        except TypeError as e:
+            logger.debug(f"memoize: Not caching {func.__qualname__}: {e}")
+            return func(*args, **kwargs)
+
+        found, result = _cache.get(key)
+        if found:
+            return result
+
+        result = func(*args, **kwargs)
+        if result is None or (cacheable is not None and not cacheable(result)):
+            return result
+        stored = _private(result)
+        _cache.put(key, stored)
+        # Arrays are returned read-only like later hits; the caller's own array stays writable
+        return stored if isinstance(result, np.ndarray) else result
+
+    return wrapper
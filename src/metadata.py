@@ -0,0 +1,201 @@
+import glob
+import logging
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from src.panel import Panel
+
+logger = logging.getLogger(__name__)
+
+AGGREGATIONS = ("sum", "mean", "weighted_mean", "median")
+
+class CountryMetadata:
+    """
+    Region and income group of every WDI economy, indexed by ISO3 country code.
+
+    WDI files also contain aggregate rows (regions, income groups, "World", ...). They have no
+    Region in the metadata, which is how they are told apart from countries.
+
+    Attributes:
+        frame (pd.DataFrame): Metadata indexed by "Country Code" with the columns "Region",
+            "IncomeGroup", "SpecialNotes" and "TableName".
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    def __repr__(self) -> str:
+        return f"CountryMetadata({int((~self.aggregates).sum())} countries, {int(self.aggregates.sum())} aggregates)"
+
+    @property
+    def aggregates(self) -> pd.Series:
+        return self.frame["Region"].isna()
+
+    @property
+    def regions(self) -> list[str]:
+        return sorted(self.frame["Region"].dropna().unique())
+
+    @property
+    def income_groups(self) -> list[str]:
+        return sorted(self.frame["IncomeGroup"].dropna().unique())
+
+    def country_mask(self, country_codes, codes: list[str] = None, regions: list[str] = None,
+                     income_groups: list[str] = None, include_aggregates: bool = False) -> np.ndarray:
+        """
+        Select economies by ISO code, region and income group.
+
+        Args:
+            country_codes: ISO3 codes to test, e.g. Panel.country_codes or a "Country Code" column.
+            codes (list[str]): Keep only these ISO3 codes.
+            regions (list[str]): Keep only these regions.
+            income_groups (list[str]): Keep only these income groups.
+            include_aggregates (bool): Keep WDI aggregate rows such as "AFE" or "WLD".
+
+        Returns:
+            np.ndarray: Boolean mask aligned with country_codes. Codes without metadata are
+                treated as aggregates.
+        """
+        meta = self.frame.reindex(pd.Index(country_codes))
+        mask = np.ones(len(meta), dtype=bool)
+        if not include_aggregates:
+            mask &= meta["Region"].notna().to_numpy()
+        if codes is not None:
+            mask &= meta.index.isin(codes)
+        if regions is not None:
+            mask &= meta["Region"].isin(regions).to_numpy()
+        if income_groups is not None:
+            mask &= meta["IncomeGroup"].isin(income_groups).to_numpy()
+
+        return mask
+
+    def select_countries(self, panel: Panel, **kwargs) -> list[str]:
+        """
+        Country names of a panel matching a selection. Takes the keyword arguments of country_mask.
+
+        Args:
+            panel (Panel): The indicator panel.
+
+        Returns:
+            list[str]: Matching country names, usable with Panel.frame or slice_dataframe.
+        """
+        return panel.countries[self.country_mask(panel.country_codes, **kwargs)].tolist()
+
+    def filter_frame(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+        """
+        Rows of a cleaned frame (with a "Country Code" column) matching a selection. Takes the
+        keyword arguments of country_mask; by default this drops the aggregate rows.
+
+        Args:
+            df (pd.DataFrame): Cleaned dataframe as returned by load_cached_data.
+
+        Returns:
+            pd.DataFrame: The matching rows.
+        """
+        return df[self.country_mask(df["Country Code"], **kwargs)]
+
+@lru_cache(maxsize=None)
+def _load_country_metadata(data_dir: str) -> CountryMetadata:
+    paths = sorted(glob.glob(os.path.join(data_dir, "*", "Metadata_Country_*.csv")))
+    if not paths:
+        raise FileNotFoundError(f"No country metadata files found under {data_dir}")
+
+    frames = [pd.read_csv(path, usecols=["Country Code", "Region", "IncomeGroup", "SpecialNotes", "TableName"], encoding="utf-8-sig")
+              for path in paths]
+    frame = pd.concat(frames).drop_duplicates(subset="Country Code").set_index("Country Code").sort_index()
+    metadata = CountryMetadata(frame)
+    logger.info(f"Loaded {metadata!r} from {len(paths)} files")
+
+    return metadata
+
+def load_country_metadata(data_dir: str = "data/") -> CountryMetadata:
+    """
+    Load the country metadata shipped alongside the indicator files. The metadata is identical
+    across indicators, so it is read once per data directory and shared.
+
+    Args:
+        data_dir (str): Directory holding one subdirectory per indicator.
+
+    Returns:
+        CountryMetadata: The merged metadata.
+    """
+    return _load_country_metadata(os.path.abspath(data_dir))
+
+def default_countries(panel: Panel, countries: list[str] = None, metadata: CountryMetadata = None) -> list[str]:
+    """
+    The countries a cross-country analysis runs on: countries as given, otherwise every country
+    of the panel except the WDI aggregates, which would duplicate their members.
+
+    The metadata is passed in rather than looked up here, so the country set of a memoized
+    analysis depends on its arguments and not on the working directory.
+
+    Args:
+        panel (Panel): The indicator panel.
+        countries (list[str]): Country names chosen by the caller, or None.
+        metadata (CountryMetadata): Country metadata. Required unless countries is given.
+
+    Returns:
+        list[str]: Country names.
+    """
+    if countries is not None:
+        return countries
+    if metadata is None:
+        raise ValueError("default_countries: Pass the country metadata (see load_country_metadata) or an explicit country list")
+
+    return metadata.select_countries(panel)
+
+def aggregate_by_group(panel: Panel, metadata: CountryMetadata, indicators: list[str] = None, by: str = "Region",
+                       how: str = "sum", weights: str = "NY.GDP.MKTP.CD", start_year: str = None,
+                       end_year: str = None) -> pd.DataFrame:
+    """
+    Aggregate every indicator of a panel over the countries of each region or income group.
+
+    WDI aggregate rows are always excluded so they are not double counted. All indicators and
+    years are aggregated in a single groupby over a countries x (indicators * years) frame.
+    Missing values are skipped; a group with no data for a cell gives NaN.
+
+    Args:
+        panel (Panel): The indicator panel.
+        metadata (CountryMetadata): Country metadata.
+        indicators (list[str]): Indicator codes or names, or None for all.
+        by (str): "Region" or "IncomeGroup".
+        how (str): "sum", "mean", "weighted_mean" or "median".
+        weights (str): Indicator used as weights for "weighted_mean"; GDP by default.
+        start_year (str): The first year to include.
+        end_year (str): The last year to include.
+
+    Returns:
+        pd.DataFrame: Groups as rows and (indicator, year) as columns.
+    """
+    if how not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {how}. Expected one of {AGGREGATIONS}")
+    if by not in ("Region", "IncomeGroup"):
+        raise ValueError(f"Unknown grouping: {by}. Expected 'Region' or 'IncomeGroup'")
+
+    mask = metadata.country_mask(panel.country_codes)
+    groups = metadata.frame[by].reindex(panel.country_codes[mask]).to_numpy()
+    block = panel.array(indicators, start_year=start_year, end_year=end_year)[:, mask]
+    n_indicators, n_countries, n_years = block.shape
+
+    indicator_labels = panel.indicators if indicators is None else panel.indicators[[panel.indicator_position(i) for i in indicators]]
+    years = panel.years[panel.year_slice(start_year, end_year)]
+    columns = pd.MultiIndex.from_product([indicator_labels, years], names=["Indicator Code", "Year"])
+    values = pd.DataFrame(block.transpose(1, 0, 2).reshape(n_countries, -1), columns=columns)
+    grouped = values.groupby(groups)
+
+    if how == "sum":
+        result = grouped.sum(min_count=1)
+    elif how == "mean":
+        result = grouped.mean()
+    elif how == "median":
+        result = grouped.median()
+    else:
+        weight_values = panel.array([weights], start_year=start_year, end_year=end_year)[0, mask]
+        weight_values = np.tile(weight_values, (1, n_indicators))
+        present = values.notna().to_numpy() & ~np.isnan(weight_values)
+        weighted = pd.DataFrame(np.where(present, values.to_numpy() * weight_values, 0.0), columns=columns)
+        total_weight = pd.DataFrame(np.where(present, weight_values, 0.0), columns=columns)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = weighted.groupby(groups).sum() / total_weight.groupby(groups).sum().replace(0.0, np.nan)
+
+    return result.rename_axis(by)
@@ -0,0 +1,221 @@
+import glob
+import logging
+import os
+import numpy as np
+import pandas as pd
+from src.cache import CACHE_DIR, load_cached_data
+
+logger = logging.getLogger(__name__)
+
+class Panel:
+    """
+    Country x indicator x year store backed by a single contiguous float64 array.
+
+    The array is laid out indicator-major, shape (indicators, countries, years), so each
+    indicator's country x year plane is contiguous and can be handed out as a dataframe
+    without copying. Countries, indicators and years are integer-coded through pandas
+    indexes; frames use the country name as index and year strings as columns, matching
+    the frames produced by clean_data and set_country_index.
+
+    Attributes:
+        values (np.ndarray): Array of shape (indicators, countries, years).
+        indicators (pd.Index): Indicator codes, e.g. "NY.GDP.MKTP.CD".
+        indicator_names (pd.Index): Indicator names aligned with indicators.
+        countries (pd.Index): Country names.
+        country_codes (pd.Index): ISO3 country codes aligned with countries.
+        years (pd.Index): Year labels as strings.
+        imputed (np.ndarray): Boolean array shaped like values marking imputed cells, or None
+            when nothing was imputed. See src.imputation.impute_panel.
+    """
+
+    def __init__(self, values: np.ndarray, indicators: list[str], indicator_names: list[str],
+                 countries: list[str], country_codes: list[str], years: list[str], imputed: np.ndarray = None):
+        expected_shape = (len(indicators), len(countries), len(years))
+        if values.shape != expected_shape:
+            raise ValueError(f"Panel values have shape {values.shape}, expected {expected_shape}")
+
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.indicators = pd.Index(indicators, name="Indicator Code")
+        self.indicator_names = pd.Index(indicator_names, name="Indicator Name")
+        self.countries = pd.Index(countries, name="Country Name")
+        self.country_codes = pd.Index(country_codes, name="Country Code")
+        self.years = pd.Index([str(year) for year in years])
+        if imputed is not None and imputed.shape != expected_shape:
+            raise ValueError(f"Imputed mask has shape {imputed.shape}, expected {expected_shape}")
+        self.imputed = None if imputed is None else np.ascontiguousarray(imputed, dtype=bool)
+
+    def __repr__(self) -> str:
+        imputed = "" if self.imputed is None else f", {int(self.imputed.sum())} cells imputed"
+        return (f"Panel({len(self.indicators)} indicators x {len(self.countries)} countries x "
+                f"{len(self.years)} years, {self.values.nbytes / 1e6:.1f} MB{imputed})")
+
+    @classmethod
+    def from_frames(cls, frames: list[pd.DataFrame]) -> "Panel":
+        """
+        Build a panel from cleaned, country-indexed dataframes, one per indicator.
+
+        Args:
+            frames (list[pd.DataFrame]): Frames as returned by load_cached_data.
+
+        Returns:
+            Panel: A panel covering the union of countries and years across all frames.
+        """
+        country_codes = {}
+        years = set()
+        for df in frames:
+            country_codes.update(zip(df.index, df["Country Code"]))
+            years.update(col for col in df.columns if col.isdigit())
+
+        countries = pd.Index(sorted(country_codes))
+        year_labels = sorted(years, key=int)
+        year_index = pd.Index(year_labels)
+
+        values = np.full((len(frames), len(countries), len(year_labels)), np.nan)
+        indicators = []
+        indicator_names = []
+        for i, df in enumerate(frames):
+            year_columns = [col for col in df.columns if col.isdigit()]
+            rows = countries.get_indexer(df.index)
+            cols = year_index.get_indexer(year_columns)
+            values[i][np.ix_(rows, cols)] = df[year_columns].to_numpy(dtype=np.float64)
+            indicators.append(df["Indicator Code"].iloc[0])
+            indicator_names.append(df["Indicator Name"].iloc[0])
+
+        return cls(values, indicators, indicator_names, countries.tolist(),
+                   [country_codes[country] for country in countries], year_labels)
+
+    @classmethod
+    def from_directories(cls, data_dir: str = "data/", cache_dir: str = CACHE_DIR) -> "Panel":
+        """
+        Ingest every World Bank indicator file (API_*.csv) found in the subdirectories of data_dir.
+
+        Args:
+            data_dir (str): Directory holding one subdirectory per indicator.
+            cache_dir (str): Root directory of the load cache.
+
+        Returns:
+            Panel: A panel with one indicator per file found.
+        """
+        paths = sorted(glob.glob(os.path.join(data_dir, "*", "API_*.csv")))
+        if not paths:
+            raise FileNotFoundError(f"No indicator files found under {data_dir}")
+
+        frames = []
+        for path in paths:
+            df = load_cached_data(path, cache_dir=cache_dir)
+            if df is not None:
+                frames.append(df)
+
+        panel = cls.from_frames(frames)
+        logger.info(f"Built {panel!r} from {data_dir}")
+        return panel
+
+    def indicator_position(self, indicator: str) -> int:
+        """
+        Resolve an indicator code or name to its integer position.
+
+        Args:
+            indicator (str): Indicator code or indicator name.
+
+        Returns:
+            int: Position of the indicator on the first axis of values.
+        """
+        for labels in (self.indicators, self.indicator_names):
+            if indicator in labels:
+                return labels.get_loc(indicator)
+
+        raise KeyError(f"Unknown indicator: {indicator}")
+
+    def country_positions(self, countries: list[str]) -> np.ndarray:
+        """
+        Resolve country names to integer positions.
+
+        Args:
+            countries (list[str]): Country names.
+
+        Returns:
+            np.ndarray: Positions on the country axis of values.
+        """
+        positions = self.countries.get_indexer(countries)
+        if (positions == -1).any():
+            missing = [country for country, pos in zip(countries, positions) if pos == -1]
+            raise KeyError(f"Unknown countries: {missing}")
+
+        return positions
+
+    def year_slice(self, start_year: str = None, end_year: str = None) -> slice:
+        """
+        Translate an inclusive year range into a slice over the year axis.
+
+        Args:
+            start_year (str): The first year, or None for the earliest.
+            end_year (str): The last year, or None for the latest.
+
+        Returns:
+            slice: Slice over the year axis of values.
+        """
+        return self.years.slice_indexer(None if start_year is None else str(start_year),
+                                        None if end_year is None else str(end_year))
+
+    def frame(self, indicator: str, countries: list[str] = None, start_year: str = None, end_year: str = None,
+              include_imputed: bool = True) -> pd.DataFrame:
+        """
+        Return one indicator as a country x year dataframe.
+
+        Without a country list the frame is a view on the panel and shares its memory; selecting
+        countries gathers only those rows.
+
+        Args:
+            indicator (str): Indicator code or name.
+            countries (list[str]): Country names to keep, or None for all.
+            start_year (str): The first year to keep.
+            end_year (str): The last year to keep.
+            include_imputed (bool): Keep imputed cells. When False they are NaN, as before
+                imputation, and the frame is a copy.
+
+        Returns:
+            pd.DataFrame: Frame indexed by country name with year strings as columns.
+        """
+        years = self.year_slice(start_year, end_year)
+        position = self.indicator_position(indicator)
+        plane = self.values[position, :, years]
+        if not include_imputed and self.imputed is not None:
+            plane = np.where(self.imputed[position, :, years], np.nan, plane)
+        index = self.countries
+        if countries is not None:
+            positions = self.country_positions(countries)
+            plane = plane[positions]
+            index = self.countries[positions]
+
+        return pd.DataFrame(plane, index=index, columns=self.years[years], copy=False)
+
+    def array(self, indicators: list[str] = None, countries: list[str] = None, start_year: str = None, end_year: str = None,
+              include_imputed: bool = True) -> np.ndarray:
+        """
+        Return a (indicators, countries, years) block of the panel. Selecting by year alone
+        returns a view.
+
+        Args:
+            indicators (list[str]): Indicator codes or names, or None for all.
+            countries (list[str]): Country names, or None for all.
+            start_year (str): The first year to keep.
+            end_year (str): The last year to keep.
+            include_imputed (bool): Keep imputed cells. When False they are NaN and the block
+                is a copy.
+
+        Returns:
+            np.ndarray: The selected block.
+        """
+        years = self.year_slice(start_year, end_year)
+        block = self.values[:, :, years]
+        mask = None if include_imputed or self.imputed is None else self.imputed[:, :, years]
+        if indicators is not None:
+            positions = [self.indicator_position(indicator) for indicator in indicators]
+            block = block[positions]
+            mask = None if mask is None else mask[positions]
+        if countries is not None:
+            positions = self.country_positions(countries)
+            block = block[:, positions]
+            mask = None if mask is None else mask[:, positions]
+
+        return block if mask is None else np.where(mask, np.nan, block)
@@ -0,0 +1,497 @@
+import glob
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+from src.cache import CACHE_DIR, file_fingerprint, load_cached_data, source_version
+from src.columnar import output_location, resolve_format
+from src.clean_data import clean_data
+from src.data_helpers import prepare_plot_data, slice_dataframe
+from src.metadata import load_country_metadata
+from src.instrumentation import METRICS_FILE, configure_instrumentation, describe, measure_stage
+from src.memo import configure_memoization
+
+logger = logging.getLogger(__name__)
+
+ANALYSES = ("gdp_trends", "correlation", "regression", "regression_statsmodels",
+            "decomposition", "growth_rates", "rolling_statistics", "bootstrap")
+
+DEFAULT_CONFIG = {
+    "data_dir": "./data/",
+    "indicators": {"gdp": "NY.GDP.MKTP.CD", "inflation": "FP.CPI.TOTL.ZG"},
+    "primary": "gdp",
+    "pair": ["gdp", "inflation"],
+    "countries": ["United States", "China", "Russian Federation", "Germany",
+                  "France", "United Kingdom", "Japan", "Iran, Islamic Rep.", "Ireland"],
+    "decomposition_countries": ["United States", "Russian Federation", "Ireland"],
+    "decomposition_method": "moving_average",
+    "start_year": 2000,
+    "end_year": 2023,
+    "rolling_window": 4,
+    "export_format": None,
+    "imputation": None,
+    "bootstrap": {"n_resamples": 2000, "n_permutations": 2000, "confidence": 0.95, "seed": 0},
+    "analyses": [],
+    "show": False,
+    "max_workers": 4,
+    "cache_dir": CACHE_DIR,
+    "instrumentation": {"enabled": False, "metrics_path": METRICS_FILE, "trace_memory": False},
+    "memoization": {"enabled": True, "max_entries": 128, "max_bytes": 256 * 2**20, "cache_dir": None,
+                    "max_disk_bytes": 2**30}
+}
+
+@dataclass
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    Attributes:
+        name (str): Unique stage name.
+        func (Callable): Called as func(*dependency_outputs, **params).
+        deps (list[str]): Names of the stages whose outputs are passed to func, in order.
+        params (dict): Keyword arguments for func; part of the stage fingerprint.
+        inputs (list[str]): Files the stage reads directly; their size and mtime are fingerprinted.
+        persist (bool): Whether to memoize the output on disk as well as in memory.
+        artifacts (list[str]): Files the stage writes. A memoized result is only reused while
+            they all still exist.
+    """
+    name: str
+    func: Callable
+    deps: list[str] = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+    inputs: list[str] = field(default_factory=list)
+    persist: bool = True
+    artifacts: list[str] = field(default_factory=list)
+
+class Pipeline:
+    """
+    A DAG of stages that memoizes every stage by the fingerprint of its inputs and runs
+    independent branches concurrently.
+
+    A stage's fingerprint covers its function's code, the source of the src package it calls
+    into, its params, the files it reads and the fingerprints of its dependencies, so changing
+    anything upstream invalidates exactly the stages below it, and editing any analysis code
+    invalidates every stage. Outputs are kept in memory for the life of the pipeline and, for persisted
+    stages, pickled under cache_dir/pipeline/ so later runs can reuse them.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_workers: int = 4):
+        self.stages = {}
+        self.cache_dir = os.path.join(cache_dir, "pipeline")
+        self.max_workers = max_workers
+        self.memo = {}
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        missing = [dep for dep in stage.deps if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+
+        self.stages[stage.name] = stage
+        return stage
+
+    def fingerprint(self, name: str, fingerprints: dict) -> str:
+        stage = self.stages[name]
+        # Instrumented functions are wrapped; fingerprint the code that actually runs
+        code = inspect.unwrap(stage.func).__code__
+        digest = hashlib.sha256()
+        # Stage functions call into the rest of src, whose code their own bytecode does not cover
+        digest.update(source_version().encode())
+        digest.update(f"{stage.func.__module__}.{stage.func.__qualname__}".encode())
+        digest.update(code.co_code)
+        digest.update(repr(code.co_consts).encode())
+        digest.update(json.dumps(stage.params, sort_keys=True, default=str).encode())
+        for path in stage.inputs:
+            source = file_fingerprint(path, content_hash=False)
+            digest.update(f"{source['path']}:{source['mtime_ns']}:{source['size']}".encode())
+        for dep in stage.deps:
+            digest.update(fingerprints[dep].encode())
+
+        return digest.hexdigest()
+
+    def _load_persisted(self, key: str):
+        path = os.path.join(self.cache_dir, f"{key}.pkl")
+        if not os.path.exists(path):
+            return False, None
+        try:
+            with open(path, "rb") as f:
+                return True, pickle.load(f)
+        except Exception as e:
+            logger.error(f"Pipeline: Could not read memoized output {path}: {e}")
+            return False, None
+
+    def _persist(self, key: str, output) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{key}.pkl")
+        try:
+            with open(f"{path}.tmp", "wb") as f:
+                pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            logger.error(f"Pipeline: Could not memoize output of {key}: {e}")
+
+    def _execute(self, name: str, key: str, dep_outputs: list):
+        stage = self.stages[name]
+        reusable = all(os.path.exists(path) for path in stage.artifacts)
+        if reusable and key in self.memo:
+            return self.memo[key], "memory"
+        if reusable and stage.persist:
+            found, output = self._load_persisted(key)
+            if found:
+                return output, "disk"
+
+        with measure_stage(f"pipeline.{name}", *dep_outputs) as record:
+            output = stage.func(*dep_outputs, **stage.params)
+            record["output"] = describe(output)
+        if stage.persist:
+            self._persist(key, output)
+        return output, "computed"
+
+    def run(self, targets: list[str] = None) -> dict:
+        """
+        Run the stages needed for targets (default: every stage), reusing memoized outputs.
+
+        Args:
+            targets (list[str]): Stage names to produce.
+
+        Returns:
+            dict: Outputs of every stage that was needed, keyed by stage name.
+        """
+        needed = set()
+        pending = list(targets if targets is not None else self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].deps)
+
+        # Stages were added in dependency order, so fingerprints can be computed in one sweep
+        fingerprints = {}
+        for name in self.stages:
+            if name in needed:
+                fingerprints[name] = self.fingerprint(name, fingerprints)
+
+        outputs = {}
+        remaining = [name for name in self.stages if name in needed]
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while remaining or running:
+                for name in [name for name in remaining if all(dep in outputs for dep in self.stages[name].deps)]:
+                    remaining.remove(name)
+                    dep_outputs = [outputs[dep] for dep in self.stages[name].deps]
+                    running[executor.submit(self._execute, name, fingerprints[name], dep_outputs)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    output, source = future.result()
+                    outputs[name] = output
+                    self.memo[fingerprints[name]] = output
+                    logger.info(f"Pipeline stage {name}: {source}")
+
+        return outputs
+
+def find_indicator_file(data_dir: str, indicator: str) -> str:
+    """
+    Locate the World Bank CSV for an indicator code under data_dir.
+
+    Args:
+        data_dir (str): Directory holding one subdirectory per indicator.
+        indicator (str): Indicator code, e.g. "NY.GDP.MKTP.CD".
+
+    Returns:
+        str: Path to the indicator's API_*.csv file.
+    """
+    matches = sorted(glob.glob(os.path.join(data_dir, "*", f"API_{indicator}_*.csv")))
+    if not matches:
+        raise FileNotFoundError(f"No data file for indicator {indicator} under {data_dir}")
+
+    return matches[0]
+
+def _clean(df, data_dir: str, imputation: dict):
+    # load_cached_data already cleaned and indexed the frame; only imputation is left to do
+    if imputation is None:
+        return df
+
+    imputation = {"by": "Region", **imputation}
+    metadata = load_country_metadata(data_dir) if "regional_mean" in imputation["method"] else None
+    return clean_data(df, impute=imputation["method"], metadata=metadata, by=imputation["by"])
+
+def _imputed_cells(loaded, cleaned):
+    from src.imputation import imputed_cells
+    return imputed_cells(loaded, cleaned)
+
+def _observed(df, imputed):
+    from src.imputation import observed_values
+    return observed_values(df, imputed)
+
+def _gdp_trends(indexed, countries: list[str], start_year: int, end_year: int, show: bool) -> str:
+    from src.plot_gdp import plot_gdp_trends
+    gdp_plot = prepare_plot_data(indexed, countries, str(start_year), str(end_year))
+    plot_gdp_trends(gdp_plot, countries, list(range(start_year, end_year + 1)), show=show)
+    return "figures/gdp_trends.png"
+
+def _correlation(x, y):
+    from src.stats import correlation_analysis
+    return correlation_analysis(x, y)
+
+def _export_correlation(correlations, output_path: str, format: str) -> str:
+    from src.export_utils import export_correlation_table
+    return export_correlation_table(correlations, output_path, format)
+
+def _plot_correlation(correlations, title: str, show: bool) -> str:
+    from src.plot_stats import plot_correlations
+    plot_correlations(correlations, title=title, show=show)
+    return "figures/correlation_plot.png"
+
+def _regression(x, y):
+    from src.stats import linear_regression_sklearn
+    return linear_regression_sklearn(x, y)
+
+def _export_regression(results, output_path: str, format: str) -> str:
+    from src.export_utils import export_regression_table
+    return export_regression_table(results, output_path, format)
+
+def _regression_statsmodels(x, y, fill_gaps: bool = True):
+    from src.stats import linear_regression_statsmodels
+    return linear_regression_statsmodels(x, y, lazy=True, verbose=False, fill_gaps=fill_gaps)
+
+def _export_regression_statsmodels(results, output_path: str, summaries_path: str, format: str) -> list[str]:
+    from src.export_utils import export_linear_regression_statsmodels_table, export_regression_table
+    # The table holds the statistics; the full summaries are rendered one country at a time next to it
+    export_linear_regression_statsmodels_table(results, summaries_path)
+    return [export_regression_table(results, output_path, format), summaries_path]
+
+def _bootstrap(x, y, n_resamples: int, n_permutations: int, confidence: float, seed: int):
+    from src.stats import bootstrap_analysis
+    return bootstrap_analysis(x, y, n_resamples=n_resamples, n_permutations=n_permutations, confidence=confidence, seed=seed)
+
+def _export_bootstrap(results, output_path: str, format: str) -> str:
+    from src.export_utils import export_table
+    return export_table(results.rename_axis("Country").reset_index(), output_path, format)
+
+def _decomposition(indexed, countries: list[str], start_year: int, end_year: int, method: str):
+    from src.stats import time_series_decomposition
+    return time_series_decomposition(indexed, countries, str(start_year), str(end_year), method=method)
+
+def _plot_decomposition(results, countries: list[str], show: bool, n_jobs: int) -> list[str]:
+    from src.plot_stats import plot_time_series_decomposition
+    plot_time_series_decomposition(results, countries, show=show, n_jobs=n_jobs)
+    return [f"figures/decomposition_results_{country}.png" for country in countries]
+
+def _growth_rates(indexed, countries: list[str], start_year: int, end_year: int):
+    from src.stats import growth_rate_analysis
+    return growth_rate_analysis(indexed, countries, str(start_year), str(end_year))
+
+def _plot_growth_rates(growth_rates, show: bool) -> str:
+    from src.plot_stats import plot_growth_rate_analysis
+    plot_growth_rate_analysis(growth_rates, show=show)
+    return "figures/growth_rate_analysis.png"
+
+def _rolling_statistics(indexed, countries: list[str], start_year: int, end_year: int, years_window: int):
+    from src.stats import rolling_statistics
+    from src.analysis_utils import format_stats_as_dataframe
+    return format_stats_as_dataframe(rolling_statistics(indexed, countries, str(start_year), str(end_year), years_window))
+
+def _plot_rolling_statistics(rolling_stats, show: bool) -> list[str]:
+    from src.plot_stats import plot_rolling_statistics
+    plot_rolling_statistics(rolling_stats, show=show)
+    return ["figures/rolling_statistics_mean.png", "figures/rolling_statistics_std.png"]
+
+def _export_rolling_statistics(rolling_stats, output_path: str, format: str) -> str:
+    from src.export_utils import export_rolling_stats
+    return export_rolling_stats(rolling_stats, output_path, format)
+
+def resolve_countries(config: dict) -> list[str]:
+    """
+    Resolve the "countries" entry of a config to country names. It is either a list of names or
+    a metadata selection such as {"regions": ["Europe & Central Asia"], "income_groups": ["High income"]},
+    which is matched by country code against the indicator files. Only countries present in every
+    configured indicator are kept, so the per-indicator slices line up.
+
+    Args:
+        config (dict): Pipeline config.
+
+    Returns:
+        list[str]: Country names.
+    """
+    countries = config["countries"]
+    if not isinstance(countries, dict):
+        return countries
+
+    metadata = load_country_metadata(config["data_dir"])
+    selected = None
+    for indicator in config["indicators"].values():
+        df = load_cached_data(find_indicator_file(config["data_dir"], indicator), cache_dir=config["cache_dir"])
+        names = metadata.filter_frame(df.reset_index(), **countries)["Country Name"]
+        selected = names if selected is None else selected[selected.isin(names)]
+
+    return selected.tolist()
+
+def build_pipeline(config: dict) -> Pipeline:
+    """
+    Build the pipeline DAG for a config: load (through the load cache) -> clean -> slice per
+    indicator, then one analyze -> export/plot branch per requested analysis.
+
+    With imputation configured, clean:<alias>:imputed and slice:<alias>:imputed hold the masks
+    of imputed cells, and clean:<alias>:observed and slice:<alias>:observed the frames with those
+    cells missing again; the analyses listed in imputation["exclude_from"] read the latter.
+
+    Args:
+        config (dict): Pipeline config; missing keys fall back to DEFAULT_CONFIG.
+
+    Returns:
+        Pipeline: The pipeline, with a "targets" attribute listing the terminal stages.
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    unknown = [analysis for analysis in config["analyses"] if analysis not in ANALYSES]
+    if unknown:
+        raise ValueError(f"Unknown analyses: {unknown}. Expected any of {ANALYSES}")
+
+    show = config["show"]
+    # Interactive figures go through pyplot's global state, which is not thread-safe
+    pipeline = Pipeline(config["cache_dir"], max_workers=1 if show else config["max_workers"])
+    countries = resolve_countries(config)
+    start_year, end_year = config["start_year"], config["end_year"]
+
+    # Only the method and grouping change the clean frames; exclude_from only rewires analyses
+    imputation = None
+    if config["imputation"] is not None:
+        imputation = {key: value for key, value in config["imputation"].items() if key != "exclude_from"}
+
+    for alias, indicator in config["indicators"].items():
+        csv_file_loc = find_indicator_file(config["data_dir"], indicator)
+        # load_cached_data keeps its own cache of the parsed file, so the stage is not pickled again
+        pipeline.add(Stage(f"load:{alias}", load_cached_data, params={"csv_file_loc": csv_file_loc, "cache_dir": config["cache_dir"]},
+                           inputs=[csv_file_loc], persist=False))
+        # Without imputation the clean stage passes the cached load frame through, so pickling it
+        # would only store a second copy
+        pipeline.add(Stage(f"clean:{alias}", _clean, deps=[f"load:{alias}"],
+                           params={"data_dir": config["data_dir"], "imputation": imputation}, persist=imputation is not None))
+        pipeline.add(Stage(f"slice:{alias}", slice_dataframe, deps=[f"clean:{alias}"],
+                           params={"countries": countries, "start_year": start_year, "end_year": end_year}))
+        if imputation is not None:
+            # Companion outputs marking the imputed cells, and the frames with them masked again
+            # for analyses that should only see observed values
+            pipeline.add(Stage(f"clean:{alias}:imputed", _imputed_cells, deps=[f"load:{alias}", f"clean:{alias}"]))
+            pipeline.add(Stage(f"slice:{alias}:imputed", slice_dataframe, deps=[f"clean:{alias}:imputed"],
+                               params={"countries": countries, "start_year": start_year, "end_year": end_year}))
+            for kind in ("clean", "slice"):
+                pipeline.add(Stage(f"{kind}:{alias}:observed", _observed, deps=[f"{kind}:{alias}", f"{kind}:{alias}:imputed"]))
+
+    primary = config["primary"]
+    x_alias, y_alias = config["pair"]
+    range_params = {"start_year": start_year, "end_year": end_year}
+    targets = [f"slice:{alias}" for alias in config["indicators"]]
+    excluded = (config["imputation"] or {}).get("exclude_from", [])
+    # Resolved once, so the artifact paths carry the extension of the format actually written
+    export_format = resolve_format(config["export_format"])
+
+    for analysis in config["analyses"]:
+        # Analyses excluded from imputation read the frames with the imputed cells masked again
+        observed = ":observed" if analysis in excluded else ""
+        if analysis == "gdp_trends":
+            pipeline.add(Stage("plot:gdp_trends", _gdp_trends, deps=[f"clean:{primary}{observed}"], persist=not show,
+                               params={"countries": countries, "show": show, **range_params},
+                               artifacts=["figures/gdp_trends.png"]))
+            targets.append("plot:gdp_trends")
+        elif analysis == "correlation":
+            pipeline.add(Stage("analyze:correlation", _correlation, deps=[f"slice:{x_alias}{observed}", f"slice:{y_alias}{observed}"]))
+            export_path = output_location("output/correlation_results", export_format)
+            pipeline.add(Stage("export:correlation", _export_correlation, deps=["analyze:correlation"],
+                               params={"output_path": export_path, "format": export_format}, artifacts=[export_path]))
+            pipeline.add(Stage("plot:correlation", _plot_correlation, deps=["analyze:correlation"], persist=not show,
+                               params={"title": f"{x_alias.upper()} and {y_alias.capitalize()} Correlation", "show": show},
+                               artifacts=["figures/correlation_plot.png"]))
+            targets.extend(["export:correlation", "plot:correlation"])
+        elif analysis == "regression":
+            pipeline.add(Stage("analyze:regression", _regression, deps=[f"slice:{x_alias}{observed}", f"slice:{y_alias}{observed}"]))
+            export_path = output_location("output/regression_sklearn", export_format)
+            pipeline.add(Stage("export:regression", _export_regression, deps=["analyze:regression"],
+                               params={"output_path": export_path, "format": export_format}, artifacts=[export_path]))
+            targets.append("export:regression")
+        elif analysis == "regression_statsmodels":
+            pipeline.add(Stage("analyze:regression_statsmodels", _regression_statsmodels, deps=[f"slice:{x_alias}{observed}", f"slice:{y_alias}{observed}"],
+                               params={"fill_gaps": not observed}))
+            export_path = output_location("output/regression_statsmodels", export_format)
+            summaries_path = "output/regression_statsmodels_summaries.txt"
+            pipeline.add(Stage("export:regression_statsmodels", _export_regression_statsmodels, deps=["analyze:regression_statsmodels"],
+                               params={"output_path": export_path, "summaries_path": summaries_path, "format": export_format},
+                               artifacts=[export_path, summaries_path]))
+            targets.append("export:regression_statsmodels")
+        elif analysis == "bootstrap":
+            export_path = output_location("output/bootstrap", export_format)
+            pipeline.add(Stage("analyze:bootstrap", _bootstrap, deps=[f"slice:{x_alias}{observed}", f"slice:{y_alias}{observed}"],
+                               params={**DEFAULT_CONFIG["bootstrap"], **config["bootstrap"]}))
+            pipeline.add(Stage("export:bootstrap", _export_bootstrap, deps=["analyze:bootstrap"],
+                               params={"output_path": export_path, "format": export_format}, artifacts=[export_path]))
+            targets.append("export:bootstrap")
+        elif analysis == "decomposition":
+            decomposition_countries = config["decomposition_countries"]
+            pipeline.add(Stage("analyze:decomposition", _decomposition, deps=[f"clean:{primary}{observed}"],
+                               params={"countries": decomposition_countries, "method": config["decomposition_method"], **range_params}))
+            pipeline.add(Stage("plot:decomposition", _plot_decomposition, deps=["analyze:decomposition"], persist=not show,
+                               params={"countries": decomposition_countries, "show": show, "n_jobs": 1},
+                               artifacts=[f"figures/decomposition_results_{country}.png" for country in decomposition_countries]))
+            targets.append("plot:decomposition")
+        elif analysis == "growth_rates":
+            pipeline.add(Stage("analyze:growth_rates", _growth_rates, deps=[f"clean:{primary}{observed}"],
+                               params={"countries": countries, **range_params}))
+            pipeline.add(Stage("plot:growth_rates", _plot_growth_rates, deps=["analyze:growth_rates"], persist=not show,
+                               params={"show": show}, artifacts=["figures/growth_rate_analysis.png"]))
+            targets.append("plot:growth_rates")
+        elif analysis == "rolling_statistics":
+            pipeline.add(Stage("analyze:rolling_statistics", _rolling_statistics, deps=[f"clean:{primary}{observed}"],
+                               params={"countries": countries, "years_window": config["rolling_window"], **range_params}))
+            pipeline.add(Stage("plot:rolling_statistics", _plot_rolling_statistics, deps=["analyze:rolling_statistics"], persist=not show,
+                               params={"show": show},
+                               artifacts=["figures/rolling_statistics_mean.png", "figures/rolling_statistics_std.png"]))
+            export_path = output_location("output/rolling_statistics", export_format)
+            pipeline.add(Stage("export:rolling_statistics", _export_rolling_statistics, deps=["analyze:rolling_statistics"],
+                               params={"output_path": export_path, "format": export_format}, artifacts=[export_path]))
+            targets.extend(["export:rolling_statistics", "plot:rolling_statistics"])
+
+    pipeline.targets = targets
+    return pipeline
+
+def load_config(config_path: str = None) -> dict:
+    """
+    Read a JSON pipeline config, falling back to DEFAULT_CONFIG for missing keys.
+
+    Args:
+        config_path (str): Path to a JSON config file, or None for the defaults.
+
+    Returns:
+        dict: The merged config.
+    """
+    if config_path is None:
+        return dict(DEFAULT_CONFIG)
+
+    with open(config_path, "r") as f:
+        return {**DEFAULT_CONFIG, **json.load(f)}
+
+def run_pipeline(config: dict, kinds: list[str] = None) -> dict:
+    """
+    Build and run the pipeline for a config.
+
+    Args:
+        config (dict): Pipeline config.
+        kinds (list[str]): Only run stages of these kinds ("load", "clean", "slice",
+            "analyze", "export", "plot") and what they depend on. None runs every branch.
+
+    Returns:
+        dict: Outputs of every stage that ran, keyed by stage name.
+    """
+    configure_instrumentation(**{**DEFAULT_CONFIG["instrumentation"], **config.get("instrumentation", {})})
+    configure_memoization(**{**DEFAULT_CONFIG["memoization"], **config.get("memoization", {})})
+    pipeline = build_pipeline(config)
+    if kinds is None:
+        return pipeline.run(pipeline.targets)
+
+    return pipeline.run([name for name in pipeline.stages if name.partition(":")[0] in kinds])
@@ -1,26 +1,30 @@
 import logging 
 import pandas as pd
-import matplotlib.pyplot as plt
+from src.render import finish_figure, new_figure
+from src.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
-def plot_gdp_trends(df: pd.DataFrame, countries: list[int], years: list[int]) -> None:
+@instrument
+def plot_gdp_trends(df: pd.DataFrame, countries: list[int], years: list[int], show: bool = True, output_path = "figures/gdp_trends.png",
+                    title: str = "GDP Trends (Current US$)", ylabel: str = "GDP") -> None:
     try:   
+        fig = new_figure(show=show)
+        ax = fig.add_subplot()
         for country in countries:
             gdp_values = df.loc[country, years].astype(float)
-            plt.plot(years, gdp_values, label=country)
+            ax.plot(years, gdp_values, label=country)
         
-        plt.title("GDP Trends (Current US$)")
-        plt.ylabel("GDP")
-        plt.xlabel("Year")
-        plt.xticks(rotation=45)
-        plt.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.tight_layout()
-        plt.savefig("figures/gdp_trends.png", bbox_inches="tight")
-        plt.show()
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.set_xlabel("Year")
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
+        fig.tight_layout()
+        finish_figure(fig, output_path, show)
     except KeyError as e:
         logger.error(f"Key error while plotting GDP trends: {e}")
     except FileNotFoundError as e:
         logger.error(f"Save path issue: {e}")
     except Exception as e:
-        logger.error(f"Unexpected error in plot_gdp_trends: {e}")
\ No newline at end of file
+        logger.error(f"Unexpected error in plot_gdp_trends: {e}")
@@ -1,16 +1,17 @@
 
-import matplotlib.pyplot as plt
-from matplotlib.ticker import PercentFormatter
-import seaborn as sns
+from typing import TYPE_CHECKING
 import pandas as pd
 import logging
-from statsmodels.tsa.seasonal import DecomposeResult
+from src.render import DIR, finish_figure, new_figure, render_decompositions
+from src.instrumentation import instrument
 
-logger = logging.getLogger(__file__)
+if TYPE_CHECKING:
+    from statsmodels.tsa.seasonal import DecomposeResult
 
-DIR = "figures/"
+logger = logging.getLogger(__file__)
 
-def plot_correlations(correlations: pd.Series, title: str = "Correlation", output_path: str = "figures/correlation_plot.png") -> None:
+@instrument
+def plot_correlations(correlations: pd.Series, title: str = "Correlation", output_path: str = "figures/correlation_plot.png", show: bool = True) -> None:
     """
     Plots a horizontal bar chart of correlation coefficients by country.
     
@@ -18,107 +19,130 @@ def plot_correlations(correlations: pd.Series, title: str = "Correlation", outpu
         correlation (pd.Series): Series of correlation values (index: countries).
         title (str): Title for the chart.
         output_path (str): File path to save the chart.
+        show (bool): Display the chart. When False it is rendered headlessly and only saved.
     """
+    import seaborn as sns
+
     try:
         correlations = correlations.sort_values()
         
-        plt.figure(figsize=(10, 6))
+        fig = new_figure(figsize=(10, 6), show=show)
+        ax = fig.add_subplot()
         sns.barplot(
             x=correlations.values,
             y=correlations.index,
             hue=correlations.index,
             dodge=False,
             palette="coolwarm",
-            legend=False
+            legend=False,
+            ax=ax
         )
-        plt.xlabel("Correlation Coefficient")
-        plt.title(title)
-        plt.axvline(0, color="gray", linestyle="--")
-        plt.tight_layout()
-        plt.savefig(output_path, bbox_inches="tight")
-        plt.show()
+        ax.set_xlabel("Correlation Coefficient")
+        ax.set_title(title)
+        ax.axvline(0, color="gray", linestyle="--")
+        fig.tight_layout()
+        finish_figure(fig, output_path, show)
     except Exception as e:
         logger.error(f"plot_correlations: Unexpected error: {e}")
         
 
-def plot_time_series_decomposition(results: list[DecomposeResult], countries: list[str]) -> None:
+@instrument
+def plot_time_series_decomposition(results: list["DecomposeResult"], countries: list[str], show: bool = True, n_jobs: int = 1) -> None:
     """
     Plots a line graph for a time series decomposition.
     
     Args:
         results (list[DecomposeResult]): List of countries' time series data (index: countries).
         countries (list[str]): List of countries' names.
+        show (bool): Display each chart. When False the charts are rendered headlessly from a
+            reused figure template, across n_jobs processes.
+        n_jobs (int): Number of worker processes for headless rendering.
     """
     try:
         if(len(results) != len(countries)):
             raise ValueError("Lists must be the same length")
+
+        if not show:
+            render_decompositions(results, countries, output_dir=DIR, n_jobs=n_jobs)
+            return
     
         for country, result in zip(countries, results):
-            result.plot()
-            plt.suptitle(f"Time Series Decomposition of GDP - {country}", fontsize=16)
-            plt.tight_layout()
-            plt.savefig(f"{DIR}decomposition_results_{country}.png", bbox_inches="tight")
-            plt.show()
+            fig = result.plot()
+            fig.suptitle(f"Time Series Decomposition of GDP - {country}", fontsize=16)
+            fig.tight_layout()
+            finish_figure(fig, f"{DIR}decomposition_results_{country}.png", show)
             logger.info("plot_time_series_decomposition: Time series decomposition chart generated")
             
     except Exception as e:
-        logger.lerror(f"plot_time_series_decomposition: Unexpected error {e}")
+        logger.error(f"plot_time_series_decomposition: Unexpected error {e}")
         
-def plot_growth_rate_analysis(countries_growth_rates: dict, years: list[int]) -> None:
+@instrument
+def plot_growth_rate_analysis(countries_growth_rates: pd.DataFrame, show: bool = True, output_path = f"{DIR}growth_rate_analysis.png") -> None:
     """
-    Plots a line graph for a time series decomposition.
+    Plots a line graph of year-over-year growth rates.
     
     Args:
-        countries_growth_rates (dict): Dict of countries' growth rate analysis.
-        years (list[str]): The list of years in range of the data.
+        countries_growth_rates (pd.DataFrame): Growth rates from growth_rate_analysis (index: countries, columns: years).
+        show (bool): Display the chart. When False it is rendered headlessly and only saved.
+        output_path: File path or binary file object to save the chart to.
     """
-    for country in countries_growth_rates:
-        growth_rates = countries_growth_rates[country]
-        plt.plot(years, growth_rates, label=country)
+    from matplotlib.ticker import PercentFormatter
+
+    fig = new_figure(show=show)
+    ax = fig.add_subplot()
+    years = [int(year) for year in countries_growth_rates.columns]
+    for country, growth_rates in countries_growth_rates.iterrows():
+        ax.plot(years, growth_rates.values, label=country)
 
-    plt.gca().yaxis.set_major_formatter(PercentFormatter(xmax=100))
-    plt.title("Growth Rate Analysis (Current US$)")
-    plt.ylabel("Growth Rate")
-    plt.xlabel("Year")
-    plt.xticks(rotation=45)
-    plt.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
-    plt.tight_layout()
-    plt.savefig(f"{DIR}growth_rate_analysis.png", bbox_inches="tight")
-    plt.show()
+    ax.yaxis.set_major_formatter(PercentFormatter(xmax=100))
+    ax.set_title("Growth Rate Analysis (Current US$)")
+    ax.set_ylabel("Growth Rate")
+    ax.set_xlabel("Year")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
+    fig.tight_layout()
+    finish_figure(fig, output_path, show)
 
-# TODO: Refactor
-def plot_rolling_statistics(countries_stats: pd.DataFrame) -> None:
+@instrument
+def plot_rolling_statistic(countries_stats: pd.DataFrame, stat: str = "Mean", label: str = None, output_path = None, show: bool = True) -> None:
     """
-    Plots a line graph for a time series decomposition.
-    
+    Plots a line graph of one rolling statistic.
+
     Args:
-        countries_growth_rates (dict): Dict of countries' growth rate analysis.
-        years (list[str]): The list of years in range of the data.
+        countries_stats (pd.DataFrame): Long-format rolling statistics from rolling_statistics.
+        stat (str): The statistic column to plot, e.g. "Mean" or "Std".
+        label (str): Axis label, defaults to stat.
+        output_path: File path or binary file object to save the chart to. Defaults to
+            figures/rolling_statistics_<stat>.png.
+        show (bool): Display the chart. When False it is rendered headlessly and only saved.
     """
-    years = countries_stats["Year"].tolist()
-    
-    for country in countries_stats["Country"].unique():
-        country_mean_data = countries_stats[countries_stats["Country"] == country]["Mean"]
-        plt.plot(years, country_mean_data, label=country)
+    label = label or stat
+    output_path = output_path or f"{DIR}rolling_statistics_{stat.lower()}.png"
+    multiple_windows = "Window" in countries_stats.columns and countries_stats["Window"].nunique() > 1
+    groups = countries_stats.groupby(["Country", "Window"] if "Window" in countries_stats.columns else ["Country"], sort=False)
 
-    plt.title("Rolling Statistics: Mean (Current US$)")
-    plt.ylabel("Mean")
-    plt.xlabel("Year")
-    plt.xticks(rotation=45)
-    plt.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
-    plt.tight_layout()
-    plt.savefig(f"{DIR}rolling_statistics_mean.png", bbox_inches="tight")
-    plt.show()
+    fig = new_figure(show=show)
+    ax = fig.add_subplot()
+    for country_key, country_stats in groups:
+        line_label = f"{country_key[0]} ({country_key[1]}y)" if multiple_windows else country_key[0]
+        ax.plot(country_stats["Year"], country_stats[stat], label=line_label)
 
-    for country in countries_stats["Country"].unique():
-        country_std_data = countries_stats[countries_stats["Country"] == country]["Std"]
-        plt.plot(years, country_std_data, label=country)
+    ax.set_title(f"Rolling Statistics: {label} (Current US$)")
+    ax.set_ylabel(label)
+    ax.set_xlabel("Year")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
+    fig.tight_layout()
+    finish_figure(fig, output_path, show)
 
-    plt.title("Rolling Statistics: Std. (Current US$)")
-    plt.ylabel("Std.")
-    plt.xlabel("Year")
-    plt.xticks(rotation=45)
-    plt.legend(title="Country", bbox_to_anchor=(1.05, 1), loc="upper left")
-    plt.tight_layout()
-    plt.savefig(f"{DIR}rolling_statistics_std.png", bbox_inches="tight")
-    plt.show()
+@instrument
+def plot_rolling_statistics(countries_stats: pd.DataFrame, show: bool = True) -> None:
+    """
+    Plots line graphs of the rolling mean and standard deviation.
+    
+    Args:
+        countries_stats (pd.DataFrame): Long-format rolling statistics from rolling_statistics.
+        show (bool): Display the charts. When False they are rendered headlessly and only saved.
+    """
+    plot_rolling_statistic(countries_stats, "Mean", "Mean", f"{DIR}rolling_statistics_mean.png", show)
+    plot_rolling_statistic(countries_stats, "Std", "Std.", f"{DIR}rolling_statistics_std.png", show)
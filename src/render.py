@@ -0,0 +1,171 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+import numpy as np
+
+# matplotlib is imported on first use so that importing the plot modules stays cheap
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+logger = logging.getLogger(__name__)
+
+DIR = "figures/"
+
+DECOMPOSITION_COMPONENTS = ("observed", "trend", "seasonal", "resid")
+
+def use_headless_backend() -> None:
+    """
+    Switch matplotlib to the non-interactive Agg backend so figures never open GUI windows.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+def new_figure(figsize: tuple[float, float] = None, show: bool = True) -> "Figure":
+    """
+    Create a figure for one chart.
+
+    Interactive figures are registered with pyplot so plt.show() can display them; headless
+    figures are plain Figure objects that never touch pyplot's global state, so they are safe
+    to create from worker processes and are freed as soon as they go out of scope.
+
+    Args:
+        figsize (tuple[float, float]): Figure size in inches, or None for the default.
+        show (bool): Whether the figure will be displayed.
+
+    Returns:
+        Figure: The new figure.
+    """
+    if show:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+def finish_figure(fig: "Figure", output_path, show: bool = True) -> None:
+    """
+    Save a figure and, for interactive figures, display and then release it.
+
+    Args:
+        fig (Figure): The figure to finish.
+        output_path: File path or binary file object to save the figure to.
+        show (bool): Whether to display the figure.
+    """
+    fig.savefig(output_path, bbox_inches="tight")
+    if show:
+        import matplotlib.pyplot as plt
+        plt.show()
+        plt.close(fig)
+
+class DecompositionTemplate:
+    """
+    Reusable four-panel figure (observed, trend, seasonal, residual) for time series
+    decompositions.
+
+    The figure, axes and artists are built once; rendering a country only swaps the line data,
+    rescales the axes and updates the title, which is much cheaper than building a new figure
+    per country.
+    """
+
+    def __init__(self, figsize: tuple[float, float] = (8, 8)):
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=figsize)
+        self.axes = self.fig.subplots(len(DECOMPOSITION_COMPONENTS), 1, sharex=True)
+        self.lines = {}
+        for ax, component in zip(self.axes, DECOMPOSITION_COMPONENTS):
+            if component == "resid":
+                (self.lines[component],) = ax.plot([], [], marker="o", linestyle="none")
+                ax.axhline(0, color="gray", linestyle="--", linewidth=0.8)
+            else:
+                (self.lines[component],) = ax.plot([], [])
+            ax.set_ylabel(component.capitalize())
+        self.title = self.fig.suptitle("", fontsize=16)
+        self.fig.tight_layout()
+
+    def render(self, years: np.ndarray, components: dict[str, np.ndarray], title: str, output_path) -> None:
+        """
+        Draw one decomposition into the template and save it.
+
+        Args:
+            years (np.ndarray): X values shared by all components.
+            components (dict[str, np.ndarray]): Arrays keyed by DECOMPOSITION_COMPONENTS.
+            title (str): Figure title.
+            output_path: File path or binary file object to save the figure to.
+        """
+        for ax, component in zip(self.axes, DECOMPOSITION_COMPONENTS):
+            self.lines[component].set_data(years, components[component])
+            ax.relim()
+            ax.autoscale_view()
+        self.title.set_text(title)
+        self.fig.savefig(output_path, bbox_inches="tight")
+
+def decomposition_components(result) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    Pull the plotted arrays out of a statsmodels DecomposeResult.
+
+    Args:
+        result (DecomposeResult): A decomposition result with a datetime or year index.
+
+    Returns:
+        tuple[np.ndarray, dict[str, np.ndarray]]: Years and the component arrays.
+    """
+    index = result.observed.index
+    years = np.asarray(index.year if hasattr(index, "year") else index, dtype=np.int64)
+    components = {component: np.asarray(getattr(result, component), dtype=np.float64)
+                  for component in DECOMPOSITION_COMPONENTS}
+
+    return years, components
+
+_template = None
+
+def _init_worker() -> None:
+    global _template
+    use_headless_backend()
+    _template = DecompositionTemplate()
+
+def _render_decomposition(country: str, years: np.ndarray, components: dict[str, np.ndarray], title: str, output_path: str) -> str:
+    # Runs in a worker process; each worker reuses its own template
+    global _template
+    if _template is None:
+        _template = DecompositionTemplate()
+    _template.render(years, components, title, output_path)
+    return output_path
+
+def render_decompositions(results: list, countries: list[str], output_dir: str = DIR, n_jobs: int = 1,
+                          title: str = "Time Series Decomposition of GDP") -> list[str]:
+    """
+    Render one decomposition chart per country headlessly, optionally across a process pool.
+
+    Args:
+        results (list | Decomposition): DecomposeResult objects, one per country, or a batch
+            Decomposition covering the countries; the latter is rendered straight from its arrays.
+        countries (list[str]): Country names aligned with results.
+        output_dir (str): Directory the charts are written to.
+        n_jobs (int): Number of worker processes. 1 renders in-process.
+        title (str): Title prefix; the country name is appended.
+
+    Returns:
+        list[str]: Paths of the written charts.
+    """
+    batch = hasattr(results, "components")
+    if not batch and len(results) != len(countries):
+        raise ValueError("Lists must be the same length")
+
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    for position, country in enumerate(countries):
+        years, components = results.components(country) if batch else decomposition_components(results[position])
+        output_path = os.path.join(output_dir, f"decomposition_results_{country}.png")
+        tasks.append((country, years, components, f"{title} - {country}", output_path))
+
+    if n_jobs > 1 and tasks:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+            paths = list(executor.map(_render_decomposition, *zip(*tasks), chunksize=max(1, len(tasks) // (n_jobs * 4))))
+    else:
+        paths = [_render_decomposition(*task) for task in tasks]
+
+    logger.info(f"Rendered {len(paths)} decomposition charts to {output_dir}")
+    return paths
@@ -0,0 +1,382 @@
+import asyncio
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+import pandas as pd
+from src.cache import CACHE_DIR
+from src.imputation import impute_panel
+from src.load_data import read_last_updated
+from src.metadata import load_country_metadata
+from src.panel import Panel
+from src.render import use_headless_backend
+from src.stats import correlation_analysis, growth_rate_analysis, rolling_statistics
+
+logger = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+PORT = 8050
+
+class ResultCache:
+    """
+    Least-recently-used cache of encoded responses keyed by query.
+
+    Only touched from the event loop thread, so it needs no locking. Concurrent misses for the
+    same key share one computation instead of computing it once per request.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return self.entries[key]
+
+    def put(self, key, value) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, or await compute() once and cache its result.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        if key in self.pending:
+            return await asyncio.shield(self.pending[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            value = await compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            # Cancellation included, so requests waiting on the shared result never hang
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            del self.pending[key]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+class QueryError(Exception):
+    """
+    A request that cannot be answered, with the HTTP status to report.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+class Dataset:
+    """
+    The cleaned indicator panel held resident in memory, together with the release tag used
+    for ETags. The tag changes whenever the "Last Updated Date" of any indicator file does.
+
+    With impute set, the panel is imputed once at load time (see src.imputation) and queries
+    can still ask for the observed values only with "imputed=0".
+    """
+
+    def __init__(self, data_dir: str = "data/", cache_dir: str = CACHE_DIR, impute: str | list[str] = None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self.impute = impute
+        self.load()
+
+    def load(self) -> None:
+        paths = sorted(glob.glob(os.path.join(self.data_dir, "*", "API_*.csv")))
+        self.last_updated = {os.path.basename(path): read_last_updated(path) for path in paths}
+        self.release = hashlib.sha1(json.dumps(self.last_updated, sort_keys=True).encode()).hexdigest()[:12]
+        self.panel = Panel.from_directories(self.data_dir, self.cache_dir)
+        self.metadata = load_country_metadata(self.data_dir)
+        if self.impute is not None:
+            self.panel = impute_panel(self.panel, self.impute, self.metadata)
+
+    def countries(self, params: dict) -> list[str]:
+        """
+        Resolve the country selection of a query: "countries" (names), "codes", "regions" and
+        "income_groups", all comma-separated. With no selection all countries except the WDI
+        aggregates are returned.
+        """
+        if "countries" in params:
+            countries = params["countries"].split(",")
+            try:
+                self.panel.country_positions(countries)
+            except KeyError as e:
+                raise QueryError(HTTPStatus.NOT_FOUND, str(e.args[0]))
+            return countries
+
+        selection = {key: params[key].split(",") for key in ("codes", "regions", "income_groups") if key in params}
+        return self.metadata.select_countries(self.panel, **selection)
+
+    def frame(self, params: dict, key: str = "indicator") -> pd.DataFrame:
+        if key not in params:
+            raise QueryError(HTTPStatus.BAD_REQUEST, f"Missing query parameter: {key}")
+        try:
+            return self.panel.frame(params[key], self.countries(params), params.get("start"), params.get("end"),
+                                    include_imputed=params.get("imputed") != "0")
+        except KeyError as e:
+            raise QueryError(HTTPStatus.NOT_FOUND, str(e.args[0]))
+
+def _json(data) -> tuple[bytes, str]:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8"), "application/json"
+
+def _frame_json(df: pd.DataFrame, orient: str = "index") -> tuple[bytes, str]:
+    return df.to_json(orient=orient).encode("utf-8"), "application/json"
+
+def _png(plot, *args, **kwargs) -> tuple[bytes, str]:
+    buffer = io.BytesIO()
+    plot(*args, show=False, output_path=buffer, **kwargs)
+    if not buffer.getbuffer().nbytes:
+        raise QueryError(HTTPStatus.INTERNAL_SERVER_ERROR, "Rendering failed")
+    return buffer.getvalue(), "image/png"
+
+class QueryService:
+    """
+    Answers queries against a Dataset. Every endpoint returns (body, content type); results are
+    cached by path and query parameters, so a repeated query only costs the socket write.
+
+    Endpoints (GET, parameters in the query string):
+        /indicators                         Indicators, years and release dates.
+        /slice?indicator=                   Values per country and year.
+        /growth?indicator=                  Year-over-year growth rates.
+        /rolling?indicator=&window=         Rolling statistics.
+        /correlation?x=&y=                  Per-country correlation of two indicators.
+        /plot/<trends|growth|rolling|correlation>.png   The matching chart.
+
+    The data endpoints take the country selection of Dataset.countries, "start" / "end" years
+    and "imputed=0" to leave imputed cells out.
+    """
+
+    def __init__(self, dataset: Dataset, cache_size: int = 256, plot_workers: int = 1):
+        self.dataset = dataset
+        self.cache = ResultCache(cache_size)
+        # Compute-heavy queries run off the event loop; matplotlib rendering gets its own pool
+        self.compute_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query")
+        self.plot_executor = ThreadPoolExecutor(max_workers=plot_workers, thread_name_prefix="plot")
+        # Path -> (handler, executor, parameters checked by validate)
+        self.routes = {
+            "/indicators": (self.indicators, self.compute_executor, ()),
+            "/slice": (self.slice, self.compute_executor, ("indicator",)),
+            "/growth": (self.growth, self.compute_executor, ("indicator",)),
+            "/rolling": (self.rolling, self.compute_executor, ("indicator", "window")),
+            "/correlation": (self.correlation, self.compute_executor, ("x", "y")),
+            "/plot/trends.png": (self.plot_trends, self.plot_executor, ("indicator",)),
+            "/plot/growth.png": (self.plot_growth, self.plot_executor, ("indicator",)),
+            "/plot/rolling.png": (self.plot_rolling, self.plot_executor, ("indicator", "window")),
+            "/plot/correlation.png": (self.plot_correlation, self.plot_executor, ("x", "y"))
+        }
+
+    def etag(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return f'"{self.dataset.release}-{digest}"'
+
+    def validate(self, path: str, params: dict) -> None:
+        """
+        Check that a query names a known endpoint, indicators and countries without computing
+        it, so a conditional request is only answered with 304 when it would succeed.
+        """
+        if path not in self.routes:
+            raise QueryError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+
+        checks = self.routes[path][2]
+        for key in checks:
+            if key == "window":
+                self._window(params)
+                continue
+            if key not in params:
+                raise QueryError(HTTPStatus.BAD_REQUEST, f"Missing query parameter: {key}")
+            try:
+                self.dataset.panel.indicator_position(params[key])
+            except KeyError as e:
+                raise QueryError(HTTPStatus.NOT_FOUND, str(e.args[0]))
+        if checks:
+            self.dataset.countries(params)
+
+    async def query(self, path: str, params: dict) -> tuple[bytes, str]:
+        if path not in self.routes:
+            raise QueryError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+
+        handler, executor, _ = self.routes[path]
+        key = (path, tuple(sorted(params.items())))
+        loop = asyncio.get_running_loop()
+        return await self.cache.get_or_compute(key, lambda: loop.run_in_executor(executor, handler, params))
+
+    def indicators(self, params: dict) -> tuple[bytes, str]:
+        panel = self.dataset.panel
+        return _json({
+            "indicators": dict(zip(panel.indicators, panel.indicator_names)),
+            "years": [panel.years[0], panel.years[-1]],
+            "countries": len(panel.countries),
+            "last_updated": self.dataset.last_updated
+        })
+
+    def slice(self, params: dict) -> tuple[bytes, str]:
+        return _frame_json(self.dataset.frame(params))
+
+    def growth(self, params: dict) -> tuple[bytes, str]:
+        return _frame_json(growth_rate_analysis(self.dataset.frame(params)))
+
+    def _window(self, params: dict) -> int:
+        try:
+            window = int(params.get("window", 3))
+        except ValueError:
+            raise QueryError(HTTPStatus.BAD_REQUEST, "window must be an integer")
+        if window < 1:
+            raise QueryError(HTTPStatus.BAD_REQUEST, "window must be at least 1")
+        return window
+
+    def _rolling(self, params: dict) -> pd.DataFrame:
+        return rolling_statistics(self.dataset.frame(params), years_window=self._window(params))
+
+    def rolling(self, params: dict) -> tuple[bytes, str]:
+        return _frame_json(self._rolling(params), orient="records")
+
+    def _correlation(self, params: dict) -> pd.Series:
+        return correlation_analysis(self.dataset.frame(params, "x"), self.dataset.frame(params, "y")).dropna()
+
+    def correlation(self, params: dict) -> tuple[bytes, str]:
+        return _json(self._correlation(params).to_dict())
+
+    def plot_trends(self, params: dict) -> tuple[bytes, str]:
+        from src.plot_gdp import plot_gdp_trends
+
+        df = self.dataset.frame(params)
+        panel = self.dataset.panel
+        name = panel.indicator_names[panel.indicator_position(params["indicator"])]
+        return _png(plot_gdp_trends, df, df.index.tolist(), df.columns.tolist(), title=name, ylabel=name)
+
+    def plot_growth(self, params: dict) -> tuple[bytes, str]:
+        from src.plot_stats import plot_growth_rate_analysis
+
+        return _png(plot_growth_rate_analysis, growth_rate_analysis(self.dataset.frame(params)))
+
+    def plot_rolling(self, params: dict) -> tuple[bytes, str]:
+        from src.plot_stats import plot_rolling_statistic
+
+        return _png(plot_rolling_statistic, self._rolling(params), params.get("stat", "Mean"))
+
+    def plot_correlation(self, params: dict) -> tuple[bytes, str]:
+        from src.plot_stats import plot_correlations
+
+        return _png(plot_correlations, self._correlation(params), f"Correlation of {params['x']} and {params['y']}")
+
+async def _handle_connection(service: QueryService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, version = request_line.decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            started = time.perf_counter()
+            url = urlsplit(target)
+            params = dict(parse_qsl(url.query))
+            status, body, content_type, etag = HTTPStatus.OK, b"", "application/json", None
+
+            if method not in ("GET", "HEAD"):
+                status = HTTPStatus.METHOD_NOT_ALLOWED
+                body = _json({"error": f"{method} not allowed"})[0]
+            else:
+                try:
+                    # Validate before revalidating, so a bad query is never answered with 304
+                    service.validate(url.path, params)
+                    etag = service.etag((url.path, tuple(sorted(params.items()))))
+                    if headers.get("if-none-match") == etag:
+                        status = HTTPStatus.NOT_MODIFIED
+                    else:
+                        body, content_type = await service.query(url.path, params)
+                except QueryError as e:
+                    status, body, etag = e.status, _json({"error": str(e)})[0], None
+                except Exception as e:
+                    logger.error(f"_handle_connection: Unexpected error for {target}: {e}")
+                    status, body, etag = HTTPStatus.INTERNAL_SERVER_ERROR, _json({"error": "Internal error"})[0], None
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+            if etag is not None:
+                head += [f"ETag: {etag}", "Cache-Control: no-cache"]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            if method != "HEAD" and status != HTTPStatus.NOT_MODIFIED:
+                writer.write(body)
+            await writer.drain()
+            logger.debug(f"{method} {target} {status.value} {(time.perf_counter() - started) * 1000:.2f}ms")
+
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host: str = HOST, port: int = PORT, data_dir: str = "data/", cache_dir: str = CACHE_DIR,
+                cache_size: int = 256, impute: str | list[str] = None) -> None:
+    """
+    Serve indicator queries over HTTP until cancelled.
+
+    The panel is loaded once at start-up and kept in memory; results are cached in an LRU
+    keyed by endpoint and query parameters. ETags combine the dataset release (from the
+    "Last Updated Date" of each file) with the query, so clients can revalidate with
+    If-None-Match and get 304 until the data is refreshed.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to listen on.
+        data_dir (str): Directory holding one subdirectory per indicator.
+        cache_dir (str): Root directory of the load cache.
+        cache_size (int): Maximum number of cached query results.
+        impute (str | list[str]): Imputation methods applied to the panel at start-up, or None.
+    """
+    use_headless_backend()
+    service = QueryService(Dataset(data_dir, cache_dir, impute), cache_size)
+    server = await asyncio.start_server(lambda r, w: _handle_connection(service, r, w), host, port)
+    logger.info(f"Serving {service.dataset.panel!r} on http://{host}:{port}")
+
+    async with server:
+        await server.serve_forever()
+
+def run_server(host: str = HOST, port: int = PORT, **kwargs) -> None:
+    """
+    Blocking entry point for serve.
+    """
+    try:
+        asyncio.run(serve(host, port, **kwargs))
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_server()
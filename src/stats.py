@@ -1,117 +1,562 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import TYPE_CHECKING
+import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score, mean_squared_error
-import statsmodels.api as sm
-from statsmodels.tsa.seasonal import seasonal_decompose, DecomposeResult
 import warnings
+from src.bootstrap import bootstrap_table
+from src.data_helpers import to_numeric_frame
+from src.clustering import cluster_countries
+from src.decomposition import batch_decomposition
+from src.metadata import CountryMetadata, default_countries
+from src.panel import Panel
+from src.instrumentation import instrument
+from src.memo import memoize
+
+# statsmodels takes seconds to import, so it is only loaded by the functions that fit with it
+if TYPE_CHECKING:
+    from statsmodels.tsa.seasonal import DecomposeResult
 
 logger = logging.getLogger(__name__)
 
+OLS_FAILED = "  Statsmodels OLS failed"
+
+@memoize
+def numeric_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    The values of a country x year slice as a float64 array, coercing non-numeric cells to NaN.
+
+    Shared by the analyses so each slice is only coerced once; the array is read-only.
+    """
+    return to_numeric_frame(df).to_numpy(dtype=np.float64)
+
+@memoize
+def interpolated_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    A country x year slice coerced to numeric and linearly interpolated along the years, with
+    the edges filled from the nearest year. Shared by the analyses that cannot handle gaps.
+
+    A slice without gaps, e.g. one already imputed at clean time, is returned as it is.
+    """
+    numeric = to_numeric_frame(df)
+    if not numeric.isna().to_numpy().any():
+        return numeric
+
+    return numeric.interpolate(axis=1, limit_direction="both")
+
+@instrument
+@memoize
 def correlation_analysis(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.Series:
     try:
         return df1.T.corrwith(df2.T, method="pearson")
     except Exception as e:
         logger.error(f"correlation_analysis: Unexpected error: {e}")
 
-def linear_regression_statsmodels(X: pd.DataFrame, y: pd.DataFrame) -> dict:
-    
-    countries_models_results = {}
-    
-    X_copy = X.copy().apply(pd.to_numeric, errors="coerce").interpolate(axis=1, limit_direction="both")
-    y_copy = y.copy().apply(pd.to_numeric, errors="coerce").interpolate(axis=1, limit_direction="both")
-        
-    for country in X_copy.index:
-        x_vals = X_copy.loc[country].values
-        y_vals = y_copy.loc[country].values
-        
-        # statsmodels summary (with warnings suppressed)
-        try:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                sm_X = sm.add_constant(x_vals)
-                sm_model = sm.OLS(y_vals, sm_X).fit()
-                text_summary = sm_model.summary().as_text()
-                print(text_summary)
-                countries_models_results[country] = text_summary
-                
-        except Exception as e:
-            error_message = f"  Statsmodels OLS failed: {e}\n"
-            print(error_message)
-            countries_models_results[country] = error_message
-        
-    logger.info("Regression report printed to terminal")
+@dataclass
+class OLSResult:
+    """
+    Lightweight statsmodels OLS result holding only the fitted statistics.
+
+    The full text summary is rendered on demand from the stored observations, since rendering
+    it costs far more than the fit itself.
+    """
+    params: np.ndarray
+    bse: np.ndarray
+    pvalues: np.ndarray
+    rsquared: float
+    x: np.ndarray = field(repr=False)
+    y: np.ndarray = field(repr=False)
+
+    def summary_text(self) -> str:
+        import statsmodels.api as sm
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return sm.OLS(self.y, sm.add_constant(self.x)).fit().summary().as_text()
+
+    def __str__(self) -> str:
+        return self.summary_text()
+
+def _fit_ols(x_vals: np.ndarray, y_vals: np.ndarray, lazy: bool) -> OLSResult | str:
+    # Module-level so it can be shipped to worker processes
+    import statsmodels.api as sm
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            sm_model = sm.OLS(y_vals, sm.add_constant(x_vals)).fit()
+            if not lazy:
+                return sm_model.summary().as_text()
+
+            return OLSResult(
+                params=np.asarray(sm_model.params),
+                bse=np.asarray(sm_model.bse),
+                pvalues=np.asarray(sm_model.pvalues),
+                rsquared=float(sm_model.rsquared),
+                x=x_vals,
+                y=y_vals
+            )
+    except Exception as e:
+        return f"{OLS_FAILED}: {e}\n"
+
+def _all_fitted(results: dict) -> bool:
+    return not any(isinstance(result, str) and result.startswith(OLS_FAILED) for result in results.values())
+
+@memoize(ignore=("n_jobs",), cacheable=_all_fitted)
+def _statsmodels_fits(X: pd.DataFrame, y: pd.DataFrame, lazy: bool, n_jobs: int, fill_gaps: bool = True) -> dict:
+    X_copy = interpolated_frame(X) if fill_gaps else to_numeric_frame(X)
+    y_copy = interpolated_frame(y) if fill_gaps else to_numeric_frame(y)
+
+    countries = list(X_copy.index)
+    x_rows = [X_copy.loc[country].values for country in countries]
+    y_rows = [y_copy.loc[country].values for country in countries]
+    if not fill_gaps:
+        # Fit each country on the years where both series were observed
+        present = [~np.isnan(x_vals) & ~np.isnan(y_vals) for x_vals, y_vals in zip(x_rows, y_rows)]
+        x_rows = [x_vals[mask] for x_vals, mask in zip(x_rows, present)]
+        y_rows = [y_vals[mask] for y_vals, mask in zip(y_rows, present)]
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            chunksize = max(1, len(countries) // (n_jobs * 4))
+            results = executor.map(_fit_ols, x_rows, y_rows, repeat(lazy), chunksize=chunksize)
+            return dict(zip(countries, results))
+
+    return {country: _fit_ols(x_vals, y_vals, lazy) for country, x_vals, y_vals in zip(countries, x_rows, y_rows)}
+
+@instrument
+def linear_regression_statsmodels(X: pd.DataFrame, y: pd.DataFrame, lazy: bool = False, n_jobs: int = 1, verbose: bool = True,
+                                  fill_gaps: bool = True) -> dict:
+    """
+    Fit a statsmodels OLS of y on X for every country.
+
+    Args:
+        X (pd.DataFrame): Predictor values (index: countries, columns: years).
+        y (pd.DataFrame): Response values, aligned to X by country.
+        lazy (bool): Return OLSResult objects and defer rendering the text summaries until they
+            are exported. Otherwise each result is the rendered summary text.
+        n_jobs (int): Number of worker processes to fit countries across. 1 fits in-process.
+        verbose (bool): Print each country's result to the terminal. Disable for batch runs.
+        fill_gaps (bool): Interpolate missing years before fitting, as before imputation
+            existed. When False each country is fitted on the years where both X and y are
+            present, e.g. to leave out cells that were imputed and masked again.
+
+    Returns:
+        dict: Mapping of country to its summary text, OLSResult, or an error message.
+    """
+    countries_models_results = _statsmodels_fits(X, y, lazy, n_jobs, fill_gaps)
+
+    if verbose:
+        for country, result in countries_models_results.items():
+            if isinstance(result, OLSResult):
+                print(f"{country}: params={result.params}, R²={result.rsquared:.3f}")
+            else:
+                print(result)
+        logger.info("Regression report printed to terminal")
     
     return countries_models_results
     
+def batch_linear_regression(x: np.ndarray, y: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Fit y = slope * x + intercept independently for every row of two 2-D arrays at once.
+
+    Missing values are masked rather than interpolated: each row is fitted on the years where
+    both x and y are present. Rows with fewer than two such years get NaN results.
+
+    Args:
+        x (np.ndarray): Predictor values, shape (countries, years).
+        y (np.ndarray): Response values, same shape as x.
+
+    Returns:
+        dict[str, np.ndarray]: Per-row "slope", "intercept", "r2", "mse" and "n" (observations used).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape:
+        raise ValueError(f"x and y must have the same shape, got {x.shape} and {y.shape}")
+
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    n = mask.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.where(mask, x, 0.0).sum(axis=1) / n
+        mean_y = np.where(mask, y, 0.0).sum(axis=1) / n
+        dx = np.where(mask, x - mean_x[:, None], 0.0)
+        dy = np.where(mask, y - mean_y[:, None], 0.0)
+
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+
+        # A constant predictor has no slope; like sklearn, fall back to predicting the mean
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = mean_y - slope * mean_x
+
+        residuals = np.where(mask, y - (intercept[:, None] + slope[:, None] * x), 0.0)
+        sse = (residuals * residuals).sum(axis=1)
+        mse = sse / n
+        # Match sklearn's r2_score for a constant response: 1.0 for a perfect fit, otherwise 0.0
+        r2 = np.where(syy > 0, 1.0 - sse / syy, np.where(sse == 0, 1.0, 0.0))
+
+    too_few = n < 2
+    for result in (slope, intercept, r2, mse):
+        result[too_few] = np.nan
+
+    return {"slope": slope, "intercept": intercept, "r2": r2, "mse": mse, "n": n}
+
+@instrument
+@memoize
+def linear_regression_table(X: pd.DataFrame, y: pd.DataFrame) -> pd.DataFrame:
+    """
+    Regress y on X for every country in one vectorized pass.
+
+    Args:
+        X (pd.DataFrame): Predictor values (index: countries, columns: years).
+        y (pd.DataFrame): Response values, aligned to X by country and year; years missing
+            from y count as missing.
+
+    Returns:
+        pd.DataFrame: One row per country with the columns slope, intercept, r2, mse and n.
+    """
+    x_vals = numeric_values(X)
+    y_vals = numeric_values(y.reindex(index=X.index, columns=X.columns))
+
+    return pd.DataFrame(batch_linear_regression(x_vals, y_vals), index=X.index)
+
+@instrument
+@memoize
 def linear_regression_sklearn(X: pd.DataFrame, y: pd.DataFrame) -> dict:
-    countries_results = {}
-    
-    model = LinearRegression()
-    
-    X_copy = X.copy().apply(pd.to_numeric, errors="coerce").interpolate(axis=1, limit_direction="both")
-    y_copy = y.copy().apply(pd.to_numeric, errors="coerce").interpolate(axis=1, limit_direction="both")
-    
-    for country in X_copy.index:
-        x_vals = X_copy.loc[country].values.reshape(-1, 1)
-        y_vals = y_copy.loc[country].values
-        
-        model.fit(x_vals, y_vals)
-        y_pred = model.predict(x_vals)
-        
-        r2 = r2_score(y_vals, y_pred)
-        mse = mean_squared_error(y_vals, y_pred)
-        
-        countries_results[country] = {
-            "slope": model.coef_[0],
-            "intercept": model.intercept_,
-            "r2": r2,
-            "mse": mse
-        }
-    
-    return countries_results
+    """
+    Per-country simple linear regression of y on X, in the shape expected by
+    export_linear_regression_sklearn_table.
 
-def time_series_decomposition(df: pd.DataFrame, countries: list[str], start_date: str, end_date: str) -> list[DecomposeResult]:
-    
-    seasonal_decomposition_list = []
-    for country in countries:
-        gdp_series = df.loc[country, start_date:end_date].astype(float)
-        gdp_series.index = pd.to_datetime(gdp_series.index, format="%Y")
-        seasonal_decomposition_list.append(seasonal_decompose(gdp_series, model="additive", period=1))
-    
-    return seasonal_decomposition_list
-
-def growth_rate_analysis(df: pd.DataFrame, countries: list[str], start_date: str, end_date: str) -> list[float]:
-    countries_growth_rates = {}
-    for country in countries:
-        growth_rates = []
-        df_values = df.loc[country, start_date:end_date].astype(float)
-        for current, next_val in zip(df_values, df_values[1:]):
-            growth_rates.append(growth_rate_formula(current, next_val))
-    
-        countries_growth_rates[country] = growth_rates
-        
-    return countries_growth_rates
-
-def rolling_statistics(df: pd.DataFrame, countries: list[str], start_date: str, end_date: str, years_window: int = 3) -> dict:
-    rolling_stats = {}
-    for country in countries:
-        values = df.loc[country, start_date:end_date].astype(float)
-        values.index = values.index.astype(int)
-        rolling_stats[country] = {
-            "mean": values.rolling(window=years_window).mean(),
-            "std": values.rolling(window=years_window).std(),
-            "median": values.rolling(window=years_window).median(),
-            "variance": values.rolling(window=years_window).var(),
-            "skew": values.rolling(window=years_window).skew(),
-            "kurtosis": values.rolling(window=years_window).kurt()
+    Args:
+        X (pd.DataFrame): Predictor values (index: countries, columns: years).
+        y (pd.DataFrame): Response values, aligned to X by country.
+
+    Returns:
+        dict: Mapping of country to a dict with "slope", "intercept", "r2" and "mse".
+    """
+    results = linear_regression_table(X, y)
+    return results[["slope", "intercept", "r2", "mse"]].to_dict("index")
+
+@instrument
+@memoize
+def bootstrap_analysis(X: pd.DataFrame, y: pd.DataFrame, n_resamples: int = 2000, n_permutations: int = 2000,
+                       confidence: float = 0.95, seed: int = 0) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals and permutation p-values for the per-country correlation and
+    regression of y on X, for all countries and resamples in batched array operations. See
+    src.bootstrap.batch_bootstrap.
+
+    Args:
+        X (pd.DataFrame): Predictor values (index: countries, columns: years).
+        y (pd.DataFrame): Response values, aligned to X by country and year.
+        n_resamples (int): Number of bootstrap resamples.
+        n_permutations (int): Number of permutations for the p-values, or 0 to skip them.
+        confidence (float): Coverage of the intervals.
+        seed (int): Seed of the random draws; the same seed gives the same results.
+
+    Returns:
+        pd.DataFrame: One row per country with the estimate, "_lower" and "_upper" columns for
+            correlation, slope and intercept, "p_value" and "n".
+    """
+    return bootstrap_table(to_numeric_frame(X), to_numeric_frame(y), n_resamples=n_resamples,
+                           n_permutations=n_permutations, confidence=confidence, seed=seed)
+
+def correlation_bootstrap(df1: pd.DataFrame, df2: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """
+    correlation_analysis with bootstrap confidence intervals and a permutation p-value per
+    country. Keyword arguments are those of bootstrap_analysis.
+
+    Returns:
+        pd.DataFrame: The columns correlation, correlation_lower, correlation_upper, p_value and n.
+    """
+    return bootstrap_analysis(df1, df2, **kwargs)[["correlation", "correlation_lower", "correlation_upper", "p_value", "n"]]
+
+def linear_regression_bootstrap(X: pd.DataFrame, y: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """
+    linear_regression_table with bootstrap confidence intervals for the slope and intercept and
+    a permutation p-value for the slope. Keyword arguments are those of bootstrap_analysis.
+
+    Returns:
+        pd.DataFrame: The columns slope, slope_lower, slope_upper, intercept, intercept_lower,
+            intercept_upper, p_value and n.
+    """
+    return bootstrap_analysis(X, y, **kwargs)[["slope", "slope_lower", "slope_upper", "intercept",
+                                               "intercept_lower", "intercept_upper", "p_value", "n"]]
+
+@instrument
+@memoize
+def time_series_decomposition(df: pd.DataFrame, countries: list[str], start_date: str, end_date: str, method: str = "moving_average", window: int = 1, **kwargs) -> list["DecomposeResult"]:
+    """
+    Decompose each country's series into trend and residual, materializing a DecomposeResult per country.
+
+    All countries are decomposed together by batch_decomposition; use that directly to keep the
+    compact arrays for many countries and build DecomposeResult objects only where needed.
+
+    Args:
+        df (pd.DataFrame): Indicator values (index: countries, columns: years).
+        countries (list[str]): Countries to decompose.
+        start_date (str): The first year of the range.
+        end_date (str): The last year of the range.
+        method (str): "moving_average", "hp" or "loess".
+        window (int): Moving-average window in years. The default of 1 matches the previous
+            seasonal_decompose(period=1) behaviour.
+        **kwargs: Method options passed to batch_decomposition (lamb, frac).
+
+    Returns:
+        list[DecomposeResult]: One result per country, in the order given.
+    """
+    decomposition = batch_decomposition(df.loc[countries], start_date, end_date, method=method, window=window, **kwargs)
+    return [decomposition.result(country) for country in countries]
+
+def growth_rates(values: np.ndarray) -> np.ndarray:
+    """
+    Year-over-year growth in percent along the last axis of an array of any shape.
+
+    Growth from a missing or zero base year is undefined and returned as NaN.
+
+    Args:
+        values (np.ndarray): Array whose last axis is years.
+
+    Returns:
+        np.ndarray: Array with one fewer year; element t is the growth from year t to t + 1.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    base = values[..., :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = growth_rate_formula(base, values[..., 1:])
+
+    return np.where(base != 0, rates, np.nan)
+
+def compound_annual_growth_rates(values: np.ndarray) -> np.ndarray:
+    """
+    Compound annual growth rate in percent between the first and last available year along the
+    last axis of an array of any shape.
+
+    Series with fewer than two years, or with a non-positive first or last value, are NaN.
+
+    Args:
+        values (np.ndarray): Array whose last axis is years.
+
+    Returns:
+        np.ndarray: Array with the last axis removed.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    n_years = values.shape[-1]
+    first = np.argmax(present, axis=-1)
+    last = n_years - 1 - np.argmax(present[..., ::-1], axis=-1)
+
+    start_values = np.take_along_axis(values, first[..., None], axis=-1)[..., 0]
+    end_values = np.take_along_axis(values, last[..., None], axis=-1)[..., 0]
+    periods = last - first
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = ((end_values / start_values) ** (1.0 / periods) - 1.0) * 100
+
+    valid = present.any(axis=-1) & (periods > 0) & (start_values > 0) & (end_values > 0)
+    return np.where(valid, cagr, np.nan)
+
+@instrument
+@memoize
+def growth_rate_analysis(df: pd.DataFrame, countries: list[str] = None, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+    """
+    Year-over-year growth rates for every requested country in one array operation.
+
+    Args:
+        df (pd.DataFrame): Indicator values (index: countries, columns: years).
+        countries (list[str]): Countries to include, or None for every row of df.
+        start_date (str): The first year of the range.
+        end_date (str): The last year of the range.
+
+    Returns:
+        pd.DataFrame: Growth in percent (index: countries, columns: int years). The column for a
+            year holds the growth from the previous year into it.
+    """
+    df = df.loc[df.index if countries is None else countries, start_date:end_date]
+    years = [int(year) for year in df.columns[1:]]
+    rates = growth_rates(numeric_values(df))
+
+    return pd.DataFrame(rates, index=df.index, columns=pd.Index(years, name="Year"))
+
+@instrument
+@memoize
+def cagr_analysis(df: pd.DataFrame, countries: list[str] = None, start_date: str = None, end_date: str = None) -> pd.Series:
+    """
+    Compound annual growth rate over the year range for every requested country.
+
+    Args:
+        df (pd.DataFrame): Indicator values (index: countries, columns: years).
+        countries (list[str]): Countries to include, or None for every row of df.
+        start_date (str): The first year of the range.
+        end_date (str): The last year of the range.
+
+    Returns:
+        pd.Series: CAGR in percent, indexed by country.
+    """
+    df = df.loc[df.index if countries is None else countries, start_date:end_date]
+    cagr = compound_annual_growth_rates(numeric_values(df))
+
+    return pd.Series(cagr, index=df.index, name="CAGR")
+
+@instrument
+@memoize
+def panel_growth_rate_analysis(panel: Panel, start_date: str = None, end_date: str = None,
+                               include_imputed: bool = True, countries: list[str] = None,
+                               metadata: CountryMetadata = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Year-over-year and compound annual growth for every country and every indicator of a panel.
+
+    Args:
+        panel (Panel): The indicator panel.
+        start_date (str): The first year of the range.
+        end_date (str): The last year of the range.
+        include_imputed (bool): Use imputed cells. When False only observed values count, so
+            growth into or out of an imputed year is NaN.
+        countries (list[str]): Country names, or None for every country except the WDI aggregates.
+        metadata (CountryMetadata): Country metadata telling aggregates apart. Required unless
+            countries is given.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Year-over-year growth indexed by (indicator, country)
+            with int year columns, and CAGR with countries as rows and indicators as columns.
+    """
+    countries = default_countries(panel, countries, metadata)
+    block = panel.array(countries=countries, start_year=start_date, end_year=end_date, include_imputed=include_imputed)
+    country_labels = panel.countries if countries is None else panel.countries[panel.country_positions(countries)]
+    years = panel.years[panel.year_slice(start_date, end_date)]
+    n_indicators, n_countries, _ = block.shape
+
+    index = pd.MultiIndex.from_product([panel.indicators, country_labels])
+    yearly = pd.DataFrame(growth_rates(block).reshape(n_indicators * n_countries, -1), index=index,
+                          columns=pd.Index([int(year) for year in years[1:]], name="Year"))
+    cagr = pd.DataFrame(compound_annual_growth_rates(block).T, index=country_labels, columns=panel.indicators)
+
+    return yearly, cagr
+
+ROLLING_STATISTICS = ("Mean", "Std", "Median", "Variance", "Skew", "Kurtosis")
+
+def rolling_moments(values: np.ndarray, window: int) -> dict[str, np.ndarray]:
+    """
+    Trailing rolling mean, std, median, variance, skew and kurtosis along the last axis of a
+    2-D array, computed for every row at once.
+
+    All windows are taken as strided views of the input. The deviations from each window's
+    mean are computed once and shared by the variance, skew and kurtosis. Results follow
+    pandas' rolling conventions: sample (ddof=1) variance, bias-corrected skew and excess
+    kurtosis, and NaN for incomplete windows, windows containing NaN, and undefined moments.
+
+    Args:
+        values (np.ndarray): Array of shape (rows, years).
+        window (int): Window length in years.
+
+    Returns:
+        dict[str, np.ndarray]: Arrays shaped like values, keyed by ROLLING_STATISTICS names.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, n_years = values.shape
+    results = {name: np.full((rows, n_years), np.nan) for name in ROLLING_STATISTICS}
+    if window < 1 or window > n_years:
+        return results
+
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=-1)
+    mean = windows.mean(axis=-1)
+    deviations = windows - mean[..., None]
+    squared = deviations * deviations
+    m2 = squared.sum(axis=-1)
+    m3 = (squared * deviations).sum(axis=-1)
+    m4 = (squared * squared).sum(axis=-1)
+
+    n = float(window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = m2 / (n - 1) if window > 1 else np.full_like(m2, np.nan)
+        # Float noise on a flat window must not turn into a huge skew or kurtosis
+        flat = m2 <= (np.abs(mean) * 1e-14) ** 2 * n
+        if window >= 3:
+            skew = np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5
+            skew[flat] = np.nan
+        else:
+            skew = np.full_like(m2, np.nan)
+        if window >= 4:
+            kurtosis = ((n + 1) * n * (n - 1) / ((n - 2) * (n - 3)) * m4 / (m2 * m2)
+                        - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+            kurtosis[flat] = np.nan
+        else:
+            kurtosis = np.full_like(m2, np.nan)
+
+    computed = {
+        "Mean": mean,
+        "Std": np.sqrt(variance),
+        "Median": np.median(windows, axis=-1),
+        "Variance": variance,
+        "Skew": skew,
+        "Kurtosis": kurtosis
+    }
+    for name, result in computed.items():
+        results[name][:, window - 1:] = result
+
+    return results
+
+@instrument
+@memoize
+def rolling_statistics(df: pd.DataFrame, countries: list[str] = None, start_date: str = None, end_date: str = None, years_window: int | list[int] = 3) -> pd.DataFrame:
+    """
+    Rolling statistics for every requested country and window size, in long format.
+
+    Args:
+        df (pd.DataFrame): Indicator values (index: countries, columns: years).
+        countries (list[str]): Countries to include, or None for every row of df.
+        start_date (str): The first year of the range.
+        end_date (str): The last year of the range.
+        years_window (int | list[int]): One window length or several, in years.
+
+    Returns:
+        pd.DataFrame: One row per country, window and year with the columns "Country", "Year",
+            "Window" and one column per statistic in ROLLING_STATISTICS.
+    """
+    df = df.loc[df.index if countries is None else countries, start_date:end_date]
+    values = numeric_values(df)
+    years = np.array([int(year) for year in df.columns])
+    windows = [years_window] if isinstance(years_window, int) else list(years_window)
+
+    n_countries, n_years = values.shape
+    frames = []
+    for window in windows:
+        moments = rolling_moments(values, window)
+        frame = {
+            "Country": np.repeat(df.index.to_numpy(), n_years),
+            "Year": np.tile(years, n_countries),
+            "Window": np.full(n_countries * n_years, window)
         }
-        
-    return rolling_stats
+        frame.update({name: moments[name].reshape(-1) for name in ROLLING_STATISTICS})
+        frames.append(pd.DataFrame(frame))
+
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+@instrument
+@memoize
+def clustering(panel: Panel, n_clusters: int = 4, method: str = "kmeans", metric: str = "correlation", **kwargs) -> pd.Series:
+    """
+    Cluster countries by their multi-indicator trajectories. See src.clustering.cluster_countries
+    for the available options.
 
-# TODO: Add clustering
-def clustering():
-    pass
+    Args:
+        panel (Panel): The indicator panel.
+        n_clusters (int): Number of clusters.
+        method (str): "kmeans", "minibatch_kmeans" or "hierarchical".
+        metric (str): Distance for hierarchical clustering: "correlation", "dtw" or "euclidean".
+
+    Returns:
+        pd.Series: Cluster label per country.
+    """
+    try:
+        return cluster_countries(panel, n_clusters, method, metric, **kwargs)
+    except Exception as e:
+        logger.error(f"clustering: Unexpected error: {e}")
 
 def growth_rate_formula(beginning_value: float, end_value: float) -> float:
     return ((end_value - beginning_value) / beginning_value) * 100
\ No newline at end of file
@@ -0,0 +1,24 @@
+import pytest
+from benchmarks.run import compare, measure, scale_metadata, scale_panel
+from tests.test_metadata import _metadata, _panel
+
+def _record(seconds: float, peak_mb: float) -> dict:
+    return {"stage": "stage", "scenario": "shipped", "seconds": seconds, "peak_mb": peak_mb}
+
+def test_compare_flags_time_and_memory_regressions():
+    baseline = [_record(1.0, 100.0)]
+    assert compare([_record(1.1, 110.0)], baseline) == []
+    assert [r["metric"] for r in compare([_record(2.0, 100.0)], baseline)] == ["seconds"]
+    assert [r["metric"] for r in compare([_record(1.0, 200.0)], baseline)] == ["peak_mb"]
+    # Tiny stages are within the noise floors either way
+    assert compare([_record(0.002, 0.5)], [_record(0.001, 0.1)]) == []
+
+def test_measure_needs_at_least_one_call():
+    with pytest.raises(ValueError):
+        measure(lambda: None, repeat=0)
+    assert measure(lambda: 42, repeat=1)["result"] == 42
+
+def test_scaled_countries_keep_their_metadata():
+    panel = scale_panel(_panel(), 3, 1)
+    countries = scale_metadata(_metadata(), 3).select_countries(panel)
+    assert len(countries) == 9 and not any(country.startswith("World") for country in countries)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import linregress, pearsonr
+from src.bootstrap import batch_bootstrap, bootstrap_table, paired_statistics
+
+def _pairs(seed: int = 0, rows: int = 6, observations: int = 30) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(rows, observations))
+    y = np.linspace(-1.0, 2.0, rows)[:, None] * x + rng.normal(size=x.shape)
+    x[rng.random(x.shape) < 0.2] = np.nan
+    y[rng.random(y.shape) < 0.2] = np.nan
+    return x, y
+
+def test_paired_statistics_match_scipy():
+    x, y = _pairs()
+    statistics = paired_statistics(x, y)
+    for row in range(len(x)):
+        mask = ~np.isnan(x[row]) & ~np.isnan(y[row])
+        fit = linregress(x[row][mask], y[row][mask])
+        assert statistics["correlation"][row] == pytest.approx(pearsonr(x[row][mask], y[row][mask]).statistic)
+        assert statistics["slope"][row] == pytest.approx(fit.slope)
+        assert statistics["intercept"][row] == pytest.approx(fit.intercept)
+        assert statistics["n"][row] == mask.sum()
+
+def test_too_few_or_constant_observations_are_undefined():
+    x = np.array([[1.0, 2.0, np.nan, np.nan], [1.0, 1.0, 1.0, 1.0]])
+    y = np.array([[2.0, 3.0, 4.0, 5.0], [1.0, 2.0, 3.0, 4.0]])
+    statistics = paired_statistics(x, y)
+    assert np.isnan(statistics["correlation"]).all() and np.isnan(statistics["slope"]).all()
+
+def test_bootstrap_does_not_depend_on_the_batch_size():
+    x, y = _pairs(1)
+    kwargs = {"n_resamples": 300, "n_permutations": 300, "seed": 7}
+    small = batch_bootstrap(x, y, batch_size=17, **kwargs)
+    large = batch_bootstrap(x, y, batch_size=1000, **kwargs)
+    for name in small:
+        np.testing.assert_allclose(small[name], large[name], err_msg=name)
+
+    # The same seed reproduces the draws, another one does not
+    np.testing.assert_allclose(batch_bootstrap(x, y, **kwargs)["slope_lower"], batch_bootstrap(x, y, **kwargs)["slope_lower"])
+    assert not np.allclose(batch_bootstrap(x, y, **{**kwargs, "seed": 8})["slope_lower"], small["slope_lower"])
+
+def test_intervals_cover_the_estimate_and_p_values_track_association():
+    x, y = _pairs(2, observations=60)
+    result = batch_bootstrap(x, y, n_resamples=500, n_permutations=500, seed=0)
+    for name in ("correlation", "slope", "intercept"):
+        assert (result[f"{name}_lower"] <= result[name]).all() and (result[name] <= result[f"{name}_upper"]).all()
+    # Rows run from a strong negative to a strong positive slope, through nearly none
+    assert result["p_value"][0] < 0.01 and result["p_value"][-1] < 0.01
+    assert (result["p_value"] > 0).all() and (result["p_value"] <= 1).all()
+
+def test_bootstrap_table_aligns_by_label():
+    x, y = _pairs(3)
+    columns = [str(year) for year in range(2000, 2000 + x.shape[1])]
+    X = pd.DataFrame(x, index=list("abcdef"), columns=columns)
+    Y = pd.DataFrame(y, index=list("abcdef"), columns=columns)
+    expected = bootstrap_table(X, Y, n_resamples=50, n_permutations=0)
+    shuffled = bootstrap_table(X, Y.iloc[::-1, ::-1], n_resamples=50, n_permutations=0)
+    pd.testing.assert_frame_equal(shuffled, expected)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+import src.bulk as bulk
+from src.bulk import ID_COLUMNS, ingest_bulk_csv, load_bulk_indicator
+from src.clean_data import clean_data
+from src.data_helpers import set_country_index
+
+def _bulk_file(path) -> pd.DataFrame:
+    # Ordered by country, then indicator, like WDIData.csv
+    rng = np.random.default_rng(0)
+    rows = []
+    for country in ["Aland", "Borduria", "Cordia", "Daria"]:
+        for code in ["IND.A", "IND.B", "IND.C"]:
+            rows.append([country, country[:3].upper(), f"Indicator {code}", code])
+    df = pd.DataFrame(rows, columns=ID_COLUMNS)
+    values = rng.normal(size=(len(df), 8)) * 1e6
+    values[rng.random(values.shape) < 0.2] = np.nan
+    values[5] = np.nan
+    df[[str(year) for year in range(2000, 2008)]] = values
+    df.to_csv(path, index=False)
+    return df
+
+def test_chunked_ingest_matches_a_single_read(tmp_path):
+    source = _bulk_file(tmp_path / "WDIData.csv")
+    codes = ingest_bulk_csv(str(tmp_path / "WDIData.csv"), cache_dir=str(tmp_path / "cache"), chunk_size=5)
+    assert sorted(codes) == ["IND.A", "IND.B", "IND.C"]
+
+    for code in codes:
+        expected = set_country_index(clean_data(source[source["Indicator Code"] == code].reset_index(drop=True)))
+        pd.testing.assert_frame_equal(load_bulk_indicator(str(tmp_path / "WDIData.csv"), code, str(tmp_path / "cache")),
+                                      expected, check_dtype=False)
+
+def test_ingest_of_all_indicators_is_skipped_while_current(tmp_path, monkeypatch):
+    _bulk_file(tmp_path / "WDIData.csv")
+    kwargs = {"cache_dir": str(tmp_path / "cache"), "start_year": "2002"}
+    codes = ingest_bulk_csv(str(tmp_path / "WDIData.csv"), **kwargs)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the bulk file was read again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(bulk.pd, "read_csv", fail)
+        assert ingest_bulk_csv(str(tmp_path / "WDIData.csv"), **kwargs) == codes
+        assert ingest_bulk_csv(str(tmp_path / "WDIData.csv"), ["IND.B"], **kwargs) == ["IND.B"]
+        with pytest.raises(AssertionError):
+            ingest_bulk_csv(str(tmp_path / "WDIData.csv"), cache_dir=str(tmp_path / "cache"), start_year="2003")
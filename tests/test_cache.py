@@ -0,0 +1,89 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+import src.cache
+from src.cache import clear_cache, load_cached_data
+from src.clean_data import clean_data
+from src.data_helpers import set_country_index
+from src.load_data import load_data
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+SOURCE = os.path.join(DATA_DIR, "GDP", "API_NY.GDP.MKTP.CD_DS2_en_csv_v2_127285.csv")
+
+def _copy(tmp_path) -> str:
+    path = str(tmp_path / "API_TEST.csv")
+    shutil.copyfile(SOURCE, path)
+    return path
+
+def _no_parse(*args, **kwargs):
+    raise AssertionError("the source was parsed again")
+
+def test_cache_hit_matches_a_fresh_parse(tmp_path, monkeypatch):
+    path, cache_dir = _copy(tmp_path), str(tmp_path / "cache")
+    expected = set_country_index(clean_data(load_data(path)))
+    pd.testing.assert_frame_equal(load_cached_data(path, cache_dir), expected)
+
+    monkeypatch.setattr("src.cache.load_data", _no_parse)
+    pd.testing.assert_frame_equal(load_cached_data(path, cache_dir), expected)
+    pd.testing.assert_frame_equal(load_cached_data(path, cache_dir, mmap=True), expected)
+
+def test_touched_file_with_the_same_content_is_not_parsed_again(tmp_path, monkeypatch):
+    path, cache_dir = _copy(tmp_path), str(tmp_path / "cache")
+    expected = load_cached_data(path, cache_dir)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    monkeypatch.setattr("src.cache.load_data", _no_parse)
+    pd.testing.assert_frame_equal(load_cached_data(path, cache_dir), expected)
+
+@pytest.mark.parametrize("same_size", [True, False])
+def test_changed_content_is_parsed_again(tmp_path, same_size):
+    path, cache_dir = _copy(tmp_path), str(tmp_path / "cache")
+    before = load_cached_data(path, cache_dir)
+    with open(path, "rb") as f:
+        content = f.read()
+    # Rename one country; "Arubb" keeps the file size, "Arubaa" does not
+    content = content.replace(b'"Aruba"', b'"Arubb"' if same_size else b'"Arubaa"', 1)
+    stat = os.stat(path)
+    with open(path, "wb") as f:
+        f.write(content)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    after = load_cached_data(path, cache_dir)
+    assert "Aruba" in before.index and "Aruba" not in after.index
+    pd.testing.assert_frame_equal(after, set_country_index(clean_data(load_data(path))))
+
+def test_clear_cache_forces_a_parse(tmp_path, monkeypatch):
+    path, cache_dir = _copy(tmp_path), str(tmp_path / "cache")
+    load_cached_data(path, cache_dir)
+    clear_cache(cache_dir)
+
+    parsed = []
+    monkeypatch.setattr("src.cache.load_data", lambda *args: parsed.append(args) or load_data(*args))
+    load_cached_data(path, cache_dir)
+    assert len(parsed) == 1
+
+def test_touched_file_is_hashed_only_once(tmp_path, monkeypatch):
+    path, cache_dir = _copy(tmp_path), str(tmp_path / "cache")
+    load_cached_data(path, cache_dir)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    load_cached_data(path, cache_dir)
+
+    hashed = []
+    fingerprint = src.cache.file_fingerprint
+    monkeypatch.setattr("src.cache.file_fingerprint", lambda *args, **kwargs: hashed.append(kwargs) or fingerprint(*args, **kwargs))
+    monkeypatch.setattr("src.cache.load_data", _no_parse)
+    load_cached_data(path, cache_dir)
+    assert hashed == [{"content_hash": False}]
+
+def test_skip_rows_is_part_of_the_key(tmp_path, monkeypatch):
+    path, cache_dir = _copy(tmp_path), str(tmp_path / "cache")
+    load_cached_data(path, cache_dir)
+
+    parsed = []
+    monkeypatch.setattr("src.cache.load_data", lambda *args: parsed.append(args) or load_data(*args))
+    load_cached_data(path, cache_dir, skip_rows=3)
+    load_cached_data(path, cache_dir, skip_rows=3)
+    assert [args[1] for args in parsed] == [3]
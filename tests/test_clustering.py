@@ -0,0 +1,35 @@
+import tracemalloc
+import numpy as np
+from src.clustering import dtw_distances
+
+def _naive_dtw(a: np.ndarray, b: np.ndarray) -> float:
+    n = len(a)
+    accumulated = np.full((n + 1, n + 1), np.inf)
+    accumulated[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, n + 1):
+            cost = np.linalg.norm(a[i - 1] - b[j - 1])
+            accumulated[i, j] = cost + min(accumulated[i - 1, j], accumulated[i, j - 1], accumulated[i - 1, j - 1])
+    return accumulated[n, n]
+
+def test_dtw_matches_a_pairwise_implementation():
+    trajectories = np.random.default_rng(0).normal(size=(6, 9, 2))
+    distances = dtw_distances(trajectories)
+    for a in range(6):
+        for b in range(a + 1, 6):
+            assert distances[a, b] == distances[b, a]
+            np.testing.assert_allclose(distances[a, b], _naive_dtw(trajectories[a], trajectories[b]))
+    np.testing.assert_allclose(dtw_distances(trajectories, chunk_size=4), distances)
+
+def test_dtw_chunks_stay_within_the_memory_budget():
+    trajectories = np.random.default_rng(1).normal(size=(40, 30, 3))
+    budget = 2 * 2**20
+    tracemalloc.start()
+    try:
+        bounded = dtw_distances(trajectories, memory_budget=budget)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The budget covers the per-pair grids; the result matrix and index arrays come on top
+    assert peak < 2 * budget
+    np.testing.assert_allclose(bounded, dtw_distances(trajectories, chunk_size=len(trajectories) ** 2))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.correlation import correlation_matrix_long
+
+def _data(seed: int = 0, groups: int = 3, observations: int = 25, variables: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    data = rng.normal(size=(groups, observations, variables)).cumsum(axis=1)
+    # Ties, and gaps that differ between variables
+    data[:, :, 2] = np.round(data[:, :, 2])
+    data[rng.random(data.shape) < 0.25] = np.nan
+    data[0, :, 5] = np.nan
+    return data
+
+def _expected(data: np.ndarray, method: str, min_periods: int) -> pd.DataFrame:
+    rows = []
+    for group, values in enumerate(data):
+        matrix = pd.DataFrame(values).corr(method=method, min_periods=min_periods)
+        counts = pd.DataFrame(values).notna().astype(int)
+        counts = counts.T @ counts
+        for a in range(values.shape[1]):
+            for b in range(a + 1, values.shape[1]):
+                if not np.isnan(matrix.iloc[a, b]):
+                    rows.append((group, a, b, counts.iloc[a, b], matrix.iloc[a, b]))
+    return pd.DataFrame(rows, columns=["Group", "Variable A", "Variable B", "Observations", "Correlation"])
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+@pytest.mark.parametrize("block_size", [3, 256])
+def test_pairwise_complete_correlation_matches_pandas(method, block_size):
+    data = _data()
+    result = correlation_matrix_long(data, pd.RangeIndex(3), pd.RangeIndex(7), method=method, block_size=block_size, chunk_size=2)
+    result = result.astype({"Group": int, "Variable A": int, "Variable B": int, "Observations": int})
+    result = result.sort_values(["Group", "Variable A", "Variable B"], ignore_index=True)
+    expected = _expected(data, method, 3)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, atol=1e-10)
+
+def test_spearman_without_gaps_matches_pandas():
+    data = np.abs(_data(1))
+    data = np.nan_to_num(data, nan=0.5)
+    result = correlation_matrix_long(data, pd.RangeIndex(3), pd.RangeIndex(7), method="spearman")
+    result = result.astype({"Group": int, "Variable A": int, "Variable B": int})
+    expected = _expected(data, "spearman", 3)
+    np.testing.assert_allclose(result.sort_values(["Group", "Variable A", "Variable B"])["Correlation"], expected["Correlation"])
+
+def test_parallel_blocks_match_the_serial_run():
+    data = _data(2, groups=5)
+    kwargs = {"method": "spearman", "block_size": 2, "chunk_size": 1}
+    serial = correlation_matrix_long(data, pd.RangeIndex(5), pd.RangeIndex(7), **kwargs)
+    parallel = correlation_matrix_long(data, pd.RangeIndex(5), pd.RangeIndex(7), n_jobs=2, **kwargs)
+    pd.testing.assert_frame_equal(parallel, serial)
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import src.columnar as columnar
+from src.columnar import resolve_format
+from src.export_utils import export_correlation_table, export_regression_table, export_table, regression_frame
+from src.pipeline import build_pipeline
+from src.stats import linear_regression_statsmodels
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def _results() -> pd.DataFrame:
+    return pd.DataFrame({"slope": [0.5, -1.25], "intercept": [1.0, 2.0], "r2": [0.9, 0.1], "mse": [0.01, 3.5],
+                         "n": [10, 12]}, index=pd.Index(["France", "Japan"], name="Country Name"))
+
+def test_csv_fallback_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "has_pyarrow", lambda: False)
+    assert resolve_format() == "csv"
+    assert resolve_format("parquet") == "csv"
+
+    path = export_regression_table(_results(), str(tmp_path / "regression"))
+    assert path.endswith(".csv")
+    written = pd.read_csv(path)
+    assert list(written.columns) == ["Country", "slope", "intercept", "r2", "mse", "n"]
+    np.testing.assert_allclose(written["slope"], [0.5, -1.25])
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_format("xlsx")
+
+@pytest.mark.parametrize("format", ["parquet", "feather"])
+def test_columnar_round_trip(tmp_path, format):
+    pytest.importorskip("pyarrow")
+    table = pd.DataFrame({"Country": ["France", "Japan"], "Value": [1.5, np.nan], "Count": [3, 4]})
+    path = export_table(table, str(tmp_path / "table"), format)
+    read = pd.read_parquet(path) if format == "parquet" else pd.read_feather(path)
+    pd.testing.assert_frame_equal(read, table)
+
+def test_correlation_table_columns(tmp_path):
+    correlations = pd.Series([0.25, -0.5], index=pd.Index(["France", "Japan"], name="Country Name"))
+    written = pd.read_csv(export_correlation_table(correlations, str(tmp_path / "correlation"), "csv"))
+    assert list(written.columns) == ["Country", "Correlation Coefficient"]
+
+def test_pipeline_exports_go_through_the_table_writer(monkeypatch):
+    monkeypatch.setattr(columnar, "has_pyarrow", lambda: False)
+    pipeline = build_pipeline({"data_dir": DATA_DIR, "analyses": ["correlation", "regression", "regression_statsmodels"]})
+    for name, artifact in (("export:correlation", "output/correlation_results.csv"),
+                           ("export:regression", "output/regression_sklearn.csv"),
+                           ("export:regression_statsmodels", "output/regression_statsmodels.csv")):
+        assert pipeline.stages[name].artifacts[0] == artifact
+        assert pipeline.stages[name].params["format"] == "csv"
+
+def test_failed_statsmodels_fits_keep_their_row():
+    x = pd.DataFrame(np.arange(12, dtype=float).reshape(2, 6), index=["France", "Japan"],
+                     columns=[str(year) for year in range(2000, 2006)])
+    y = 2 * x + np.random.default_rng(0).normal(size=x.shape)
+    x.loc["Japan"] = np.nan
+    table = regression_frame(linear_regression_statsmodels(x, y, lazy=True, verbose=False, fill_gaps=False))
+    assert list(table["Country"]) == ["France", "Japan"]
+    assert pd.isna(table["error"][0]) and table["slope"][0] == pytest.approx(2.0, abs=0.5)
+    assert table["error"][1].startswith("Statsmodels OLS failed") and np.isnan(table["slope"][1])
+
+@pytest.mark.parametrize("format", ["csv", "parquet"])
+def test_empty_tables_are_still_written(tmp_path, format):
+    if format == "parquet":
+        pytest.importorskip("pyarrow")
+    empty = pd.DataFrame({"Country": pd.Series([], dtype=object), "Value": pd.Series([], dtype=float)})
+    path = export_table(empty, str(tmp_path / "empty"), format)
+    read = pd.read_csv(path) if format == "csv" else pd.read_parquet(path)
+    assert os.path.exists(path) and list(read.columns) == ["Country", "Value"] and read.empty
+    assert os.path.isdir(export_table(iter([]), str(tmp_path / "partitioned"), format, partition_by="Country"))
+
+def test_csv_keeps_full_float_precision(tmp_path):
+    table = pd.DataFrame({"GDP": [27_360_935_000_000.123, 1 / 3]})
+    np.testing.assert_array_equal(pd.read_csv(export_table(table, str(tmp_path / "gdp"), "csv"))["GDP"], table["GDP"])
+
+def test_partitions_are_rewritten_and_keep_missing_keys(tmp_path):
+    first = pd.DataFrame({"Country": ["France", "Japan"], "Value": [1.0, 2.0]})
+    second = pd.DataFrame({"Country": ["France", None], "Value": [3.0, 4.0]})
+    export_table(first, str(tmp_path / "table"), "csv", partition_by="Country")
+    path = export_table(second, str(tmp_path / "table"), "csv", partition_by="Country")
+    assert sorted(os.listdir(path)) == ["Country=France", "Country=nan"]
+    assert pd.read_csv(os.path.join(path, "Country=France", "part-0.csv"))["Value"].tolist() == [3.0]
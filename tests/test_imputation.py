@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.clean_data import clean_data
+from src.imputation import impute_values, imputed_cells, observed_values
+from src.stats import interpolated_frame
+
+def _gappy(seed: int = 0, countries: int = 12, years: int = 15) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(countries, years)).cumsum(axis=1)
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[0] = np.nan
+    return values
+
+def _frame(values: np.ndarray) -> pd.DataFrame:
+    years = [str(2000 + year) for year in range(values.shape[1])]
+    df = pd.DataFrame(values, columns=years)
+    df.insert(0, "Country Code", [f"C{row:02d}" for row in range(len(df))])
+    return df
+
+def test_linear_matches_pandas_interpolate():
+    values = _gappy()
+    result, mask = impute_values(values, "linear")
+    expected = pd.DataFrame(values).interpolate(axis=1, limit_direction="both").to_numpy()
+    np.testing.assert_allclose(result, expected)
+    np.testing.assert_array_equal(mask, np.isnan(values) & ~np.isnan(expected))
+
+def test_ffill_matches_pandas_ffill_then_bfill():
+    values = _gappy(1)
+    result, _ = impute_values(values, "ffill")
+    expected = pd.DataFrame(values).ffill(axis=1).bfill(axis=1).to_numpy()
+    np.testing.assert_allclose(result, expected)
+
+def test_regional_mean_fills_from_the_group():
+    values = np.array([[1.0, np.nan], [3.0, 4.0], [np.nan, np.nan]])
+    result, mask = impute_values(values, "regional_mean", groups=["A", "A", np.nan])
+    np.testing.assert_allclose(result[0], [1.0, 4.0])
+    assert np.isnan(result[2]).all()
+    assert mask.tolist() == [[False, True], [False, False], [False, False]]
+
+def test_empty_arrays_are_returned_unchanged():
+    for shape in [(3, 0), (0, 5), (2, 0, 4)]:
+        result, mask = impute_values(np.empty(shape), "linear")
+        assert result.shape == shape and mask.shape == shape and not mask.any()
+
+def test_clean_data_rejects_bad_imputation_config():
+    df = _frame(_gappy())
+    with pytest.raises(ValueError):
+        clean_data(df, impute="regional_mean")
+    with pytest.raises(ValueError):
+        clean_data(df, impute="spline")
+
+def test_clean_data_returns_the_imputed_mask():
+    df = _frame(_gappy())
+    cleaned, mask = clean_data(df, impute="linear", return_mask=True)
+    # The all-missing first row is dropped before imputing
+    assert list(cleaned.index) == list(range(1, len(df)))
+    pd.testing.assert_frame_equal(mask, imputed_cells(df, cleaned))
+    pd.testing.assert_frame_equal(observed_values(cleaned, mask), df.loc[cleaned.index])
+
+    _, unimputed = clean_data(df, return_mask=True)
+    assert not unimputed.to_numpy().any()
+
+def test_interpolated_frame_leaves_complete_slices_alone():
+    cleaned = clean_data(_frame(_gappy()), impute="linear").drop(columns="Country Code")
+    pd.testing.assert_frame_equal(interpolated_frame(cleaned), cleaned)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from src.incremental import incremental_refresh
+
+def _write_release(path, values: pd.DataFrame, last_updated: str) -> str:
+    lines = ['"Data Source","World Development Indicators",', "",
+             f'"Last Updated Date","{last_updated}",', ""]
+    frame = values.copy()
+    frame.insert(0, "Indicator Code", "TEST.IND")
+    frame.insert(0, "Indicator Name", "Test indicator")
+    frame.insert(0, "Country Code", [name[:3].upper() for name in frame.index])
+    frame = frame.rename_axis("Country Name").reset_index()
+    path.write_text("\n".join(lines) + "\n" + frame.to_csv(index=False))
+    return str(path)
+
+def _releases() -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    countries = ["Aland", "Borduria", "Cordia", "Daria", "Elbonia", "Freedonia"]
+    first = pd.DataFrame(100 + rng.random((6, 10)).cumsum(axis=1), index=countries,
+                         columns=[str(year) for year in range(2000, 2010)])
+    first.iloc[1, 3] = np.nan
+    second = first.copy()
+    second.iloc[2, 5] = 1.5 * second.iloc[2, 5]
+    second.iloc[1, 3] = 104.0
+    # The new year column is only observed for some countries
+    second["2010"] = [120.0, np.nan, 118.0, np.nan, np.nan, 121.0]
+    return first, second.drop(index="Elbonia")
+
+def _outputs(state_dir) -> tuple[pd.DataFrame, pd.DataFrame]:
+    growth = pd.read_csv(state_dir / "TEST.IND" / "growth_rates.csv", index_col=0).sort_index()
+    rolling = pd.read_csv(state_dir / "TEST.IND" / "rolling_statistics.csv").sort_values(["Country", "Year"])
+    return growth, rolling.reset_index(drop=True)
+
+def test_incremental_refresh_matches_a_full_recompute(tmp_path):
+    first, second = _releases()
+    state_dir, cache_dir = tmp_path / "state", tmp_path / "cache"
+    incremental_refresh([_write_release(tmp_path / "first.csv", first, "2025-01-01")],
+                        state_dir=str(state_dir), cache_dir=str(cache_dir), years_window=3)
+    run = incremental_refresh([_write_release(tmp_path / "second.csv", second, "2025-07-01")],
+                              state_dir=str(state_dir), cache_dir=str(cache_dir), years_window=3)
+    record = run["indicators"][0]
+    assert not record["full_recompute"] and record["new_years"] == [2010]
+
+    full_state = tmp_path / "full"
+    full = incremental_refresh([_write_release(tmp_path / "full.csv", second, "2025-07-01")],
+                               state_dir=str(full_state), cache_dir=str(tmp_path / "full_cache"), years_window=3)
+    assert full["indicators"][0]["full_recompute"]
+
+    growth, rolling = _outputs(state_dir)
+    expected_growth, expected_rolling = _outputs(full_state)
+    pd.testing.assert_frame_equal(growth, expected_growth)
+    pd.testing.assert_frame_equal(rolling, expected_rolling)
+
+def test_changed_settings_force_a_full_recompute(tmp_path):
+    first, _ = _releases()
+    path = _write_release(tmp_path / "first.csv", first, "2025-01-01")
+    kwargs = {"state_dir": str(tmp_path / "state"), "cache_dir": str(tmp_path / "cache")}
+    incremental_refresh([path], start_year="2000", end_year="2009", years_window=3, **kwargs)
+
+    same = incremental_refresh([path], start_year="2000", end_year="2009", years_window=3, **kwargs)
+    assert not same["indicators"][0]["full_recompute"]
+    shorter = incremental_refresh([path], start_year="2000", end_year="2005", years_window=3, **kwargs)
+    assert shorter["indicators"][0]["full_recompute"]
+    growth, _ = _outputs(tmp_path / "state")
+    assert list(growth.columns) == [str(year) for year in range(2001, 2006)]
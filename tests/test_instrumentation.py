@@ -0,0 +1,63 @@
+import json
+import tracemalloc
+import pytest
+from src.instrumentation import configure_instrumentation, instrument
+
+@pytest.fixture(autouse=True)
+def reset_instrumentation():
+    yield
+    configure_instrumentation(enabled=False)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def test_disabling_keeps_a_session_started_elsewhere():
+    tracemalloc.start()
+    configure_instrumentation(enabled=True, trace_memory=True)
+    configure_instrumentation(enabled=False)
+    assert tracemalloc.is_tracing()
+
+def test_disabling_stops_its_own_session():
+    configure_instrumentation(enabled=True, trace_memory=True)
+    assert tracemalloc.is_tracing()
+    configure_instrumentation(enabled=False)
+    assert not tracemalloc.is_tracing()
+
+def test_instrumented_calls_are_recorded(tmp_path):
+    @instrument
+    def allocate(n: int) -> list[int]:
+        return list(range(n))
+
+    metrics_path = tmp_path / "metrics.jsonl"
+    configure_instrumentation(enabled=True, metrics_path=str(metrics_path), trace_memory=True)
+    assert len(allocate(100_000)) == 100_000
+    record = json.loads(metrics_path.read_text().splitlines()[-1])
+    assert record["status"] == "ok" and record["output"] == [100_000]
+    assert record["peak_mb"] > 1
+
+def test_overlapping_stages_on_other_threads_report_no_peak(tmp_path):
+    import threading
+    from src.instrumentation import measure_stage
+
+    metrics_path = tmp_path / "metrics.jsonl"
+    configure_instrumentation(enabled=True, metrics_path=str(metrics_path), trace_memory=True)
+    inside, release = threading.Event(), threading.Event()
+
+    def background():
+        with measure_stage("background"):
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=background)
+    thread.start()
+    inside.wait(5)
+    with measure_stage("foreground"):
+        data = list(range(100_000))
+    release.set()
+    thread.join()
+    with measure_stage("alone"):
+        data = list(range(100_000))
+
+    records = {record["stage"]: record for record in map(json.loads, metrics_path.read_text().splitlines())}
+    for name in ("background", "foreground"):
+        assert records[name]["memory"] == "concurrent" and "peak_mb" not in records[name]
+    assert records["alone"]["peak_mb"] > 1 and len(data) == 100_000
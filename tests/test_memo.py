@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+import src.memo as memo_module
+from src.memo import MemoCache, configure_memoization, fingerprint, memo_cache, memoize
+
+calls = []
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    configure_memoization()
+    memo_cache().clear()
+    calls.clear()
+    yield
+    configure_memoization()
+    memo_cache().clear()
+
+@memoize
+def _frame(n: int) -> pd.DataFrame:
+    calls.append(n)
+    return pd.DataFrame({"a": np.arange(n, dtype=np.float64)})
+
+@memoize
+def _array(n: int) -> np.ndarray:
+    calls.append(n)
+    return np.arange(n, dtype=np.float64)
+
+@memoize
+def _nothing(n: int) -> None:
+    calls.append(n)
+
+def test_repeated_calls_are_served_from_the_cache():
+    first = _frame(3)
+    second = _frame(3)
+    pd.testing.assert_frame_equal(first, second)
+    assert calls == [3]
+
+def test_changing_the_input_after_a_call_does_not_change_cached_results():
+    @memoize
+    def passthrough(df: pd.DataFrame) -> pd.DataFrame:
+        calls.append(len(df))
+        # Shares memory with the caller's frame
+        return df
+
+    df = pd.DataFrame({"a": np.arange(3, dtype=np.float64)})
+    passthrough(df)
+    df.loc[0, "a"] = 100.0
+    assert passthrough(pd.DataFrame({"a": np.arange(3, dtype=np.float64)})).loc[0, "a"] == 0.0
+    assert calls == [3]
+
+def test_arrays_computed_from_the_input_are_stored_as_copies():
+    @memoize
+    def column(df: pd.DataFrame) -> np.ndarray:
+        calls.append(len(df))
+        return df["a"].to_numpy()
+
+    df = pd.DataFrame({"a": np.arange(3, dtype=np.float64)})
+    column(df)
+    df.loc[0, "a"] = 100.0
+    assert column(pd.DataFrame({"a": np.arange(3, dtype=np.float64)}))[0] == 0.0
+    assert calls == [3]
+
+def test_arrays_are_returned_read_only():
+    with pytest.raises(ValueError):
+        _array(4)[0] = 1.0
+
+def test_none_results_are_not_cached():
+    _nothing(1)
+    _nothing(1)
+    assert calls == [1, 1]
+
+def test_rejected_results_are_not_cached():
+    @memoize(cacheable=lambda result: "error" not in result.values())
+    def fit(n: int) -> dict:
+        calls.append(n)
+        return {"x": "error"}
+
+    fit(1)
+    fit(1)
+    assert calls == [1, 1]
+
+def test_ignored_parameters_share_an_entry():
+    @memoize(ignore=("n_jobs",))
+    def fit(n: int, n_jobs: int = 1) -> dict:
+        calls.append(n)
+        return {"n": n}
+
+    assert fit(2, n_jobs=1) == fit(2, n_jobs=4)
+    assert calls == [2]
+
+def test_disk_entries_are_not_reused_after_a_source_change(tmp_path, monkeypatch):
+    configure_memoization(cache_dir=str(tmp_path))
+
+    def compute(n: int) -> dict:
+        calls.append(n)
+        return {"n": n}
+
+    monkeypatch.setattr(memo_module, "source_version", lambda: "v1")
+    memoize(compute)(5)
+    memo_cache().clear()
+    memoize(compute)(5)
+    assert calls == [5]
+
+    monkeypatch.setattr(memo_module, "source_version", lambda: "v2")
+    memo_cache().clear()
+    memoize(compute)(5)
+    assert calls == [5, 5]
+
+def test_fingerprint_covers_values_labels_and_dtypes():
+    df = pd.DataFrame({"2000": [1.0, 2.0], "2001": [3.0, 4.0]}, index=["a", "b"])
+    assert fingerprint(df) == fingerprint(df.copy())
+    changed = df.copy()
+    changed.iloc[0, 0] += 1e-12
+    assert fingerprint(changed) != fingerprint(df)
+    assert fingerprint(df.rename(index={"a": "c"})) != fingerprint(df)
+    assert fingerprint(df.rename(columns={"2000": "1999"})) != fingerprint(df)
+    assert fingerprint(df.astype(np.float32)) != fingerprint(df)
+    assert fingerprint(df, n=1) != fingerprint(df, n=2)
+
+def test_fingerprint_hashes_objects_by_content():
+    from src.metadata import CountryMetadata
+
+    columns = ["Region", "IncomeGroup", "SpecialNotes", "TableName"]
+    europe = CountryMetadata(pd.DataFrame([["Europe & Central Asia", "High income", "", "Austria"]], index=["AUT"], columns=columns))
+    asia = CountryMetadata(pd.DataFrame([["East Asia & Pacific", "High income", "", "Austria"]], index=["AUT"], columns=columns))
+    assert repr(europe) == repr(asia)
+    assert fingerprint(europe) != fingerprint(asia)
+
+def test_arguments_without_a_fingerprint_are_not_cached():
+    @memoize
+    def apply(func, n: int) -> int:
+        calls.append(n)
+        return func(n)
+
+    with pytest.raises(TypeError):
+        fingerprint(len)
+    assert apply(abs, -1) == 1
+    assert apply(abs, -1) == 1
+    assert calls == [-1, -1]
+
+def test_disk_store_is_bounded(tmp_path):
+    configure_memoization(cache_dir=str(tmp_path), max_disk_bytes=2 * 2**10)
+    for n in (100, 101, 102):
+        _array(n)
+    sizes = [path.stat().st_size for path in (tmp_path / "memo").glob("*.pkl")]
+    assert 0 < len(sizes) < 3
+    assert sum(sizes) <= 2 * 2**10
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = MemoCache(max_entries=2, max_bytes=10**6)
+    cache.put("a", np.zeros(1))
+    cache.put("b", np.zeros(1))
+    cache.get("a")
+    cache.put("c", np.zeros(1))
+    assert list(cache.entries) == ["a", "c"]
+
+def test_cache_is_bounded_by_size():
+    cache = MemoCache(max_entries=10, max_bytes=1000)
+    cache.put("a", np.zeros(100))
+    cache.put("b", np.zeros(100))
+    assert list(cache.entries) == ["b"]
+    cache.put("big", np.zeros(1000))
+    assert "big" not in cache.entries
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.clustering import trajectory_features
+from src.correlation import cross_country_correlations, indicator_correlations
+from src.metadata import CountryMetadata, default_countries
+from src.panel import Panel
+from src.stats import panel_growth_rate_analysis
+
+CODES = ["AAA", "BBB", "CCC", "WLD"]
+
+def _metadata() -> CountryMetadata:
+    frame = pd.DataFrame({"Region": ["North", "North", "South", np.nan],
+                          "IncomeGroup": ["High", "Low", "Low", np.nan],
+                          "SpecialNotes": None, "TableName": ["A", "B", "C", "World"]},
+                         index=pd.Index(CODES, name="Country Code"))
+    return CountryMetadata(frame)
+
+def _panel() -> Panel:
+    rng = np.random.default_rng(0)
+    values = 100 + rng.random((2, len(CODES), 10)).cumsum(axis=2)
+    values[:, -1] = values[:, :-1].sum(axis=1)
+    return Panel(values, ["X", "Y"], ["Indicator X", "Indicator Y"], ["A", "B", "C", "World"], CODES,
+                 range(2000, 2010))
+
+def test_default_countries_drops_aggregates_unless_countries_are_given():
+    panel = _panel()
+    assert default_countries(panel, metadata=_metadata()) == ["A", "B", "C"]
+    assert default_countries(panel, ["World"], metadata=_metadata()) == ["World"]
+    assert default_countries(panel, ["World"]) == ["World"]
+
+def test_default_countries_never_looks_up_metadata_itself():
+    # A lookup relative to the working directory would make memoized results depend on it
+    with pytest.raises(ValueError):
+        default_countries(_panel())
+
+def test_cross_country_analyses_exclude_aggregates_by_default():
+    panel, metadata = _panel(), _metadata()
+
+    yearly, cagr = panel_growth_rate_analysis(panel, metadata=metadata)
+    assert list(cagr.index) == ["A", "B", "C"]
+    assert set(yearly.index.get_level_values(1)) == {"A", "B", "C"}
+
+    labels, trajectories = trajectory_features(panel, metadata=metadata)
+    assert list(labels) == ["A", "B", "C"] and len(trajectories) == 3
+
+    pairs = cross_country_correlations(panel, metadata=metadata)
+    assert "World" not in set(pairs["Country A"]) | set(pairs["Country B"])
+
+    _, cagr = panel_growth_rate_analysis(panel, countries=list(panel.countries), metadata=metadata)
+    assert "World" in cagr.index
+
+def test_indicator_correlations_keep_every_country():
+    pairs = indicator_correlations(_panel())
+    assert set(pairs["Country"]) == {"A", "B", "C", "World"}
@@ -0,0 +1,70 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.cache import load_cached_data
+from src.panel import Panel
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def _frame(code: str, countries: list[str], years: range, offset: float) -> pd.DataFrame:
+    values = offset + np.arange(len(countries) * len(years), dtype=float).reshape(len(countries), len(years))
+    df = pd.DataFrame(values, index=pd.Index(countries, name="Country Name"), columns=[str(year) for year in years])
+    df.insert(0, "Indicator Code", code)
+    df.insert(0, "Indicator Name", f"Indicator {code}")
+    df.insert(0, "Country Code", [country[:3].upper() for country in countries])
+    return df
+
+def _panel() -> Panel:
+    return Panel.from_frames([_frame("X", ["Aland", "Borduria", "Cordia"], range(2000, 2005), 0.0),
+                              _frame("Y", ["Borduria", "Daria"], range(2002, 2007), 100.0)])
+
+def test_from_frames_aligns_countries_and_years_by_label():
+    panel = _panel()
+    assert list(panel.countries) == ["Aland", "Borduria", "Cordia", "Daria"]
+    assert list(panel.country_codes) == ["ALA", "BOR", "COR", "DAR"]
+    assert list(panel.years) == [str(year) for year in range(2000, 2007)]
+    assert panel.values.shape == (2, 4, 7) and panel.values.flags.c_contiguous
+
+    frame = panel.frame("Y", ["Borduria", "Daria"], "2002", "2006")
+    expected = _frame("Y", ["Borduria", "Daria"], range(2002, 2007), 100.0)
+    pd.testing.assert_frame_equal(frame, expected.iloc[:, 3:], check_names=False)
+    assert np.isnan(panel.frame("Y", ["Aland"])).all().all()
+
+def test_frame_and_array_share_memory_unless_rows_are_gathered():
+    panel = _panel()
+    assert np.shares_memory(panel.frame("X").to_numpy(), panel.values)
+    assert np.shares_memory(panel.frame("X", start_year="2001", end_year="2003").to_numpy(), panel.values)
+    assert np.shares_memory(panel.array(start_year="2001"), panel.values)
+    assert not np.shares_memory(panel.frame("X", ["Cordia", "Aland"]).to_numpy(), panel.values)
+    assert not np.shares_memory(panel.array(indicators=["Y"]), panel.values)
+
+def test_observed_values_mask_imputed_cells_without_touching_the_panel():
+    panel = _panel()
+    panel.imputed = np.zeros(panel.values.shape, dtype=bool)
+    panel.imputed[0, 1, 2] = True
+    observed = panel.frame("X", include_imputed=False)
+    assert np.isnan(observed.loc["Borduria", "2002"]) and not np.isnan(panel.values[0, 1, 2])
+    assert np.isnan(panel.array(include_imputed=False)[0, 1, 2])
+    assert panel.frame("X").loc["Borduria", "2002"] == panel.values[0, 1, 2]
+
+def test_lookups_by_label():
+    panel = _panel()
+    assert panel.indicator_position("Y") == 1 and panel.indicator_position("Indicator Y") == 1
+    np.testing.assert_array_equal(panel.country_positions(["Daria", "Aland"]), [3, 0])
+    assert panel.year_slice("2001", "2003") == slice(1, 4)
+    assert panel.year_slice() == slice(0, 7)
+    with pytest.raises(KeyError):
+        panel.indicator_position("Z")
+    with pytest.raises(KeyError, match="Atlantis"):
+        panel.country_positions(["Aland", "Atlantis"])
+    with pytest.raises(ValueError):
+        Panel(np.zeros((1, 2, 3)), ["X"], ["Indicator X"], ["A"], ["AAA"], ["2000", "2001", "2002"])
+
+def test_from_directories_matches_the_cached_frames(tmp_path):
+    panel = Panel.from_directories(DATA_DIR, str(tmp_path))
+    path = os.path.join(DATA_DIR, "GDP", "API_NY.GDP.MKTP.CD_DS2_en_csv_v2_127285.csv")
+    df = load_cached_data(path, str(tmp_path))
+    years = [col for col in df.columns if col.isdigit()]
+    frame = panel.frame("NY.GDP.MKTP.CD", list(df.index))[years]
+    np.testing.assert_array_equal(frame.to_numpy(), df[years].to_numpy())
@@ -0,0 +1,89 @@
+import os
+import pandas as pd
+import pytest
+import src.pipeline as pipeline_module
+from src.cache import load_cached_data, source_version
+from src.clean_data import clean_data
+from src.data_helpers import set_country_index, slice_dataframe
+from src.load_data import load_data
+from src.pipeline import DEFAULT_CONFIG, Pipeline, Stage, build_pipeline, find_indicator_file, run_pipeline
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+calls = []
+
+def _double(x: int) -> int:
+    calls.append(x)
+    return 2 * x
+
+def _pipeline(cache_dir) -> Pipeline:
+    pipeline = Pipeline(str(cache_dir), max_workers=1)
+    pipeline.add(Stage("double", _double, params={"x": 21}))
+    return pipeline
+
+def test_source_version_changes_when_a_module_changes(tmp_path):
+    (tmp_path / "module.py").write_text("def f():\n    return 1\n")
+    before = source_version.__wrapped__(str(tmp_path))
+    (tmp_path / "module.py").write_text("def f():\n    return 2\n")
+    assert source_version.__wrapped__(str(tmp_path)) != before
+
+def test_persisted_stage_is_reused_until_the_source_changes(tmp_path, monkeypatch):
+    calls.clear()
+    assert _pipeline(tmp_path).run()["double"] == 42
+    assert _pipeline(tmp_path).run()["double"] == 42
+    assert calls == [21]
+
+    # An edit anywhere in src must not return results computed by the old code
+    monkeypatch.setattr(pipeline_module, "source_version", lambda: "edited")
+    assert _pipeline(tmp_path).run()["double"] == 42
+    assert calls == [21, 21]
+
+def test_stage_key_covers_params_and_dependencies(tmp_path):
+    pipeline = _pipeline(tmp_path)
+    key = pipeline.fingerprint("double", {})
+    pipeline.stages["double"].params["x"] = 22
+    assert pipeline.fingerprint("double", {}) != key
+
+def test_load_stage_goes_through_the_load_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = {**DEFAULT_CONFIG, "data_dir": DATA_DIR, "cache_dir": str(tmp_path / "cache")}
+    pipeline = build_pipeline(config)
+    assert pipeline.stages["load:gdp"].func is load_cached_data
+    assert not pipeline.stages["load:gdp"].persist
+    # Without imputation the clean stage only passes the load frame through
+    assert not pipeline.stages["clean:gdp"].persist
+
+    outputs = run_pipeline(config, kinds=["slice"])
+    csv_file_loc = find_indicator_file(DATA_DIR, config["indicators"]["gdp"])
+    expected = slice_dataframe(set_country_index(clean_data(load_data(csv_file_loc))), config["countries"],
+                               config["start_year"], config["end_year"])
+    pd.testing.assert_frame_equal(outputs["slice:gdp"], expected, check_dtype=False)
+    assert any(name != "pipeline" for name in os.listdir(tmp_path / "cache"))
+
+def test_imputed_mask_is_carried_to_the_slices(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = {**DEFAULT_CONFIG, "data_dir": DATA_DIR, "cache_dir": str(tmp_path / "cache"), "start_year": 1960,
+              "imputation": {"method": ["linear"], "exclude_from": ["correlation"]}, "analyses": ["correlation", "regression"]}
+    pipeline = build_pipeline(config)
+    assert pipeline.stages["analyze:correlation"].deps == ["slice:gdp:observed", "slice:inflation:observed"]
+    assert pipeline.stages["analyze:regression"].deps == ["slice:gdp", "slice:inflation"]
+
+    outputs = run_pipeline(config, kinds=["slice"])
+    unimputed = slice_dataframe(load_cached_data(find_indicator_file(DATA_DIR, config["indicators"]["inflation"]),
+                                                 cache_dir=str(tmp_path / "cache")),
+                                config["countries"], config["start_year"], config["end_year"])
+    mask = outputs["slice:inflation:imputed"]
+    assert mask.to_numpy().any()
+    assert not outputs["slice:inflation"].isna().to_numpy().any()
+    pd.testing.assert_frame_equal(mask, unimputed.isna())
+    pd.testing.assert_frame_equal(outputs["slice:inflation:observed"], unimputed, check_dtype=False)
+
+def test_statsmodels_export_keeps_the_summaries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = {**DEFAULT_CONFIG, "data_dir": DATA_DIR, "cache_dir": str(tmp_path / "cache"), "export_format": "csv",
+              "analyses": ["regression_statsmodels"]}
+    table_path, summaries_path = run_pipeline(config, kinds=["export"])["export:regression_statsmodels"]
+    table = pd.read_csv(table_path)
+    assert list(table["Country"]) == config["countries"] and "error" in table.columns
+    with open(summaries_path) as f:
+        assert f.read().count("OLS Regression Results") == len(config["countries"])
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import pytest
+from src.server import Dataset, QueryService, ResultCache, _handle_connection
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    return QueryService(Dataset(DATA_DIR, str(tmp_path_factory.mktemp("cache"))), cache_size=2)
+
+def test_result_cache_evicts_the_least_recently_used_entry():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert list(cache.entries) == ["a", "c"]
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResultCache()
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1 and cache.misses == 1
+    assert asyncio.run(cache.get_or_compute("key", compute)) == "value"
+    assert len(calls) == 1 and cache.hits == 1
+
+def test_cancelled_computation_releases_its_waiters():
+    cache = ResultCache()
+
+    async def compute():
+        await asyncio.sleep(10)
+
+    async def run():
+        owner = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, timeout=1)
+        return owner
+
+    owner = asyncio.run(run())
+    assert owner.cancelled() and not cache.pending and cache.get("key") is None
+
+def test_failed_computation_is_not_cached():
+    cache = ResultCache()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute("key", fail))
+    assert cache.get("key") is None and not cache.pending
+
+async def _get(port: int, target: str, etag: str = None) -> tuple[int, dict, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = [f"GET {target} HTTP/1.1", "Host: localhost", "Connection: close"]
+    if etag is not None:
+        request.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(request) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *lines = head.decode("latin-1").split("\r\n")
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines)}
+    return int(status_line.split()[1]), headers, body
+
+def test_etag_revalidation_returns_not_modified(service):
+    async def run():
+        server = await asyncio.start_server(lambda r, w: _handle_connection(service, r, w), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            first = await _get(port, "/slice?indicator=NY.GDP.MKTP.CD&countries=Aruba")
+            revalidated = await _get(port, "/slice?countries=Aruba&indicator=NY.GDP.MKTP.CD", first[1]["etag"])
+            stale = await _get(port, "/slice?indicator=NY.GDP.MKTP.CD&countries=Aruba", '"stale"')
+            missing = await _get(port, "/slice?indicator=NOPE")
+            # A bad query never revalidates, whatever ETag it sends
+            unknown = await _get(port, "/nope", service.etag(("/nope", ())))
+            params = (("indicator", "NOPE"),)
+            invalid = await _get(port, "/slice?indicator=NOPE", service.etag(("/slice", params)))
+        return first, revalidated, stale, missing, unknown, invalid
+
+    first, revalidated, stale, missing, unknown, invalid = asyncio.run(run())
+    status, headers, body = first
+    assert status == 200 and headers["etag"].startswith(f'"{service.dataset.release}-')
+    assert "Aruba" in json.loads(body)
+    # Parameter order does not change the ETag
+    assert revalidated[0] == 304 and revalidated[2] == b""
+    assert stale[0] == 200 and stale[2] == body
+    assert missing[0] == 404 and "etag" not in missing[1]
+    assert unknown[0] == 404 and invalid[0] == 404
+
+def test_trends_plot_is_titled_after_the_indicator(service, monkeypatch):
+    titles = []
+
+    def plot(df, countries, years, show, output_path, title, ylabel):
+        titles.append(title)
+        output_path.write(b"png")
+
+    monkeypatch.setattr("src.plot_gdp.plot_gdp_trends", plot)
+    service.plot_trends({"indicator": "FP.CPI.TOTL.ZG", "countries": "Aruba"})
+    assert titles == [service.dataset.panel.indicator_names[service.dataset.panel.indicator_position("FP.CPI.TOTL.ZG")]]
+
+def test_query_results_are_cached_per_parameters(service):
+    async def run():
+        service.cache.clear()
+        params = {"indicator": "NY.GDP.MKTP.CD", "countries": "Aruba"}
+        first = await service.query("/slice", params)
+        second = await service.query("/slice", dict(reversed(list(params.items()))))
+        await service.query("/slice", {**params, "start": "2000"})
+        await service.query("/indicators", {})
+        return first, second
+
+    hits = service.cache.hits
+    first, second = asyncio.run(run())
+    assert first == second and service.cache.hits == hits + 1
+    # cache_size=2 keeps only the two most recent queries
+    assert len(service.cache.entries) == 2
+    assert ("/slice", (("countries", "Aruba"), ("indicator", "NY.GDP.MKTP.CD"))) not in service.cache.entries
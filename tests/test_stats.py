@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, r2_score
+from src.stats import ROLLING_STATISTICS, batch_linear_regression, linear_regression_table, rolling_moments
+
+def _frames(seed: int = 0, countries: int = 8, years: int = 20) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    index = pd.Index([f"Country {i}" for i in range(countries)], name="Country Name")
+    columns = [str(year) for year in range(2000, 2000 + years)]
+    x = rng.normal(size=(countries, years)).cumsum(axis=1)
+    y = 2.0 * x + rng.normal(size=x.shape)
+    x[rng.random(x.shape) < 0.15] = np.nan
+    y[rng.random(y.shape) < 0.15] = np.nan
+    return pd.DataFrame(x, index=index, columns=columns), pd.DataFrame(y, index=index, columns=columns)
+
+def test_batch_ols_matches_sklearn():
+    X, y = _frames()
+    result = batch_linear_regression(X.to_numpy(), y.to_numpy())
+    for row in range(len(X)):
+        mask = X.iloc[row].notna() & y.iloc[row].notna()
+        x_vals = X.iloc[row][mask].to_numpy().reshape(-1, 1)
+        y_vals = y.iloc[row][mask].to_numpy()
+        model = LinearRegression().fit(x_vals, y_vals)
+        predicted = model.predict(x_vals)
+        assert result["slope"][row] == pytest.approx(model.coef_[0])
+        assert result["intercept"][row] == pytest.approx(model.intercept_)
+        assert result["r2"][row] == pytest.approx(r2_score(y_vals, predicted))
+        assert result["mse"][row] == pytest.approx(mean_squared_error(y_vals, predicted))
+        assert result["n"][row] == mask.sum()
+
+def test_regression_table_aligns_years_by_label():
+    X, y = _frames(1)
+    expected = linear_regression_table(X, y)
+    # Reordered and extra year columns in y must not pair the wrong years
+    shuffled = y[y.columns[::-1]].assign(**{"1999": 1.0})
+    pd.testing.assert_frame_equal(linear_regression_table(X, shuffled.iloc[::-1]), expected)
+
+    # Years X has but y lacks count as missing
+    partial = linear_regression_table(X, y.drop(columns=["2000", "2001"]))
+    assert (partial["n"] <= expected["n"]).all() and (partial["n"] < expected["n"]).any()
+
+@pytest.mark.parametrize("window", [1, 2, 3, 4, 6])
+def test_rolling_moments_match_pandas_rolling(window):
+    values, _ = _frames(2)
+    values = values.to_numpy()
+    values[3] = 5.0
+    moments = rolling_moments(values, window)
+    rolling = pd.DataFrame(values.T).rolling(window)
+    expected = {"Mean": rolling.mean(), "Std": rolling.std(), "Median": rolling.median(), "Variance": rolling.var(),
+                "Skew": rolling.skew(), "Kurtosis": rolling.kurt()}
+    for name in ROLLING_STATISTICS:
+        reference = expected[name].to_numpy().T
+        if name in ("Skew", "Kurtosis"):
+            # The moments of a flat series are undefined rather than float noise
+            assert np.isnan(moments[name][3]).all()
+            reference[3] = np.nan
+        np.testing.assert_allclose(moments[name], reference, rtol=1e-7, atol=1e-9, err_msg=name)